@@ -30,6 +30,14 @@ def get_url():
     return str(get_settings().SQLALCHEMY_DATABASE_URI)
 
 
+# Объекты, которые создаются только миграциями и не описаны в моделях
+MIGRATION_ONLY_OBJECTS = {("column", "search_vector"), ("index", "ix_posts_search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return (type_, name) not in MIGRATION_ONLY_OBJECTS
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -71,7 +79,10 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
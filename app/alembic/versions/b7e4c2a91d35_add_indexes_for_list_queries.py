@@ -0,0 +1,39 @@
+"""Add indexes for list queries
+
+Revision ID: b7e4c2a91d35
+Revises: 20b08a42c990
+Create Date: 2026-10-18 12:40:11.514203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c2a91d35'
+down_revision: Union[str, Sequence[str], None] = '20b08a42c990'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_posts_category_id_date_created_id',
+        'posts',
+        ['category_id', sa.text('date_created DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index('ix_posts_date_created_id', 'posts', ['date_created', 'id'], unique=False)
+    op.create_index('ix_posts_title_id', 'posts', ['title', 'id'], unique=False)
+    op.create_index('ix_categories_date_created_id', 'categories', ['date_created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_date_created_id', table_name='categories')
+    op.drop_index('ix_posts_title_id', table_name='posts')
+    op.drop_index('ix_posts_date_created_id', table_name='posts')
+    op.drop_index('ix_posts_category_id_date_created_id', table_name='posts')
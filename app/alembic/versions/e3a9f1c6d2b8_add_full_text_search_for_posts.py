@@ -0,0 +1,51 @@
+"""Add full-text search for posts
+
+Revision ID: e3a9f1c6d2b8
+Revises: b7e4c2a91d35
+Create Date: 2026-10-18 13:05:47.208716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9f1c6d2b8'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c2a91d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонка не описана в модели Post: она нужна только PostgreSQL для поиска
+    # (см. PostService.search), заголовок весит больше текста поста
+    op.execute(
+        """
+        ALTER TABLE posts ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') ||
+            setweight(
+                to_tsvector(
+                    'russian'::regconfig,
+                    regexp_replace(coalesce(content_html, ''), '<[^>]*>', ' ', 'g')
+                ),
+                'B'
+            )
+        ) STORED
+        """
+    )
+    op.create_index(
+        'ix_posts_search_vector',
+        'posts',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.drop_column('posts', 'search_vector')
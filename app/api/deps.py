@@ -4,17 +4,27 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from loguru import logger
+from redis import asyncio as aioredis
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.response_cache import ResponseCache
 from app.core.config import Settings, get_settings
 from app.core.constants import UserRole
-from app.db.session import get_async_engine
-from app.models.user import User
+from app.core.login_throttle import LoginThrottle
+from app.core.redis import get_redis_client
+from app.core.security import decode_token
+from app.core.single_flight import SingleFlight, get_single_flight
+from app.db.counting import TotalCounter, make_total_counter
+from app.db.record_cache import RecordCache, get_record_cache
+from app.db.session import get_sessionmaker
+from app.db.versions import ModelVersions
+from app.schemas.user import UserPrincipal
 from app.services.category import CategoryService, get_category_service
 from app.services.post import PostService, get_post_service
+from app.services.principal import PrincipalCache, get_principal_cache
 from app.services.user import UserService, get_user_service
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -31,11 +41,8 @@ SettingsDep = Annotated[Settings, Depends(get_app_settings)]
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(
-        bind=get_async_engine(), expire_on_commit=False, class_=AsyncSession
-    )
     try:
-        async with async_session() as session:
+        async with get_sessionmaker()() as session:
             yield session
     except SQLAlchemyError as e:
         logger.error("Unable to yield session in database dependency")
@@ -45,18 +52,97 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
 
-UserServiceDep = Annotated[UserService, Depends(get_user_service)]
 
-PostServiceDep = Annotated[PostService, Depends(get_post_service)]
-CategoryServiceDep = Annotated[CategoryService, Depends(get_category_service)]
+async def get_redis() -> aioredis.Redis:
+    return get_redis_client()
+
+
+RedisDep = Annotated[aioredis.Redis, Depends(get_redis)]
+
+
+async def get_total_counter(redis: RedisDep, settings: SettingsDep) -> TotalCounter:
+    return make_total_counter(
+        settings.PAGINATION_COUNT_STRATEGY,
+        redis,
+        settings.PAGINATION_COUNT_CACHE_TTL,
+    )
+
+
+TotalCounterDep = Annotated[TotalCounter, Depends(get_total_counter)]
+
+
+async def get_login_throttle(redis: RedisDep, settings: SettingsDep) -> LoginThrottle:
+    return LoginThrottle(redis, settings)
+
+
+LoginThrottleDep = Annotated[LoginThrottle, Depends(get_login_throttle)]
+
+
+async def get_records() -> RecordCache:
+    return get_record_cache()
+
+
+RecordCacheDep = Annotated[RecordCache, Depends(get_records)]
+
+
+async def get_model_versions(redis: RedisDep) -> ModelVersions:
+    return ModelVersions(redis)
+
+
+ModelVersionsDep = Annotated[ModelVersions, Depends(get_model_versions)]
+
+
+async def get_flights() -> SingleFlight:
+    return get_single_flight()
+
+
+SingleFlightDep = Annotated[SingleFlight, Depends(get_flights)]
+
+
+async def get_response_cache(
+    redis: RedisDep, settings: SettingsDep, flights: SingleFlightDep
+) -> ResponseCache:
+    return ResponseCache(redis, settings.RESPONSE_CACHE_TTL, flights)
+
+
+ResponseCacheDep = Annotated[ResponseCache, Depends(get_response_cache)]
+
+
+async def get_app_post_service(
+    counter: TotalCounterDep, records: RecordCacheDep, versions: ModelVersionsDep
+) -> PostService:
+    return get_post_service(counter, records, versions)
+
+
+async def get_app_category_service(
+    counter: TotalCounterDep, records: RecordCacheDep, versions: ModelVersionsDep
+) -> CategoryService:
+    return get_category_service(counter, records, versions)
+
+
+async def get_principals() -> PrincipalCache:
+    return get_principal_cache()
+
+
+PrincipalCacheDep = Annotated[PrincipalCache, Depends(get_principals)]
+
+
+async def get_app_user_service(principals: PrincipalCacheDep) -> UserService:
+    return get_user_service(principals)
+
+
+UserServiceDep = Annotated[UserService, Depends(get_app_user_service)]
+
+PostServiceDep = Annotated[PostService, Depends(get_app_post_service)]
+CategoryServiceDep = Annotated[CategoryService, Depends(get_app_category_service)]
 
 
 async def get_current_user(
     session: SessionDep,
     user_service: UserServiceDep,
+    principals: PrincipalCacheDep,
     token: TokenDep,
-    settings: SettingsDep,
-) -> User:
+) -> UserPrincipal:
     unauthorized_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid credentials",
@@ -69,11 +155,7 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
+        payload = decode_token(token)
 
         try:
             user_id = uuid.UUID(payload.get("sub"))
@@ -83,8 +165,13 @@ async def get_current_user(
     except JWTError:
         raise unauthorized_exc
 
-    user = await user_service.get(session, user_id)
-    if not user:
+    async def load() -> UserPrincipal | None:
+        db_user = await user_service.get(session, user_id)
+        return UserPrincipal.model_validate(db_user) if db_user else None
+
+    # В установившемся режиме пользователь берётся из кэша, без запроса в БД
+    user = await principals.get_or_load(user_id, load)
+    if user is None:
         raise unauthorized_exc
     if not user.is_active:
         raise forbidden_exc
@@ -92,11 +179,11 @@ async def get_current_user(
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[UserPrincipal, Depends(get_current_user)]
 
 
-def require_role(*roles: UserRole) -> Callable[..., User]:
-    def checker(user: CurrentUser) -> User:
+def require_role(*roles: UserRole) -> Callable[..., UserPrincipal]:
+    def checker(user: CurrentUser) -> UserPrincipal:
         if user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Denied permissions"
@@ -107,4 +194,4 @@ def require_role(*roles: UserRole) -> Callable[..., User]:
     return checker
 
 
-AdminUser = Annotated[User, Depends(require_role(UserRole.ADMIN))]
+AdminUser = Annotated[UserPrincipal, Depends(require_role(UserRole.ADMIN))]
@@ -0,0 +1,18 @@
+import uuid
+from typing import Any
+
+from app.db.crud import ColumnType
+from app.models.category import Category
+from app.models.post import Post
+
+
+def identifier_column(
+    model: type[Post] | type[Category], identifier: str
+) -> tuple[ColumnType, Any]:
+    """
+    Колонка и значение для поиска по UUID или slug
+    """
+    try:
+        return model.id, uuid.UUID(identifier)
+    except ValueError:
+        return model.slug, identifier
@@ -0,0 +1,90 @@
+from math import ceil
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import OrderDirection
+from app.core.exceptions import InvalidCursorError
+from app.db.crud import ColumnType, CRUDReadBase, Filter, ModelType, Projection
+
+
+async def build_page(
+    service: CRUDReadBase[ModelType, Any],
+    session: AsyncSession,
+    *filters: Filter,
+    page: int,
+    size: int,
+    order_by: ColumnType,
+    order_dir: OrderDirection,
+    cursor: str | None = None,
+    with_total: bool = True,
+    projection: Projection = None,
+) -> dict[str, Any]:
+    """
+    Собирает ответ для схемы Page.
+
+    Если передан cursor, используется keyset-пагинация и page игнорируется,
+    иначе обычная постраничная выдача. В обоих режимах в ответ добавляются
+    курсоры соседних страниц, чтобы клиент мог перейти на keyset-режим.
+    При with_total=False total и pages не считаются, projection — схема
+    элементов ответа, из БД читаются только её колонки.
+    """
+    if cursor is not None:
+        try:
+            items, next_cursor, prev_cursor = await service.paginate_keyset(
+                session,
+                *filters,
+                size=size,
+                order_by=order_by,
+                order_dir=order_dir,
+                cursor=cursor,
+                projection=projection,
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        return {
+            "items": items,
+            "total": None,
+            "total_exact": None,
+            "page": None,
+            "size": size,
+            "pages": None,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+
+    items, total = await service.paginate(
+        session,
+        *filters,
+        page=page,
+        size=size,
+        order_by=order_by,
+        order_dir=order_dir,
+        with_total=with_total,
+        projection=projection,
+    )
+    if total is None:
+        pages = None
+        has_next = len(items) == size
+    else:
+        pages = ceil(total.value / size) if total.value else 1
+        has_next = page < pages
+
+    return {
+        "items": items,
+        "total": total.value if total else None,
+        "total_exact": total.exact if total else None,
+        "page": page,
+        "size": size,
+        "pages": pages,
+        "next_cursor": (
+            service.make_cursor(items[-1], order_by) if items and has_next else None
+        ),
+        "prev_cursor": (
+            service.make_cursor(items[0], order_by, backwards=True)
+            if items and page > 1
+            else None
+        ),
+    }
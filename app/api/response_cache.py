@@ -0,0 +1,119 @@
+import hashlib
+import json
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, NamedTuple, cast
+
+from fastapi import Response
+from loguru import logger
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.redis import RedisScript
+from app.core.single_flight import SingleFlight
+from app.db.versions import ModelVersions
+from app.models.base import Base
+
+# Версии моделей и ответ под ними за один запрос к Redis.
+# KEYS — ключи версий, ARGV[1] — префикс, ARGV[2] — хэш параметров
+VERSIONED_GET = RedisScript(
+    """
+local versions = redis.call('MGET', unpack(KEYS))
+for i, version in ipairs(versions) do
+    versions[i] = version or '0'
+end
+local key = ARGV[1] .. ':' .. table.concat(versions, '.') .. ':' .. ARGV[2]
+return {key, redis.call('GET', key)}
+"""
+)
+
+
+class CachedResponse(NamedTuple):
+    key: str | None
+    body: str | None
+
+
+class ResponseCache:
+    """
+    Кэш готовых JSON-ответов публичных GET-эндпоинтов.
+
+    Ключ — имя эндпоинта, версии моделей, из которых собран ответ, и
+    провалидированные параметры запроса (значения по умолчанию и лишние
+    параметры не размножают ключи). Запись через сервис увеличивает версию
+    модели, и старые ответы перестают находиться. Попадание — один вызов
+    Redis без запросов в БД и без сериализации. Одинаковые промахи
+    собирают ответ один раз через flights.
+    """
+
+    def __init__(
+        self, redis: aioredis.Redis, ttl: int, flights: SingleFlight | None = None
+    ) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.flights = flights
+
+    async def respond(
+        self,
+        name: str,
+        models: Sequence[type[Base]],
+        params: dict[str, Any],
+        schema: type[BaseModel],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """
+        Ответ из кэша или собранный build и сериализованный схемой ответа
+        """
+        cached = await self.lookup(name, models, params)
+        if cached.body is not None:
+            return json_response(cached.body)
+
+        async def build_and_store() -> str:
+            body = schema.model_validate(await build()).model_dump_json()
+            await self.store(cached, body)
+            return body
+
+        if self.flights is None or cached.key is None:
+            return json_response(await build_and_store())
+
+        key = cached.key
+
+        async def recheck() -> str | None:
+            try:
+                return await cast(Awaitable[str | None], self.redis.get(key))
+            except RedisError as e:
+                logger.warning(f"Unable to read cached response: {e}")
+                return None
+
+        return json_response(await self.flights.do(key, build_and_store, recheck))
+
+    async def lookup(
+        self, name: str, models: Sequence[type[Base]], params: dict[str, Any]
+    ) -> CachedResponse:
+        raw = json.dumps(params, sort_keys=True, default=str).encode()
+        try:
+            key, body = await VERSIONED_GET(
+                self.redis,
+                [ModelVersions.key(model) for model in models],
+                [f"response:{name}", hashlib.sha1(raw).hexdigest()],
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read cached response: {e}")
+            return CachedResponse(None, None)
+        return CachedResponse(key, body)
+
+    async def store(self, cached: CachedResponse, body: str) -> None:
+        """
+        Ключ получен в lookup: версии в нём прочитаны до запроса в БД,
+        поэтому ответ, собранный во время записи, сохраняется уже под
+        устаревшей версией
+        """
+        if cached.key is None:
+            return
+        try:
+            await self.redis.set(cached.key, body, ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Unable to cache response: {e}")
+
+
+def json_response(body: str) -> Response:
+    return Response(body, media_type="application/json")
@@ -1,11 +1,12 @@
+import math
 import uuid
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.api.deps import SessionDep, SettingsDep, UserServiceDep
-from app.core.exceptions import UserAlreadyExistsError
+from app.api.deps import LoginThrottleDep, SessionDep, SettingsDep, UserServiceDep
+from app.core.exceptions import PasswordHasherBusyError, UserAlreadyExistsError
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -18,6 +19,14 @@ from app.schemas.user import UserCreate, UserPublic
 router = APIRouter()
 
 
+def password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password checks, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED
 )
@@ -32,12 +41,16 @@ async def register(
         return await service.create(session, user_in)
     except UserAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Email already registered")
+    except PasswordHasherBusyError:
+        raise password_hasher_busy()
 
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     session: SessionDep,
     service: UserServiceDep,
+    throttle: LoginThrottleDep,
     settings: SettingsDep,
     form: OAuth2PasswordRequestForm = Depends(),
 ) -> Token:
@@ -46,16 +59,31 @@ async def login(
 
     Возвращает access и refresh токен
     """
-    user = await service.authenticate(
-        session,
-        form.username,
-        form.password,
-    )
+    ip = request.client.host if request.client else "unknown"
+    # Блокировка проверяется до поиска пользователя и bcrypt
+    retry_after = await throttle.retry_after(form.username, ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    try:
+        user = await service.authenticate(
+            session,
+            form.username,
+            form.password,
+        )
+    except PasswordHasherBusyError:
+        raise password_hasher_busy()
     if not user:
+        await throttle.record_failure(form.username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
+    await throttle.record_success(form.username)
     data = {"sub": str(user.id)}
     access_token = create_access_token(
         data, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,14 +1,19 @@
-import uuid
-from collections.abc import Sequence
-from math import ceil
-from typing import Literal
-
-from fastapi import APIRouter, HTTPException, Path, Query
-
-from app.api.deps import AdminUser, CategoryServiceDep, PostServiceDep, SessionDep
+from typing import Any, Literal
+
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+
+from app.api.deps import (
+    AdminUser,
+    CategoryServiceDep,
+    PostServiceDep,
+    ResponseCacheDep,
+    SessionDep,
+)
+from app.api.identifiers import identifier_column
+from app.api.pagination import build_page
 from app.core.constants import OrderDirection
+from app.core.exceptions import CategoryAlreadyExistsError
 from app.models.category import Category
-from app.models.post import Post
 from app.schemas.category import CategoryCreate, CategoryPublic, CategoryUpdate
 from app.schemas.pagination import Page
 from app.schemas.post import PostPublic
@@ -20,6 +25,7 @@ router = APIRouter()
 async def get_categories(
     session: SessionDep,
     service: CategoryServiceDep,
+    responses: ResponseCacheDep,
     page: int = Query(1, ge=1, le=10000),
     order_by: Literal["name", "date_created"] = Query(
         "date_created", description="Поле сортировки: name, date_created"
@@ -30,7 +36,13 @@ async def get_categories(
     order_dir: OrderDirection = Query(
         OrderDirection.ASC, description="Направление сортировки"
     ),
-) -> dict[str, Sequence[Category] | int]:
+    cursor: str | None = Query(
+        None, description="Курсор из next_cursor/prev_cursor (keyset-пагинация)"
+    ),
+    with_total: bool = Query(
+        True, description="Считать общее количество элементов (total и pages)"
+    ),
+) -> Response:
     """
     Получение всех категорий постранично
     """
@@ -40,22 +52,34 @@ async def get_categories(
             status_code=400,
             detail=f"This column is not sortable or does not exist: {order_by}",
         )
-    items, total = await service.paginate(
-        session=session,
-        page=page,
-        size=size,
-        order_by=column,
-        order_dir=order_dir,
-    )
-    pages = ceil(total / size) if total else 1
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": pages,
-    }
+    async def build() -> dict[str, Any]:
+        return await build_page(
+            service.rows,
+            session,
+            page=page,
+            size=size,
+            order_by=column,
+            order_dir=order_dir,
+            cursor=cursor,
+            with_total=with_total,
+            projection=CategoryPublic,
+        )
+
+    return await responses.respond(
+        "categories",
+        [service.model],
+        {
+            "page": page,
+            "order_by": order_by,
+            "size": size,
+            "order_dir": order_dir,
+            "cursor": cursor,
+            "with_total": with_total,
+        },
+        Page[CategoryPublic],
+        build,
+    )
 
 
 @router.get("/{slug}/posts", response_model=Page[PostPublic])
@@ -64,37 +88,56 @@ async def get_posts_for_category(
     session: SessionDep,
     post_service: PostServiceDep,
     category_service: CategoryServiceDep,
+    responses: ResponseCacheDep,
     page: int = Query(1, ge=1, le=10000),
     size: int = Query(
         20, ge=1, le=100, description="Размер постов в запросе (Максимум 100)"
     ),
-) -> dict[str, Sequence[Post] | int]:
+    cursor: str | None = Query(
+        None, description="Курсор из next_cursor/prev_cursor (keyset-пагинация)"
+    ),
+    with_total: bool = Query(
+        True, description="Считать общее количество элементов (total и pages)"
+    ),
+) -> Response:
     """
     Получение списка постов для конкретной категории
     """
-    category = await category_service.get_by(session, category_service.model.slug, slug)
 
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    items, total = await post_service.paginate(
-        session,
-        post_service.model.category_id == category.id,
-        page=page,
-        size=size,
-        order_by=post_service.model.date_created,
-        order_dir=OrderDirection.DESC,
-    )
+    async def build() -> dict[str, Any]:
+        category = await category_service.rows.get_by(
+            session, category_service.model.slug, slug, projection=CategoryPublic
+        )
 
-    pages = ceil(total / size) if total else 1
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+
+        return await build_page(
+            post_service.rows,
+            session,
+            post_service.model.category_id == category.id,
+            page=page,
+            size=size,
+            order_by=post_service.model.date_created,
+            order_dir=OrderDirection.DESC,
+            cursor=cursor,
+            with_total=with_total,
+            projection=PostPublic,
+        )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": pages,
-    }
+    return await responses.respond(
+        "category-posts",
+        [category_service.model, post_service.model],
+        {
+            "slug": slug,
+            "page": page,
+            "size": size,
+            "cursor": cursor,
+            "with_total": with_total,
+        },
+        Page[PostPublic],
+        build,
+    )
 
 
 @router.post("", response_model=CategoryPublic)
@@ -107,13 +150,10 @@ async def create_category(
     """
     Создание категории
     """
-    existing_category = await service.get_by(
-        session, service.model.name, category_in.name
-    )
-    if existing_category:
+    try:
+        return await service.create(session, category_in)
+    except CategoryAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Category already exists")
-    category = await service.create(session, category_in)
-    return category
 
 
 @router.get("/{identifier}", response_model=CategoryPublic)
@@ -126,11 +166,8 @@ async def get_category(
     """
     Получение категории по UUID или slug
     """
-    try:
-        category_id = uuid.UUID(identifier)
-        category = await service.get(session, category_id)
-    except ValueError:
-        category = await service.get_by(session, service.model.slug, identifier)
+    column, value = identifier_column(service.model, identifier)
+    category = await service.get_by(session, column, value)
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -150,23 +187,18 @@ async def update_category(
     Обновление названия категории по UUID или slug
     """
     # TODO: Добавить также обновление slug
+    column, value = identifier_column(service.model, identifier)
     try:
-        category_id = uuid.UUID(identifier)
-        category = await service.get(session, category_id)
-    except ValueError:
-        category = await service.get_by(session, service.model.slug, identifier)
-
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    exists_category = await service.get_by(
-        session, service.model.name, category_in.name
-    )
-    if exists_category:
+        category = await service.update_by(session, column, value, category_in)
+    except CategoryAlreadyExistsError:
         raise HTTPException(
             status_code=400,
-            detail=f"Category with this name already exists: {exists_category.name}",
+            detail=f"Category with this name already exists: {category_in.name}",
         )
-    category = await service.update(session, category, category_in)
+
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+
     return category
 
 
@@ -180,14 +212,10 @@ async def delete_category(
     """
     Удаление категории по UUID или slug
     """
-    try:
-        category_id = uuid.UUID(identifier)
-        category = await service.get(session, category_id)
-    except ValueError:
-        category = await service.get_by(session, service.model.slug, identifier)
+    column, value = identifier_column(service.model, identifier)
+    category = await service.remove_by(session, column, value)
 
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    category = await service.remove(session, category.id)
     return category
@@ -1,7 +1,22 @@
 from fastapi import APIRouter
 
-from app.api.deps import SettingsDep
-from app.schemas.common import HealthResponse
+from app.api.deps import AdminUser, SettingsDep
+from app.core.local_limit import get_circuit_breaker
+from app.core.sanitizer import get_sanitizer_pool
+from app.core.security import password_hasher, token_cache
+from app.core.single_flight import get_single_flight
+from app.db.record_cache import get_record_cache
+from app.db.session import get_async_engine, get_pool_stats
+from app.schemas.common import (
+    CircuitBreakerStats,
+    HealthResponse,
+    PasswordHasherStats,
+    PoolStats,
+    RecordCacheStats,
+    SanitizerStats,
+    SingleFlightStats,
+    TokenCacheStats,
+)
 
 router = APIRouter()
 
@@ -16,3 +31,59 @@ async def health_check(
     Возвращает текущий статус, версию и окружение сервиса API.
     """
     return HealthResponse(status="ok", env=settings.ENV, version=settings.VERSION)
+
+
+@router.get("/db-pool", response_model=PoolStats)
+async def db_pool_stats(_: AdminUser) -> PoolStats:
+    """
+    Статистика пула соединений с базой данных текущего воркера.
+    """
+    return get_pool_stats(get_async_engine())
+
+
+@router.get("/rate-limit-breaker", response_model=CircuitBreakerStats)
+async def rate_limit_breaker_stats(_: AdminUser) -> CircuitBreakerStats:
+    """
+    Состояние предохранителя обращений rate limit к Redis текущего воркера.
+    """
+    return get_circuit_breaker().stats()
+
+
+@router.get("/token-cache", response_model=TokenCacheStats)
+async def token_cache_stats(_: AdminUser) -> TokenCacheStats:
+    """
+    Статистика кэша проверенных JWT текущего воркера.
+    """
+    return token_cache.stats()
+
+
+@router.get("/password-hasher", response_model=PasswordHasherStats)
+async def password_hasher_stats(_: AdminUser) -> PasswordHasherStats:
+    """
+    Состояние пула хэширования паролей текущего воркера.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/sanitizer", response_model=SanitizerStats)
+async def sanitizer_stats(_: AdminUser) -> SanitizerStats:
+    """
+    Состояние очистки HTML текущего воркера.
+    """
+    return get_sanitizer_pool().stats()
+
+
+@router.get("/record-cache", response_model=RecordCacheStats)
+async def record_cache_stats(_: AdminUser) -> RecordCacheStats:
+    """
+    Попадания и промахи кэша записей текущего воркера.
+    """
+    return get_record_cache().stats()
+
+
+@router.get("/single-flight", response_model=SingleFlightStats)
+async def single_flight_stats(_: AdminUser) -> SingleFlightStats:
+    """
+    Схлопнутые загрузки при промахах кэшей текущего воркера.
+    """
+    return get_single_flight().stats()
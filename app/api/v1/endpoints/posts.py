@@ -1,15 +1,22 @@
-import uuid
-from collections.abc import Sequence
-from math import ceil
-from typing import Literal
+from typing import Any, Literal
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Response
+from sqlalchemy import Row
 
-from app.api.deps import AdminUser, PostServiceDep, SessionDep
+from app.api.deps import AdminUser, PostServiceDep, ResponseCacheDep, SessionDep
+from app.api.identifiers import identifier_column
+from app.api.pagination import build_page
 from app.core.constants import OrderDirection
+from app.core.exceptions import ContentTooLargeError, InvalidCursorError
 from app.models.post import Post
 from app.schemas.pagination import Page
-from app.schemas.post import PostContent, PostCreate, PostPublic, PostUpdate
+from app.schemas.post import (
+    PostContent,
+    PostCreate,
+    PostPublic,
+    PostSearchHit,
+    PostUpdate,
+)
 
 router = APIRouter()
 
@@ -18,6 +25,7 @@ router = APIRouter()
 async def get_posts(
     session: SessionDep,
     service: PostServiceDep,
+    responses: ResponseCacheDep,
     page: int = Query(1, ge=1, le=10000),
     order_by: Literal["title", "date_created"] = Query(
         "date_created", description="Поле сортировки: title, date_created"
@@ -28,7 +36,13 @@ async def get_posts(
     order_dir: OrderDirection = Query(
         OrderDirection.ASC, description="Направление сортировки"
     ),
-) -> dict[str, Sequence[Post] | int]:
+    cursor: str | None = Query(
+        None, description="Курсор из next_cursor/prev_cursor (keyset-пагинация)"
+    ),
+    with_total: bool = Query(
+        True, description="Считать общее количество элементов (total и pages)"
+    ),
+) -> Response:
     """
     Получение всех постов постранично, а так же с выбранной сортировкой
     """
@@ -38,21 +52,64 @@ async def get_posts(
             status_code=400,
             detail=f"This column is not sortable or does not exist: {order_by}",
         )
-    items, total = await service.paginate(
-        session=session,
-        page=page,
-        size=size,
-        order_by=column,
-        order_dir=order_dir,
+
+    async def build() -> dict[str, Any]:
+        return await build_page(
+            service.rows,
+            session,
+            page=page,
+            size=size,
+            order_by=column,
+            order_dir=order_dir,
+            cursor=cursor,
+            with_total=with_total,
+            projection=PostPublic,
+        )
+
+    return await responses.respond(
+        "posts",
+        [service.model],
+        {
+            "page": page,
+            "order_by": order_by,
+            "size": size,
+            "order_dir": order_dir,
+            "cursor": cursor,
+            "with_total": with_total,
+        },
+        Page[PostPublic],
+        build,
     )
-    pages = ceil(total / size) if total else 1
+
+
+@router.get("/search", response_model=Page[PostSearchHit])
+async def search_posts(
+    session: SessionDep,
+    service: PostServiceDep,
+    q: str = Query(..., min_length=2, max_length=200, description="Поисковый запрос"),
+    size: int = Query(
+        20, ge=1, le=100, description="Размер постов в запросе (Максимум 100)"
+    ),
+    cursor: str | None = Query(None, description="Курсор из next_cursor"),
+) -> dict[str, Any]:
+    """
+    Полнотекстовый поиск постов по заголовку и тексту.
+
+    Результаты отсортированы по релевантности, найденные слова подсвечены
+    в snippet.
+    """
+    try:
+        items, next_cursor = await service.search(session, q, size=size, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": None,
+        "page": None,
         "size": size,
-        "pages": pages,
+        "pages": None,
+        "next_cursor": next_cursor,
     }
 
 
@@ -61,11 +118,13 @@ async def get_post(
     slug: str,
     session: SessionDep,
     service: PostServiceDep,
-) -> Post:
+) -> Row[Any]:
     """
     Получение детальной информации о конкретном посте по slug
     """
-    post = await service.get_by(session, service.model.slug, slug)
+    post = await service.rows.get_by(
+        session, service.model.slug, slug, projection=PostContent
+    )
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -77,7 +136,10 @@ async def get_post(
 async def create_post(
     post_in: PostCreate, session: SessionDep, service: PostServiceDep, _: AdminUser
 ) -> Post:
-    post = await service.create(session, post_in)
+    try:
+        post = await service.create(session, post_in)
+    except ContentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     return post
 
 
@@ -90,16 +152,15 @@ async def update_post(
     identifier: str = Path(..., description="UUID или slug поста"),
 ) -> Post:
     # TODO: Добавить также обновление slug
+    column, value = identifier_column(service.model, identifier)
     try:
-        post_id = uuid.UUID(identifier)
-        post = await service.get(session, post_id)
-    except ValueError:
-        post = await service.get_by(session, service.model.slug, identifier)
+        post = await service.update_by(session, column, value, post_in)
+    except ContentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    post = await service.update(session, post, post_in)
     return post
 
 
@@ -110,14 +171,10 @@ async def delete_post(
     _: AdminUser,
     identifier: str = Path(..., description="UUID или slug поста"),
 ) -> Post | None:
-    try:
-        post_id = uuid.UUID(identifier)
-        post = await service.get(session, post_id)
-    except ValueError:
-        post = await service.get_by(session, service.model.slug, identifier)
+    column, value = identifier_column(service.model, identifier)
+    post = await service.remove_by(session, column, value)
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    post = await service.remove(session, post.id)
     return post
@@ -3,13 +3,13 @@ from pydantic import EmailStr
 
 from app.api.deps import AdminUser, CurrentUser, SessionDep, UserServiceDep
 from app.models.user import User
-from app.schemas.user import AdminUserUpdate, UserPublic
+from app.schemas.user import AdminUserUpdate, UserPrincipal, UserPublic
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserPublic)
-async def get_current_user(current_user: CurrentUser) -> User:
+async def get_current_user(current_user: CurrentUser) -> UserPrincipal:
     """
     Получение данных текущего авторизованного пользователя
     """
@@ -27,8 +27,7 @@ async def change_user_role(
     """
     Изменение роли для конкретного пользователя по email
     """
-    user = await service.get_by(session, service.model.email, email)
+    user = await service.admin_update(session, email, user_in)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user = await service.admin_update(session, user, user_in)
     return user
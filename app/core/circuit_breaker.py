@@ -0,0 +1,97 @@
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from app.core.constants import CircuitState
+from app.schemas.common import CircuitBreakerStats
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для обращений к внешнему сервису.
+
+    После failure_threshold ошибок подряд размыкается, и вызовы не делаются
+    reset_timeout секунд. Затем пропускает один пробный вызов: успех
+    замыкает цепь, ошибка снова размыкает.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """
+        Можно ли сейчас обратиться к сервису
+        """
+        if self.state is CircuitState.OPEN and self.retry_after() == 0:
+            self._set_state(CircuitState.HALF_OPEN)
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_after(self) -> float:
+        """
+        Через сколько секунд будет пробный вызов
+        """
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(self.opened_at + self.reset_timeout - self.clock(), 0.0)
+
+    def record_success(self) -> None:
+        self._probing = False
+        self.failures = 0
+        if self.state is not CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def release_probe(self) -> None:
+        """
+        Вызов завершился без результата: следующий вызов снова пробный
+        """
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.opened_at = self.clock()
+            if self.state is not CircuitState.OPEN:
+                self.open_count += 1
+                self._set_state(CircuitState.OPEN)
+
+    def stats(self) -> CircuitBreakerStats:
+        return CircuitBreakerStats(
+            name=self.name,
+            state=self.state,
+            failures=self.failures,
+            open_count=self.open_count,
+            rejected=self.rejected,
+            retry_after=self.retry_after(),
+        )
+
+    def _set_state(self, state: CircuitState) -> None:
+        logger.warning(
+            f"Circuit breaker {self.name}: {self.state.value} -> {state.value}"
+        )
+        self.state = state
@@ -3,7 +3,14 @@ from pydantic import EmailStr, computed_field
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings
 
-from app.core.constants import Environment
+from app.core.constants import (
+    CountStrategy,
+    Environment,
+    RateLimit,
+    RateLimitAlgorithm,
+    RateLimitFailurePolicy,
+    SanitizerBackend,
+)
 
 
 class Settings(BaseSettings):
@@ -22,10 +29,29 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "changethis"
     POSTGRES_DB: str = "db"
 
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_PREWARM: int = 0
+
     SECRET_KEY: str = "changethis"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Блокировка входа после серии неудачных попыток по email и по IP:
+    # base_lockout секунд, удваивается с каждой ошибкой до max_lockout
+    LOGIN_THROTTLE_EMAIL_ATTEMPTS: int = 5
+    LOGIN_THROTTLE_IP_ATTEMPTS: int = 20
+    LOGIN_THROTTLE_BASE_LOCKOUT: float = 1.0
+    LOGIN_THROTTLE_MAX_LOCKOUT: int = 900
+    # Через сколько секунд без ошибок счётчик сбрасывается
+    LOGIN_THROTTLE_WINDOW: int = 900
+    # Потоков для bcrypt и сколько вызовов может ждать в очереди до 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # Сколько проверенных токенов держать в памяти воркера
+    TOKEN_CACHE_SIZE: int = 10_000
 
     FIRST_SUPERUSER: EmailStr = "admin@example.com"
     FIRST_SUPERUSER_PASSWORD: str = "changethis"
@@ -51,11 +77,74 @@ class Settings(BaseSettings):
         "a": ["href", "title"],
         "img": ["alt"],
     }
+    SANITIZER_BACKEND: SanitizerBackend = SanitizerBackend.BLEACH
+    # content_html длиннее отклоняется до разбора, символов
+    SANITIZER_MAX_LENGTH: int = 2_000_000
+    # Тексты от этой длины чистятся в пуле процессов, короче — на месте
+    SANITIZER_OFFLOAD_LENGTH: int = 16_384
+    SANITIZER_WORKERS: int = 2
+    # Сколько символов очищенного HTML держать в кэше воркера
+    SANITIZER_CACHE_LENGTH: int = 16_000_000
 
     REDIS_HOST: str = "redis"
     REDIS_PORT: str = "6379"
+    REDIS_MAX_CONNECTIONS: int = 50
 
+    # Лимит группы default, для остальных групп — RATE_LIMIT_GROUPS
     MAX_REQUESTS_PER_MINUTE: int = 60
+    RATE_LIMIT_ALGORITHM: RateLimitAlgorithm = RateLimitAlgorithm.SLIDING_WINDOW_COUNTER
+    # Префикс пути (без /api/v1) -> группа, побеждает самый длинный префикс
+    RATE_LIMIT_ROUTES: dict[str, str] = {
+        "/auth/login": "auth",
+        "/auth/register": "auth",
+        "/auth/refresh": "auth",
+    }
+    RATE_LIMIT_GROUPS: dict[str, RateLimit] = {
+        "auth": RateLimit(limit=10, window=60),
+    }
+    # Таймаут вызова Redis из лимитера, с
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.1
+    # Что делать с запросами, пока Redis недоступен
+    RATE_LIMIT_FAILURE_POLICY: RateLimitFailurePolicy = RateLimitFailurePolicy.FAIL_OPEN
+    RATE_LIMIT_BREAKER_THRESHOLD: int = 5
+    RATE_LIMIT_BREAKER_RESET_TIMEOUT: float = 10.0
+    # Локальный уровень: общие для воркеров хоста счётчики в shared memory
+    RATE_LIMIT_LOCAL_ENABLED: bool = True
+    RATE_LIMIT_LOCAL_PATH: str = "/dev/shm/backend-rate-limit"
+    RATE_LIMIT_LOCAL_SLOTS: int = 65536
+    # Без Redis пропускается запрос, если остаток не меньше этой доли лимита
+    RATE_LIMIT_LOCAL_HEADROOM: float = 0.5
+    # Без Redis отклоняется клиент, приславший с хоста столько лимитов за окно
+    RATE_LIMIT_LOCAL_REJECT_FACTOR: float = 2.0
+    RATE_LIMIT_LOCAL_BATCH: int = 10
+    RATE_LIMIT_LOCAL_FLUSH_INTERVAL: float = 10.0
+
+    # Кэш пользователей для авторизации: в памяти воркера и в Redis.
+    # Без Redis изменения роли и статуса видны другим воркерам через TTL
+    PRINCIPAL_CACHE_TTL: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_REDIS: bool = True
+    PRINCIPAL_CACHE_REDIS_TTL: int = 300
+
+    # Кэш записей для get_by постов и категорий (в том числе 404):
+    # в памяти воркера и в Redis, сбрасывается при записи в модель
+    RECORD_CACHE_TTL: float = 30.0
+    RECORD_CACHE_SIZE: int = 10_000
+    RECORD_CACHE_REDIS: bool = True
+    RECORD_CACHE_REDIS_TTL: int = 300
+
+    # Одинаковые промахи кэша в воркере схлопываются в одну загрузку,
+    # с блокировкой в Redis — одна загрузка на все воркеры
+    SINGLE_FLIGHT_REDIS_LOCK: bool = True
+    SINGLE_FLIGHT_LOCK_TIMEOUT: float = 5.0
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.05
+
+    # Сколько хранить готовые ответы публичных списков, с. Запись в модель
+    # сбрасывает их раньше через смену версии
+    RESPONSE_CACHE_TTL: int = 300
+
+    PAGINATION_COUNT_STRATEGY: CountStrategy = CountStrategy.CACHED
+    PAGINATION_COUNT_CACHE_TTL: int = 60
 
     @computed_field(return_type=str)
     def SQLALCHEMY_DATABASE_URI(self) -> str:
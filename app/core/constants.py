@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import NamedTuple
 
 
 class Environment(str, Enum):
@@ -15,3 +16,43 @@ class UserRole(str, Enum):
 class OrderDirection(str, Enum):
     ASC = "asc"
     DESC = "desc"
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+
+
+class RateLimitAlgorithm(str, Enum):
+    FIXED_WINDOW = "fixed_window"
+    SLIDING_WINDOW_LOG = "sliding_window_log"
+    SLIDING_WINDOW_COUNTER = "sliding_window_counter"
+    TOKEN_BUCKET = "token_bucket"
+
+
+class RateLimit(NamedTuple):
+    """
+    Не больше limit запросов за window секунд
+    """
+
+    limit: int
+    window: int
+
+
+class RateLimitFailurePolicy(str, Enum):
+    # Пропускать запросы по лимиту в памяти воркера
+    FAIL_OPEN = "fail_open"
+    # Отклонять запросы
+    FAIL_CLOSED = "fail_closed"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class SanitizerBackend(str, Enum):
+    BLEACH = "bleach"
+    NH3 = "nh3"
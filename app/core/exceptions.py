@@ -1,2 +1,25 @@
 class UserAlreadyExistsError(Exception):
     pass
+
+
+class CategoryAlreadyExistsError(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class RecordNotFoundError(Exception):
+    pass
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class ContentTooLargeError(Exception):
+    def __init__(self, length: int, max_length: int) -> None:
+        super().__init__(f"Content is too large: {length} > {max_length} characters")
+        self.length = length
+        self.max_length = max_length
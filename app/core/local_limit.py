@@ -0,0 +1,288 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from redis import asyncio as aioredis
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import Settings
+from app.core.constants import RateLimit
+from app.core.rate_limit import (
+    CircuitBreakerLimiter,
+    RateLimiter,
+    RateLimitResult,
+    make_rate_limiter,
+)
+
+
+class SharedCounters:
+    """
+    Счётчики запросов в окне, общие для всех воркеров на хосте.
+
+    Таблица фиксированного размера в mmap-файле (по умолчанию в /dev/shm),
+    слот — хэш ключа, конец окна и число запросов. Слоты обновляются без
+    блокировок: при гонке воркеров часть инкрементов может потеряться, это
+    лишь занижает оценку, точное решение всё равно принимает Redis.
+    """
+
+    SLOT = struct.Struct("<QqI4x")
+    PROBES = 4
+
+    def __init__(self, path: str, slots: int) -> None:
+        self.slots = slots
+        size = slots * self.SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.buffer = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # hash() рандомизирован в каждом процессе, нужен стабильный
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def incr(self, key: str, window_end: int, now: float) -> int | None:
+        """
+        Учитывает запрос в окне, которое заканчивается в window_end.
+        None — для ключа не нашлось свободного слота.
+        """
+        key_hash = self._hash(key)
+        start = key_hash % self.slots
+        for probe in range(self.PROBES):
+            offset = (start + probe) % self.slots * self.SLOT.size
+            slot_hash, slot_end, count = self.SLOT.unpack_from(self.buffer, offset)
+            if slot_hash == key_hash:
+                count = count + 1 if slot_end == window_end else 1
+            elif slot_hash == 0 or slot_end <= now:
+                count = 1
+            else:
+                continue
+            self.SLOT.pack_into(self.buffer, offset, key_hash, window_end, count)
+            return int(count)
+        return None
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+@dataclass
+class SyncState:
+    """
+    Что этот воркер знает о ключе после последнего обращения к Redis
+    """
+
+    window_end: int
+    remaining: int
+    reset_at: float
+    host_count: int
+    unsynced: int
+    synced_at: float
+    # До этого момента Redis всё равно отклонит запрос
+    retry_at: float = 0.0
+
+
+class TwoTierLimiter(RateLimiter):
+    """
+    Локальный уровень перед Redis.
+
+    Клиента, который только с этого хоста прислал за окно больше
+    reject_factor лимитов, отклоняет без Redis, как и клиента, которому Redis
+    уже отказал, до его retry_after. Клиента, далёкого от лимита
+    по последним данным Redis, пропускает локально и досылает такие запросы
+    в Redis пачками через record. В Redis за решением идут только клиенты
+    около своего лимита.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        counters: SharedCounters,
+        headroom: float,
+        reject_factor: float,
+        batch: int,
+        flush_interval: float,
+        max_keys: int = 10_000,
+    ) -> None:
+        self.limiter = limiter
+        self.counters = counters
+        self.headroom = headroom
+        self.reject_factor = reject_factor
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.states: OrderedDict[str, SyncState] = OrderedDict()
+
+    async def hit(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        window_end = (math.floor(now / rate.window) + 1) * rate.window
+        host_count = self.counters.incr(key, window_end, now)
+        if host_count is None:
+            return await self.limiter.hit(redis, key, rate, now)
+
+        if host_count > rate.limit * self.reject_factor:
+            reset_after = window_end - now
+            return RateLimitResult(
+                allowed=False,
+                limit=rate.limit,
+                remaining=0,
+                reset_after=reset_after,
+                retry_after=reset_after,
+            )
+
+        state = self.states.get(key)
+        if state is not None and now < state.retry_at:
+            return RateLimitResult(
+                allowed=False,
+                limit=rate.limit,
+                remaining=0,
+                reset_after=max(state.reset_at - now, 0.0),
+                retry_after=state.retry_at - now,
+            )
+
+        if state is not None and state.window_end == window_end:
+            # Остаток минус запросы с этого хоста (всех воркеров) после синхронизации
+            remaining = state.remaining - (host_count - state.host_count)
+            if remaining >= rate.limit * self.headroom:
+                state.unsynced += 1
+                if (
+                    state.unsynced >= self.batch
+                    or now - state.synced_at >= self.flush_interval
+                ):
+                    await self._flush(redis, key, rate, state, host_count, now)
+                return RateLimitResult(
+                    allowed=True,
+                    limit=rate.limit,
+                    remaining=remaining,
+                    reset_after=max(state.reset_at - now, 0.0),
+                    retry_after=0.0,
+                )
+
+        if state is not None and state.unsynced:
+            await self.limiter.record(redis, key, rate, state.unsynced, now)
+        result = await self.limiter.hit(redis, key, rate, now)
+        self._remember(
+            key,
+            SyncState(
+                window_end=window_end,
+                remaining=result.remaining,
+                reset_at=now + result.reset_after,
+                host_count=host_count,
+                unsynced=0,
+                synced_at=now,
+                retry_at=0.0 if result.allowed else now + result.retry_after,
+            ),
+        )
+        return result
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        # record без локального уровня: сразу в общий лимитер
+        return await self.limiter._apply(redis, key, rate, now, cost, force)
+
+    async def _flush(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        state: SyncState,
+        host_count: int,
+        now: float,
+    ) -> None:
+        result = await self.limiter.record(redis, key, rate, state.unsynced, now)
+        state.remaining = result.remaining
+        state.reset_at = now + result.reset_after
+        state.host_count = host_count
+        state.unsynced = 0
+        state.synced_at = now
+
+    def _remember(self, key: str, state: SyncState) -> None:
+        self.states[key] = state
+        self.states.move_to_end(key)
+        # Вытесненные ключи теряют неотправленные запросы — оценка приблизительная
+        while len(self.states) > self.max_keys:
+            self.states.popitem(last=False)
+
+
+_limiter: RateLimiter | None = None
+_counters: SharedCounters | None = None
+_breaker: CircuitBreaker | None = None
+
+
+def init_rate_limiter(settings: Settings) -> RateLimiter:
+    """
+    Создаёт лимитер один раз на процесс (воркер), с локальным уровнем,
+    если он включён
+    """
+    global _limiter, _counters, _breaker
+
+    if _limiter is None:
+        _breaker = CircuitBreaker(
+            "rate-limit-redis",
+            failure_threshold=settings.RATE_LIMIT_BREAKER_THRESHOLD,
+            reset_timeout=settings.RATE_LIMIT_BREAKER_RESET_TIMEOUT,
+        )
+        _limiter = CircuitBreakerLimiter(
+            make_rate_limiter(settings.RATE_LIMIT_ALGORITHM),
+            _breaker,
+            timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            policy=settings.RATE_LIMIT_FAILURE_POLICY,
+        )
+        if settings.RATE_LIMIT_LOCAL_ENABLED:
+            path = settings.RATE_LIMIT_LOCAL_PATH
+            if not os.path.isdir(os.path.dirname(path)):
+                path = os.path.join(tempfile.gettempdir(), os.path.basename(path))
+            _counters = SharedCounters(path, settings.RATE_LIMIT_LOCAL_SLOTS)
+            _limiter = TwoTierLimiter(
+                _limiter,
+                _counters,
+                headroom=settings.RATE_LIMIT_LOCAL_HEADROOM,
+                reject_factor=settings.RATE_LIMIT_LOCAL_REJECT_FACTOR,
+                batch=settings.RATE_LIMIT_LOCAL_BATCH,
+                flush_interval=settings.RATE_LIMIT_LOCAL_FLUSH_INTERVAL,
+            )
+    return _limiter
+
+
+def close_rate_limiter() -> None:
+    global _limiter, _counters, _breaker
+
+    if _counters is not None:
+        _counters.close()
+    _limiter = None
+    _counters = None
+    _breaker = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    if _limiter is None:
+        raise RuntimeError("Rate limiter is not initialized")
+    return _limiter
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    if _breaker is None:
+        raise RuntimeError("Rate limiter is not initialized")
+    return _breaker
@@ -0,0 +1,107 @@
+import hashlib
+import math
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import Settings
+from app.core.redis import RedisScript
+
+# Оставшееся время самой долгой блокировки из KEYS, мс
+LOCKOUT_TTL = RedisScript(
+    """
+local ttl = 0
+for _, key in ipairs(KEYS) do
+    ttl = math.max(ttl, redis.call('PTTL', key))
+end
+return ttl
+"""
+)
+
+# Неудачная попытка: счётчики ошибок по email и IP, после порога —
+# блокировка с экспоненциально растущей длительностью
+RECORD_FAILURE = RedisScript(
+    """
+local window, base, max_lockout = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local lockout = 0
+for i = 1, #KEYS, 2 do
+    local count = redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], window)
+    local free = tonumber(ARGV[3 + (i + 1) / 2])
+    if count >= free then
+        local ttl = math.floor(math.min(base * 2 ^ (count - free), max_lockout))
+        redis.call('SET', KEYS[i + 1], 1, 'PX', string.format('%d', ttl))
+        lockout = math.max(lockout, ttl)
+    end
+end
+return lockout
+"""
+)
+
+
+class LoginThrottle:
+    """
+    Ограничение попыток входа по email и по IP.
+
+    После attempts неудачных попыток подряд ключ блокируется на
+    base_lockout секунд, каждая следующая ошибка удваивает блокировку
+    до max_lockout. Проверка блокировки — один вызов Redis до поиска
+    пользователя и bcrypt. Если Redis недоступен, вход не ограничивается.
+    """
+
+    def __init__(self, redis: aioredis.Redis, settings: Settings) -> None:
+        self.redis = redis
+        self.email_attempts = settings.LOGIN_THROTTLE_EMAIL_ATTEMPTS
+        self.ip_attempts = settings.LOGIN_THROTTLE_IP_ATTEMPTS
+        self.base_lockout = settings.LOGIN_THROTTLE_BASE_LOCKOUT
+        self.max_lockout = settings.LOGIN_THROTTLE_MAX_LOCKOUT
+        self.window = settings.LOGIN_THROTTLE_WINDOW
+
+    @staticmethod
+    def _keys(kind: str, value: str) -> tuple[str, str]:
+        digest = hashlib.sha1(value.strip().lower().encode()).hexdigest()
+        return f"login:fail:{kind}:{digest}", f"login:lock:{kind}:{digest}"
+
+    async def retry_after(self, email: str, ip: str) -> float:
+        """
+        Через сколько секунд можно снова пробовать войти, 0 — можно сейчас
+        """
+        _, email_lock = self._keys("email", email)
+        _, ip_lock = self._keys("ip", ip)
+        try:
+            ttl = await LOCKOUT_TTL(self.redis, [email_lock, ip_lock], [])
+        except RedisError as e:
+            logger.warning(f"Unable to check login throttle: {e}")
+            return 0.0
+        return max(int(ttl), 0) / 1000
+
+    async def record_failure(self, email: str, ip: str) -> float:
+        """
+        Учитывает неудачную попытку, возвращает длительность блокировки, с
+        """
+        try:
+            lockout = await RECORD_FAILURE(
+                self.redis,
+                [*self._keys("email", email), *self._keys("ip", ip)],
+                [
+                    self.window,
+                    math.ceil(self.base_lockout * 1000),
+                    self.max_lockout * 1000,
+                    self.email_attempts,
+                    self.ip_attempts,
+                ],
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to record failed login: {e}")
+            return 0.0
+        return int(lockout) / 1000
+
+    async def record_success(self, email: str) -> None:
+        """
+        Успешный вход сбрасывает ошибки по email, счётчик IP остаётся
+        """
+        try:
+            await self.redis.delete(*self._keys("email", email))
+        except RedisError as e:
+            logger.warning(f"Unable to reset login throttle: {e}")
@@ -1,26 +1,102 @@
-from collections.abc import Awaitable, Callable
+import math
 
-from fastapi import Request, status
-from starlette.responses import JSONResponse, Response
+from fastapi import status
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.constants import RateLimit
+from app.core.local_limit import get_rate_limiter
+from app.core.rate_limit import RateLimitResult
 from app.core.redis import get_redis_client
+from app.core.security import get_token_subject
 
 
-async def rate_limit_middleware(
-    request: Request, call_next: Callable[[Request], Awaitable[Response]]
-) -> Response:
-    redis = await get_redis_client()
-    ip = request.client.host if request.client else "unknown"
-    key = f"rate:{ip}"
-    count = await redis.incr(key)
-    if count == 1:
-        await redis.expire(key, 60)
-
-    if count > get_settings().MAX_REQUESTS_PER_MINUTE:
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={"detail": "Too many requests"},
+def get_route_group(path: str, settings: Settings) -> str:
+    """
+    Группа лимитов для пути: самый длинный подходящий префикс из
+    RATE_LIMIT_ROUTES, иначе default
+    """
+    matches = [
+        prefix for prefix in settings.RATE_LIMIT_ROUTES if path.startswith(prefix)
+    ]
+    if not matches:
+        return "default"
+    return settings.RATE_LIMIT_ROUTES[max(matches, key=len)]
+
+
+def get_rate_limit(group: str, settings: Settings) -> RateLimit:
+    return settings.RATE_LIMIT_GROUPS.get(
+        group, RateLimit(limit=settings.MAX_REQUESTS_PER_MINUTE, window=60)
+    )
+
+
+def get_client_identity(request: HTTPConnection) -> str:
+    """
+    Авторизованный пользователь по sub из JWT, иначе IP клиента
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        subject = get_token_subject(token)
+        if subject is not None:
+            return f"user:{subject}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+        "X-RateLimit-Reset": str(math.ceil(result.reset_after)),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(math.ceil(result.retry_after), 1))
+    return headers
+
+
+class RateLimitMiddleware:
+    """
+    Rate limit в виде чистого ASGI middleware.
+
+    В отличие от @app.middleware("http") (BaseHTTPMiddleware) не создаёт
+    на запрос отдельную задачу и поток для тела ответа: заголовки лимита
+    добавляются в сообщение http.response.start, тело идёт как есть,
+    в том числе потоковое.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        path = scope["path"].removeprefix(scope.get("root_path", ""))
+        group = get_route_group(path, settings)
+
+        result = await get_rate_limiter().hit(
+            get_redis_client(),
+            f"rate:{group}:{get_client_identity(HTTPConnection(scope))}",
+            get_rate_limit(group, settings),
         )
+        headers = rate_limit_headers(result)
+
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests"},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
 
-    return await call_next(request)
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,362 @@
+import asyncio
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.constants import RateLimit, RateLimitAlgorithm, RateLimitFailurePolicy
+from app.core.redis import RedisScript, incr_with_ttl
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    # Через сколько секунд лимит восстановится полностью
+    reset_after: float
+    # Через сколько секунд можно повторить отклонённый запрос
+    retry_after: float
+
+
+SLIDING_WINDOW_LOG = RedisScript(
+    """
+local now, window, limit = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost, force = tonumber(ARGV[5]), ARGV[6] == '1'
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if force or count + cost <= limit then
+    for i = 1, cost do
+        redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+    end
+    count = count + cost
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+local newest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+return {allowed, count, oldest[2] or tostring(now), newest[2] or tostring(now)}
+"""
+)
+
+SLIDING_WINDOW_COUNTER = RedisScript(
+    """
+local window, limit, weight = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost, force = tonumber(ARGV[4]), ARGV[5] == '1'
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local allowed = 0
+if force or previous * weight + current < limit then
+    current = redis.call('INCRBY', KEYS[1], cost)
+    if current == cost then
+        redis.call('EXPIRE', KEYS[1], window * 2)
+    end
+    allowed = 1
+end
+return {allowed, current, previous}
+"""
+)
+
+TOKEN_BUCKET = RedisScript(
+    """
+local now, rate, capacity = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost, force = tonumber(ARGV[4]), ARGV[5] == '1'
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if force or tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+)
+
+
+class RateLimiter(ABC):
+    """
+    Алгоритм ограничения частоты запросов.
+
+    hit учитывает один запрос по ключу и решает, пропускать ли его,
+    record без проверки учитывает пачку уже пропущенных запросов.
+    Проверка и обновление состояния — один атомарный вызов в Redis.
+    """
+
+    async def hit(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        return await self._apply(redis, key, rate, now, cost=1, force=False)
+
+    async def record(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        count: int,
+        now: float | None = None,
+    ) -> RateLimitResult:
+        now = time.time() if now is None else now
+        return await self._apply(redis, key, rate, now, cost=count, force=True)
+
+    @abstractmethod
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult: ...
+
+
+class FixedWindowLimiter(RateLimiter):
+    """
+    Счётчик на каждое окно фиксированной длины. Дёшево, но на стыке окон
+    пропускает до двух лимитов подряд.
+    """
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        window_index, elapsed = divmod(now, rate.window)
+        count = await incr_with_ttl(
+            redis, f"{key}:{int(window_index)}", rate.window, cost
+        )
+        reset_after = rate.window - elapsed
+        return RateLimitResult(
+            allowed=force or count <= rate.limit,
+            limit=rate.limit,
+            remaining=max(rate.limit - count, 0),
+            reset_after=reset_after,
+            retry_after=reset_after if count > rate.limit else 0.0,
+        )
+
+
+class SlidingWindowLogLimiter(RateLimiter):
+    """
+    Точное скользящее окно: время каждого запроса хранится в ZSET.
+    Память — O(limit) на ключ.
+    """
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        allowed, count, oldest, newest = await SLIDING_WINDOW_LOG(
+            redis,
+            [key],
+            [now, rate.window, rate.limit, uuid.uuid4().hex, cost, int(force)],
+        )
+        retry_after = float(oldest) + rate.window - now
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=rate.limit,
+            remaining=max(rate.limit - int(count), 0),
+            reset_after=float(newest) + rate.window - now,
+            retry_after=0.0 if allowed else max(retry_after, 0.0),
+        )
+
+
+class SlidingWindowCounterLimiter(RateLimiter):
+    """
+    Приближённое скользящее окно: счётчики текущего и предыдущего окна,
+    предыдущий учитывается с весом непрошедшей части окна. Два ключа
+    на клиента вместо журнала запросов.
+    """
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        window_index, elapsed = divmod(now, rate.window)
+        weight = (rate.window - elapsed) / rate.window
+        allowed, current, previous = await SLIDING_WINDOW_COUNTER(
+            redis,
+            [f"{key}:{int(window_index)}", f"{key}:{int(window_index) - 1}"],
+            [rate.window, rate.limit, weight, cost, int(force)],
+        )
+        estimated = previous * weight + current
+
+        retry_after = 0.0
+        if not allowed:
+            # Когда вес предыдущего окна упадёт настолько, что запрос пройдёт,
+            # но не позже начала следующего окна
+            retry_after = rate.window - elapsed
+            if previous:
+                excess = estimated - rate.limit
+                retry_after = min(retry_after, excess * rate.window / previous)
+
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=rate.limit,
+            remaining=max(math.floor(rate.limit - estimated), 0),
+            reset_after=2 * rate.window - elapsed if current else weight * rate.window,
+            retry_after=retry_after,
+        )
+
+
+class TokenBucketLimiter(RateLimiter):
+    """
+    Ведро на limit токенов, пополняется со скоростью limit / window в секунду.
+    Разрешает короткие всплески до limit и ровный поток после них.
+    """
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        allowed, tokens = await TOKEN_BUCKET(
+            redis, [key], [now, rate.limit / rate.window, rate.limit, cost, int(force)]
+        )
+        return self._result(rate, bool(allowed), float(tokens))
+
+    @staticmethod
+    def _result(rate: RateLimit, allowed: bool, tokens: float) -> RateLimitResult:
+        refill = rate.limit / rate.window
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate.limit,
+            remaining=max(math.floor(tokens), 0),
+            reset_after=(rate.limit - tokens) / refill,
+            retry_after=0.0 if allowed else (1 - tokens) / refill,
+        )
+
+
+class InMemoryLimiter(TokenBucketLimiter):
+    """
+    Token bucket в памяти воркера, без Redis. Лимит считается отдельно
+    в каждом воркере, поэтому суммарно пропускает больше, чем Redis.
+    """
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        tokens, ts = self.buckets.pop(key, (float(rate.limit), now))
+        tokens = min(rate.limit, tokens + max(now - ts, 0) * rate.limit / rate.window)
+        allowed = force or tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = (tokens, now)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return self._result(rate, allowed, tokens)
+
+
+class CircuitBreakerLimiter(RateLimiter):
+    """
+    Обращения лимитера к Redis с таймаутом и предохранителем.
+
+    Ошибка или таймаут Redis, как и разомкнутый предохранитель, не задерживают
+    запрос: по политике fail_open решение принимает лимитер в памяти воркера,
+    по fail_closed запрос отклоняется.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        breaker: CircuitBreaker,
+        timeout: float,
+        policy: RateLimitFailurePolicy,
+        fallback: RateLimiter | None = None,
+    ) -> None:
+        self.limiter = limiter
+        self.breaker = breaker
+        self.timeout = timeout
+        self.policy = policy
+        self.fallback = fallback or InMemoryLimiter()
+
+    async def _apply(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        rate: RateLimit,
+        now: float,
+        cost: int,
+        force: bool,
+    ) -> RateLimitResult:
+        if self.breaker.allow():
+            try:
+                async with asyncio.timeout(self.timeout):
+                    result = await self.limiter._apply(
+                        redis, key, rate, now, cost, force
+                    )
+            except (RedisError, OSError, TimeoutError) as e:
+                self.breaker.record_failure()
+                logger.warning(f"Rate limiter is unavailable: {e!r}")
+            except BaseException:
+                # Отмена запроса клиентом или ошибка не Redis ничего не говорят
+                # о его доступности: пробный вызов освобождается без ошибки
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+        if self.policy is RateLimitFailurePolicy.FAIL_CLOSED and not force:
+            retry_after = max(self.breaker.retry_after(), 1.0)
+            return RateLimitResult(
+                allowed=False,
+                limit=rate.limit,
+                remaining=0,
+                reset_after=retry_after,
+                retry_after=retry_after,
+            )
+        return await self.fallback._apply(redis, key, rate, now, cost, force)
+
+
+def make_rate_limiter(algorithm: RateLimitAlgorithm) -> RateLimiter:
+    limiters: dict[RateLimitAlgorithm, type[RateLimiter]] = {
+        RateLimitAlgorithm.FIXED_WINDOW: FixedWindowLimiter,
+        RateLimitAlgorithm.SLIDING_WINDOW_LOG: SlidingWindowLogLimiter,
+        RateLimitAlgorithm.SLIDING_WINDOW_COUNTER: SlidingWindowCounterLimiter,
+        RateLimitAlgorithm.TOKEN_BUCKET: TokenBucketLimiter,
+    }
+    return limiters[algorithm]()
@@ -1,13 +1,91 @@
+import hashlib
+from collections.abc import Awaitable, Sequence
+from typing import Any, cast
+
 from redis import asyncio as aioredis
+from redis.exceptions import NoScriptError
+
+from app.core.config import Settings, get_settings
+
+_redis: aioredis.Redis | None = None
+
+
+class RedisScript:
+    """
+    Lua-скрипт, который выполняется атомарно за один запрос к Redis.
 
-from app.core.config import get_settings
+    Вызывается по SHA, текст отправляется только если скрипта нет
+    в кэше сервера (после рестарта или SCRIPT FLUSH).
+    """
 
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.sha = hashlib.sha1(text.encode()).hexdigest()
 
-async def get_redis_client() -> aioredis.Redis:
-    settings = get_settings()
-    redis = aioredis.from_url(
+    async def __call__(
+        self, redis: aioredis.Redis, keys: Sequence[str], args: Sequence[Any]
+    ) -> Any:
+        try:
+            return await cast(
+                Awaitable[Any], redis.evalsha(self.sha, len(keys), *keys, *args)
+            )
+        except NoScriptError:
+            return await cast(
+                Awaitable[Any], redis.eval(self.text, len(keys), *keys, *args)
+            )
+
+
+# INCRBY и EXPIRE в одном атомарном вызове: ключ без TTL не может остаться,
+# даже если процесс упадёт между командами
+INCR_WITH_TTL = RedisScript(
+    """
+local count = redis.call('INCRBY', KEYS[1], ARGV[2])
+if count == tonumber(ARGV[2]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+"""
+)
+
+
+def create_redis_client(settings: Settings) -> aioredis.Redis:
+    return aioredis.from_url(
         f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0",
         encoding="utf-8",
         decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
     )
-    return redis
+
+
+async def init_redis() -> aioredis.Redis:
+    """
+    Создаёт клиент Redis с общим пулом соединений один раз на процесс (воркер)
+    """
+    global _redis
+
+    if _redis is None:
+        _redis = create_redis_client(get_settings())
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+
+    if _redis is not None:
+        await _redis.aclose()
+    _redis = None
+
+
+def get_redis_client() -> aioredis.Redis:
+    if _redis is None:
+        raise RuntimeError("Redis client is not initialized")
+    return _redis
+
+
+async def incr_with_ttl(
+    redis: aioredis.Redis, key: str, ttl: int, amount: int = 1
+) -> int:
+    """
+    Увеличивает счётчик и ставит TTL при создании ключа за один запрос
+    """
+    return int(await INCR_WITH_TTL(redis, [key], [ttl, amount]))
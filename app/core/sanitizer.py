@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+
+import nh3
+from bleach.sanitizer import Cleaner
+
+from app.core.config import get_settings
+from app.core.constants import SanitizerBackend
+from app.core.exceptions import ContentTooLargeError
+from app.core.single_flight import LeaderCancelledError
+from app.schemas.common import SanitizerStats
+
+# Как у bleach.clean по умолчанию
+ALLOWED_PROTOCOLS = frozenset({"http", "https", "mailto"})
+
+
+class HtmlSanitizer(ABC):
+    """
+    Очистка HTML по политике: разрешённые теги и атрибуты.
+    Запрещённые теги удаляются, их текст остаётся.
+    """
+
+    def __init__(self, tags: Iterable[str], attributes: dict[str, list[str]]) -> None:
+        self.tags = frozenset(tags)
+        self.attributes = {tag: frozenset(names) for tag, names in attributes.items()}
+
+    @abstractmethod
+    def clean(self, html: str) -> str: ...
+
+
+class BleachSanitizer(HtmlSanitizer):
+    """
+    bleach (html5lib). Cleaner собирается один раз на поток и
+    переиспользуется: сам по себе он не потокобезопасен.
+    """
+
+    def __init__(self, tags: Iterable[str], attributes: dict[str, list[str]]) -> None:
+        super().__init__(tags, attributes)
+        self._local = threading.local()
+
+    def _cleaner(self) -> Cleaner:
+        cleaner: Cleaner | None = getattr(self._local, "cleaner", None)
+        if cleaner is None:
+            cleaner = Cleaner(
+                tags=self.tags,
+                attributes={tag: list(names) for tag, names in self.attributes.items()},
+                protocols=ALLOWED_PROTOCOLS,
+                strip=True,
+            )
+            self._local.cleaner = cleaner
+        return cleaner
+
+    def clean(self, html: str) -> str:
+        return self._cleaner().clean(html)
+
+
+class Nh3Sanitizer(HtmlSanitizer):
+    """
+    nh3 (ammonia на Rust), настроенный так, чтобы совпадать с bleach:
+    без rel у ссылок, без общих атрибутов, те же протоколы, текст
+    script/style не выбрасывается. Отпускает GIL на время очистки.
+    """
+
+    def clean(self, html: str) -> str:
+        return nh3.clean(
+            html,
+            tags=set(self.tags),
+            clean_content_tags=set(),
+            # "*" перекрывает общие атрибуты nh3 по умолчанию (lang, title)
+            attributes={
+                "*": set(),
+                **{tag: set(names) for tag, names in self.attributes.items()},
+            },
+            url_schemes=set(ALLOWED_PROTOCOLS),
+            link_rel=None,
+            strip_comments=True,
+        )
+
+
+def make_sanitizer(
+    backend: SanitizerBackend,
+    tags: Iterable[str],
+    attributes: dict[str, list[str]],
+) -> HtmlSanitizer:
+    sanitizers: dict[SanitizerBackend, type[HtmlSanitizer]] = {
+        SanitizerBackend.BLEACH: BleachSanitizer,
+        SanitizerBackend.NH3: Nh3Sanitizer,
+    }
+    return sanitizers[backend](tags, attributes)
+
+
+@cache
+def get_sanitizer() -> HtmlSanitizer:
+    """
+    Санитайзер по политике ALLOWED_TAGS/ALLOWED_ATTRIBUTES, один на процесс
+    """
+    settings = get_settings()
+    return make_sanitizer(
+        settings.SANITIZER_BACKEND, settings.ALLOWED_TAGS, settings.ALLOWED_ATTRIBUTES
+    )
+
+
+def _clean_in_worker(html: str) -> str:
+    return get_sanitizer().clean(html)
+
+
+class SanitizerPool:
+    """
+    Асинхронная очистка HTML для сервисов.
+
+    Текст длиннее max_length отклоняется ContentTooLargeError до разбора.
+    Результаты кэшируются по sha256 содержимого, одинаковые одновременные
+    вызовы ждут одну очистку. Длинный текст (от offload_length символов)
+    чистится в пуле процессов: bleach держит GIL, в потоке он всё равно
+    блокировал бы event loop. Короткий дешевле очистить на месте, чем
+    передавать в другой процесс.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_length: int,
+        offload_length: int,
+        cache_length: int,
+    ) -> None:
+        self.workers = workers
+        self.max_length = max_length
+        self.offload_length = offload_length
+        self.cache_length = cache_length
+        self._executor: ProcessPoolExecutor | None = None
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cached_length = 0
+        self._pending: dict[str, asyncio.Future[str]] = {}
+        self.hits = 0
+        self.inline = 0
+        self.offloaded = 0
+        self.rejected = 0
+
+    async def clean(self, html: str) -> str:
+        if len(html) > self.max_length:
+            self.rejected += 1
+            raise ContentTooLargeError(len(html), self.max_length)
+
+        key = self._key(html)
+        while True:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except LeaderCancelledError:
+                # Очистку начинает один из ждущих
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await self._clean(html)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(LeaderCancelledError())
+            else:
+                future.set_exception(e)
+            # Ошибку уже получил вызвавший, ждущих может не быть
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._pending[key]
+
+        self._store(key, result)
+        # Сохранение без правок присылает уже очищенный текст
+        self._store(self._key(result), result)
+        return result
+
+    async def _clean(self, html: str) -> str:
+        if len(html) < self.offload_length:
+            self.inline += 1
+            return get_sanitizer().clean(html)
+
+        self.offloaded += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), _clean_in_worker, html
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: fork процесса с event loop и пулами потоков небезопасен
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @staticmethod
+    def _key(html: str) -> str:
+        return hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def _store(self, key: str, result: str) -> None:
+        if len(result) > self.cache_length or key in self._cache:
+            return
+        self._cache[key] = result
+        self._cached_length += len(result)
+        while self._cached_length > self.cache_length:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_length -= len(evicted)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> SanitizerStats:
+        return SanitizerStats(
+            workers=self.workers,
+            max_length=self.max_length,
+            cache_entries=len(self._cache),
+            cache_length=self._cached_length,
+            hits=self.hits,
+            inline=self.inline,
+            offloaded=self.offloaded,
+            rejected=self.rejected,
+        )
+
+
+@cache
+def get_sanitizer_pool() -> SanitizerPool:
+    settings = get_settings()
+    return SanitizerPool(
+        settings.SANITIZER_WORKERS,
+        settings.SANITIZER_MAX_LENGTH,
+        settings.SANITIZER_OFFLOAD_LENGTH,
+        settings.SANITIZER_CACHE_LENGTH,
+    )
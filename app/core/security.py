@@ -1,10 +1,20 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
+from app.core.exceptions import PasswordHasherBusyError
+from app.schemas.common import PasswordHasherStats, TokenCacheStats
+
+T = TypeVar("T")
 
 settings = get_settings()
 
@@ -28,6 +38,79 @@ def verify_password(
     )
 
 
+class PasswordHasher:
+    """
+    bcrypt в отдельном пуле потоков, чтобы хэширование не блокировало
+    event loop. bcrypt отпускает GIL, поэтому потоков достаточно.
+
+    Одновременно считается не больше workers хэшей, ещё max_queue ждут
+    в очереди; сверх этого вызов сразу отклоняется PasswordHasherBusyError.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.queue_time = 0.0
+        self.queue_time_max = 0.0
+        self.compute_time = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusyError()
+
+        def job() -> tuple[T, float, float]:
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        future = self.executor.submit(job)
+        # Отмена ожидающего не останавливает bcrypt в потоке: место
+        # освобождается, только когда задача в пуле завершилась
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        result, started, finished = await asyncio.wrap_future(future)
+
+        self.calls += 1
+        self.queue_time += started - submitted
+        self.queue_time_max = max(self.queue_time_max, started - submitted)
+        self.compute_time += finished - started
+        return result
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> PasswordHasherStats:
+        calls = self.calls or 1
+        return PasswordHasherStats(
+            workers=self.workers,
+            max_queue=self.max_queue,
+            in_flight=self.in_flight,
+            calls=self.calls,
+            rejected=self.rejected,
+            queue_time_avg_ms=self.queue_time / calls * 1000,
+            queue_time_max_ms=self.queue_time_max * 1000,
+            compute_time_avg_ms=self.compute_time / calls * 1000,
+        )
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
 def create_access_token(
     data: dict[str, Any],
     expires_delta: timedelta | None = None,
@@ -67,13 +150,88 @@ def create_refresh_token(
     )
 
 
+class TokenCache:
+    """
+    LRU уже проверенных токенов: sha256 токена -> claims.
+
+    Повторный запрос с тем же токеном не проверяет подпись и не разбирает
+    JSON заново. Токен с истёкшим exp из кэша не возвращается, невалидные
+    токены не кэшируются.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.tokens: OrderedDict[bytes, dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.decode_time = 0.0
+
+    def decode(self, token: str) -> dict[str, Any]:
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.tokens.get(key)
+        if claims is not None:
+            if "exp" not in claims or claims["exp"] > time.time():
+                self.hits += 1
+                self.tokens.move_to_end(key)
+                return dict(claims)
+            del self.tokens[key]
+
+        self.misses += 1
+        start = time.perf_counter()
+        try:
+            claims = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        finally:
+            self.decode_time += time.perf_counter() - start
+
+        self.tokens[key] = claims
+        while len(self.tokens) > self.max_size:
+            self.tokens.popitem(last=False)
+        return dict(claims)
+
+    def stats(self) -> TokenCacheStats:
+        requests = self.hits + self.misses
+        decode_avg = self.decode_time / self.misses if self.misses else 0.0
+        return TokenCacheStats(
+            size=len(self.tokens),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / requests if requests else 0.0,
+            decode_time_avg_ms=decode_avg * 1000,
+            decode_time_saved_ms=self.hits * decode_avg * 1000,
+        )
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Claims валидного токена, бросает JWTError для невалидного
+    """
+    return token_cache.decode(token)
+
+
 def verify_refresh_token(token: str) -> dict[str, Any] | None:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         if payload.get("type") != "refresh":
             return None
         return payload
     except JWTError:
         return None
+
+
+def get_token_subject(token: str) -> str | None:
+    """
+    sub из валидного access-токена, без обращения к БД
+    """
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return None
+    if payload.get("type") == "refresh":
+        return None
+    subject = payload.get("sub")
+    return str(subject) if subject is not None else None
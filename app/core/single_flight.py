@@ -0,0 +1,191 @@
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import Settings
+from app.core.redis import RedisScript
+from app.schemas.common import SingleFlightStats
+
+T = TypeVar("T")
+
+# Снимает блокировку, только если она всё ещё наша: после истечения TTL
+# её мог взять другой воркер
+RELEASE_LOCK = RedisScript(
+    """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+)
+
+
+class LeaderCancelledError(Exception):
+    """
+    Загрузку отменили вместе с запросом, который её начал
+    """
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых одновременных загрузок.
+
+    В пределах воркера первый вызов с ключом выполняет load, остальные
+    ждут его результат или ошибку. Если передан redis, загрузку с recheck
+    выполняет один воркер: остальные ждут, пока он не снимет блокировку,
+    и берут результат через recheck (обычно чтение кэша, который заполнил
+    load). Если блокировка не снялась за lock_timeout, загружают сами.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis | None = None,
+        lock_timeout: float = 5.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.redis = redis
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._pending: dict[str, asyncio.Future[Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+        self.lock_hits = 0
+
+    async def do(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]] | None = None,
+    ) -> T:
+        while True:
+            pending = self._pending.get(key)
+            if pending is None:
+                return await self._lead(key, load, recheck)
+
+            self.coalesced += 1
+            try:
+                result: T = await asyncio.shield(pending)
+                return result
+            except LeaderCancelledError:
+                # Загрузку начинает один из ждущих
+                continue
+
+    async def _lead(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]] | None,
+    ) -> T:
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        self.leaders += 1
+        try:
+            if self.redis is not None and recheck is not None:
+                result = await self._locked(key, load, recheck)
+            else:
+                result = await load()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_exception(LeaderCancelledError())
+            else:
+                future.set_exception(e)
+            # Ошибку уже получил вызвавший, ждущих может не быть
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._pending[key]
+
+    async def _locked(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]],
+    ) -> T:
+        assert self.redis is not None
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to acquire single-flight lock: {e}")
+            return await load()
+
+        if acquired:
+            try:
+                return await load()
+            finally:
+                try:
+                    await RELEASE_LOCK(self.redis, [lock_key], [token])
+                except RedisError as e:
+                    logger.warning(f"Unable to release single-flight lock: {e}")
+
+        self.lock_waits += 1
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                locked = await self.redis.exists(lock_key)
+            except RedisError as e:
+                logger.warning(f"Unable to check single-flight lock: {e}")
+                break
+            result = await recheck()
+            if result is not None:
+                self.lock_hits += 1
+                return result
+            if not locked:
+                break
+        return await load()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            in_flight=len(self._pending),
+            leaders=self.leaders,
+            coalesced=self.coalesced,
+            lock_waits=self.lock_waits,
+            lock_hits=self.lock_hits,
+        )
+
+
+_flights: SingleFlight | None = None
+
+
+def init_single_flight(
+    settings: Settings, redis: aioredis.Redis | None
+) -> SingleFlight:
+    """
+    Создаёт один экземпляр на процесс (воркер): схлопываются только
+    вызовы, которые видят один и тот же экземпляр
+    """
+    global _flights
+
+    if _flights is None:
+        _flights = SingleFlight(
+            redis=redis if settings.SINGLE_FLIGHT_REDIS_LOCK else None,
+            lock_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT,
+            poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+        )
+    return _flights
+
+
+def close_single_flight() -> None:
+    global _flights
+
+    _flights = None
+
+
+def get_single_flight() -> SingleFlight:
+    if _flights is None:
+        raise RuntimeError("Single flight is not initialized")
+    return _flights
@@ -1,10 +1,14 @@
+import re
 from typing import TypeVar
 
 from slugify import slugify
-from sqlalchemy import select
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 
+from app.db.errors import is_unique_violation
+
 T = TypeVar("T")
 
 
@@ -17,18 +21,83 @@ async def generate_unique_slug(
     """
     Генерирует уникальный slug для любой модели
     При конфликте добавляет суффикс -1, -2 и т.д.
+
+    Все занятые варианты slug и slug-N читаются одним запросом,
+    свободный суффикс выбирается в памяти.
     """
-    base_slug = slug = slugify(value)
+    base_slug = slugify(value)
+    column = getattr(model, slug_field_name)
+    escaped = base_slug.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    stmt: Select[tuple[str]] = select(column).where(
+        or_(column == base_slug, column.like(f"{escaped}-%", escape="\\"))
+    )
+    taken = set((await session.scalars(stmt)).all())
+    if base_slug not in taken:
+        return base_slug
+
+    prefix = f"{base_slug}-"
+    suffixes = {
+        int(slug[len(prefix) :]) for slug in taken if slug[len(prefix) :].isdigit()
+    }
     counter = 1
+    while counter in suffixes:
+        counter += 1
 
-    while True:
-        stmt: Select[tuple[T]] = select(model).where(
-            getattr(model, slug_field_name) == slug
+    return f"{prefix}{counter}"
+
+
+async def save_with_unique_slug(
+    session: AsyncSession,
+    obj: T,
+    value: str,
+    slug_field_name: str = "slug",
+    attempts: int = 3,
+) -> T:
+    """
+    Сохраняет объект с уникальным slug
+
+    Гонку двух одновременных вставок разрешает уникальный индекс:
+    при конфликте slug пересчитывается и вставка повторяется.
+    """
+    model = type(obj)
+    for _ in range(attempts - 1):
+        setattr(
+            obj,
+            slug_field_name,
+            await generate_unique_slug(session, model, value, slug_field_name),
         )
-        existing = await session.scalar(stmt)
-        if not existing:
-            break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
+        session.add(obj)
+        try:
+            await session.commit()
+            return obj
+        except IntegrityError as e:
+            await session.rollback()
+            if not is_unique_violation(e, slug_field_name):
+                raise
+
+    setattr(
+        obj,
+        slug_field_name,
+        await generate_unique_slug(session, model, value, slug_field_name),
+    )
+    session.add(obj)
+    await session.commit()
+    return obj
+
+
+def make_snippet(html: str, terms: list[str], width: int = 160) -> str:
+    """
+    Фрагмент текста без HTML-тегов вокруг первого найденного терма,
+    все вхождения термов обёрнуты в <mark>
+    """
+    text = " ".join(re.sub(r"<[^>]*>", " ", html).split())
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(min(positions, default=0) - width // 4, 0)
+    fragment = text[start : start + width]
+    if not terms:
+        return fragment
 
-    return slug
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    return pattern.sub(lambda match: f"<mark>{match.group(0)}</mark>", fragment)
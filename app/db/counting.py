@@ -0,0 +1,202 @@
+import hashlib
+from collections.abc import Awaitable, Sequence
+from typing import NamedTuple, cast
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import ColumnElement, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import CountStrategy
+from app.db.versions import STORE_IF_VERSION
+from app.models.base import Base
+
+
+class TotalCount(NamedTuple):
+    value: int
+    exact: bool
+
+
+def filter_signature(model: type[Base], filters: Sequence[ColumnElement[bool]]) -> str:
+    """
+    Стабильный ключ для набора фильтров: SQL условия плюс значения параметров
+    """
+    compiled = select(model.id).where(*filters).compile()
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    raw = f"{compiled}|{params}".encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+class TotalCounter:
+    """
+    Стратегия подсчёта total для пагинации.
+
+    lookup вызывается до запроса страницы: если он вернул значение, подзапрос
+    с count(*) в запрос страницы не добавляется. Иначе total считается точно
+    и передаётся в store вместе с version, прочитанной до подсчёта.
+    """
+
+    async def lookup(
+        self,
+        session: AsyncSession,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+    ) -> TotalCount | None:
+        return None
+
+    async def version(self, model: type[Base]) -> str:
+        return ""
+
+    async def store(
+        self,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+        total: int,
+        version: str,
+    ) -> None:
+        return None
+
+    async def invalidate(self, model: type[Base]) -> None:
+        return None
+
+
+class ExactCounter(TotalCounter):
+    """
+    Всегда точный count(*) подзапросом в запросе страницы
+    """
+
+
+class CachedCounter(TotalCounter):
+    """
+    Точный total, закэшированный в Redis по сигнатуре фильтров.
+
+    Все значения модели лежат в одном hash, поэтому сброс при записи —
+    это один DEL. Вместе с ним растёт версия счётчиков модели, а store
+    сверяет её с версией до подсчёта: total, посчитанный до сброса,
+    в кэш не попадает.
+    """
+
+    def __init__(self, redis: aioredis.Redis, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(model: type[Base]) -> str:
+        return f"count:{model.__tablename__}"
+
+    @staticmethod
+    def _version_key(model: type[Base]) -> str:
+        return f"count:version:{model.__tablename__}"
+
+    async def lookup(
+        self,
+        session: AsyncSession,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+    ) -> TotalCount | None:
+        try:
+            value = await cast(
+                Awaitable[str | None],
+                self.redis.hget(self._key(model), filter_signature(model, filters)),
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read cached total: {e}")
+            return None
+        if value is None:
+            return None
+        return TotalCount(int(value), exact=True)
+
+    async def version(self, model: type[Base]) -> str:
+        try:
+            version = await cast(
+                Awaitable[str | None], self.redis.get(self._version_key(model))
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read total version: {e}")
+            version = None
+        return version or ""
+
+    async def store(
+        self,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+        total: int,
+        version: str,
+    ) -> None:
+        try:
+            await STORE_IF_VERSION(
+                self.redis,
+                [self._key(model), self._version_key(model)],
+                [version, filter_signature(model, filters), str(total), self.ttl],
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to cache total: {e}")
+
+    async def invalidate(self, model: type[Base]) -> None:
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(model))
+                pipe.delete(self._key(model))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Unable to invalidate cached total: {e}")
+
+
+class EstimatedCounter(TotalCounter):
+    """
+    Оценка total по статистике планировщика PostgreSQL (pg_class.reltuples).
+
+    Работает только для выборок без фильтров, в остальных случаях и когда
+    статистики ещё нет, передаёт подсчёт fallback-стратегии.
+    """
+
+    def __init__(self, fallback: TotalCounter) -> None:
+        self.fallback = fallback
+
+    async def lookup(
+        self,
+        session: AsyncSession,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+    ) -> TotalCount | None:
+        if filters or session.bind.dialect.name != "postgresql":
+            return await self.fallback.lookup(session, model, filters)
+
+        estimate = await session.scalar(
+            text(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"
+            ),
+            {"table": model.__tablename__},
+        )
+        if estimate is None or estimate <= 0:
+            return await self.fallback.lookup(session, model, filters)
+        return TotalCount(int(estimate), exact=False)
+
+    async def version(self, model: type[Base]) -> str:
+        return await self.fallback.version(model)
+
+    async def store(
+        self,
+        model: type[Base],
+        filters: Sequence[ColumnElement[bool]],
+        total: int,
+        version: str,
+    ) -> None:
+        await self.fallback.store(model, filters, total, version)
+
+    async def invalidate(self, model: type[Base]) -> None:
+        await self.fallback.invalidate(model)
+
+
+def make_total_counter(
+    strategy: CountStrategy, redis: aioredis.Redis | None, ttl: int
+) -> TotalCounter:
+    cached: TotalCounter = (
+        CachedCounter(redis, ttl) if redis is not None else ExactCounter()
+    )
+    if strategy is CountStrategy.CACHED:
+        return cached
+    if strategy is CountStrategy.ESTIMATED:
+        return EstimatedCounter(cached)
+    return ExactCounter()
@@ -1,40 +1,155 @@
-from collections.abc import Sequence
-from typing import Any, Generic, TypeVar
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
+from typing import Any, ClassVar, Generic, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import ColumnElement, func, select
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    delete,
+    func,
+    inspect,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm import InstrumentedAttribute, load_only, make_transient_to_detached
 
 from app.core.constants import OrderDirection
+from app.core.exceptions import RecordNotFoundError
+from app.db.counting import ExactCounter, TotalCount, TotalCounter
+from app.db.errors import is_unique_violation
+from app.db.pagination import decode_cursor, encode_cursor
+from app.db.record_cache import RecordCache
+from app.db.versions import ModelVersions
 from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
+RecordType = TypeVar("RecordType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 Filter = ColumnElement[bool]
 ColumnType = ColumnElement[Any] | InstrumentedAttribute[Any]
+Projection = type[BaseModel] | None
 
 
-class CRUDRead(Generic[ModelType]):
-    def __init__(self, model: type[ModelType]):
+class CRUDReadBase(ABC, Generic[ModelType, RecordType]):
+    """
+    Общая логика чтения: выборка по колонке и пагинация.
+
+    Наследники определяют, что выбирается (_select), во что превращается
+    строка результата (_record) и запись из кэша (_restore).
+    Если передан records, get_by читает через кэш записей.
+    """
+
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+    ):
         self.model = model
+        self.counter = counter or ExactCounter()
+        self.records = records
 
-    async def get(self, session: AsyncSession, id: Any) -> ModelType | None:
-        return await session.get(self.model, id)
+    def projection_keys(self, projection: Projection) -> list[str]:
+        """
+        Колонки модели, которые есть в схеме ответа (id — всегда)
+        """
+        column_keys = inspect(self.model).column_attrs.keys()
+        if projection is None:
+            return list(column_keys)
+        return ["id"] + [
+            name
+            for name in projection.model_fields
+            if name in column_keys and name != "id"
+        ]
+
+    @abstractmethod
+    def _select(self, projection: Projection) -> Select[Any]: ...
+
+    @abstractmethod
+    def _record(self, row: Row[Any]) -> RecordType: ...
+
+    @abstractmethod
+    async def _restore(
+        self, session: AsyncSession, data: dict[str, Any]
+    ) -> RecordType: ...
+
+    def _cacheable(self, projection: Projection) -> bool:
+        return self.records is not None
 
     async def get_by(
         self,
         session: AsyncSession,
         column: ColumnType,
         value: Any,
-    ) -> ModelType | None:
-        stmt = select(self.model).where(column == value)
+        projection: Projection = None,
+    ) -> RecordType | None:
+        return await self._read_through(
+            session,
+            column,
+            value,
+            projection,
+            lambda: self._load_by(session, column, value, projection),
+        )
+
+    async def _load_by(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        projection: Projection,
+    ) -> RecordType | None:
+        stmt = self._select(projection).where(column == value)
+
+        row = (await session.execute(stmt)).first()
+
+        return self._record(row) if row is not None else None
+
+    async def _read_through(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        projection: Projection,
+        load: Callable[[], Awaitable[RecordType | None]],
+    ) -> RecordType | None:
+        """
+        Запись из кэша, а при промахе — из load с сохранением в кэш,
+        в том числе отсутствие записи. Кэшируется только поиск по колонке
+        модели: по ней запись сбрасывается при записи в модель.
+        """
+        column_keys = inspect(self.model).column_attrs.keys()
+        if (
+            self.records is None
+            or not self._cacheable(projection)
+            or not isinstance(column, InstrumentedAttribute)
+            or column.key not in column_keys
+        ):
+            return await load()
 
-        result = await session.scalars(stmt)
+        keys = self.projection_keys(projection)
 
-        return result.first()
+        async def load_data() -> dict[str, Any] | None:
+            record = await load()
+            if record is None:
+                return None
+            return {key: getattr(record, key) for key in keys}
+
+        cached = await self.records.get_or_load(
+            self.model, f"{column.key}:{value}:{','.join(keys)}", load_data
+        )
+        if cached.data is None:
+            return None
+        return await self._restore(session, cached.data)
 
     async def paginate(
         self,
@@ -44,71 +159,354 @@ class CRUDRead(Generic[ModelType]):
         size: int = 100,
         order_by: ColumnType | None = None,
         order_dir: OrderDirection = OrderDirection.ASC,
-    ) -> tuple[Sequence[ModelType], int]:
+        with_total: bool = True,
+        projection: Projection = None,
+    ) -> tuple[Sequence[RecordType], TotalCount | None]:
+        """
+        Постраничная выборка.
+
+        Total берётся из стратегии self.counter (кэш, оценка планировщика),
+        а если она его не знает — считается подзапросом в том же запросе,
+        что и сама страница. При with_total=False количество не считается.
+        projection ограничивает загружаемые колонки полями схемы ответа.
+        """
         offset = (page - 1) * size
 
         if order_by is None:
             order_by = self.model.id
 
+        # id — второй ключ сортировки: при равных order_by порядок строк
+        # тот же, что в keyset-режиме, и курсоры из этой страницы точны
         if order_dir is OrderDirection.DESC:
-            column = order_by.desc()
+            columns = [order_by.desc(), self.model.id.desc()]
         else:
-            column = order_by.asc()
+            columns = [order_by.asc(), self.model.id.asc()]
+        if order_by is self.model.id:
+            columns = columns[:1]
 
-        stmt = select(self.model).order_by(column).offset(offset).limit(size)
+        known_total = (
+            await self.counter.lookup(session, self.model, filters)
+            if with_total
+            else None
+        )
 
+        stmt = self._select(projection).order_by(*columns).offset(offset).limit(size)
         if filters:
             stmt = stmt.where(*filters)
 
-        items = (await session.scalars(stmt)).all()
+        if not with_total or known_total is not None:
+            rows = (await session.execute(stmt)).all()
+            return [self._record(row) for row in rows], known_total
 
+        version = await self.counter.version(self.model)
         count_stmt = select(func.count()).select_from(self.model)
         if filters:
             count_stmt = count_stmt.where(*filters)
-        total = await session.scalar(count_stmt) or 0
 
-        return items, total
+        # Некоррелированный подзапрос считается один раз и не мешает отдавать
+        # страницу прямо из индекса с ранней остановкой по LIMIT
+        total_column = count_stmt.correlate(None).scalar_subquery().label("total")
+        rows = (await session.execute(stmt.add_columns(total_column))).all()
+        items = [self._record(row) for row in rows]
+        if rows:
+            total = rows[0].total
+        elif offset == 0:
+            total = 0
+        else:
+            # Страница за пределами выборки: строк, к которым приложен total, нет
+            total = await session.scalar(count_stmt) or 0
+
+        await self.counter.store(self.model, filters, total, version)
+        return items, TotalCount(total, exact=True)
+
+    def make_cursor(
+        self, item: RecordType, order_by: ColumnType, backwards: bool = False
+    ) -> str:
+        key = str(order_by.key)
+        item_id = getattr(item, self.model.id.key)
+        return encode_cursor(key, getattr(item, key), item_id, backwards)
+
+    async def paginate_keyset(
+        self,
+        session: AsyncSession,
+        *filters: Filter,
+        size: int = 100,
+        order_by: ColumnType | None = None,
+        order_dir: OrderDirection = OrderDirection.ASC,
+        cursor: str | None = None,
+        projection: Projection = None,
+    ) -> tuple[Sequence[RecordType], str | None, str | None]:
+        """
+        Keyset-пагинация по паре (order_by, id).
+
+        Вместо OFFSET фильтрует по позиции из курсора, поэтому стоимость
+        запроса не зависит от того, как далеко клиент пролистал выборку.
+        Возвращает элементы, курсор следующей и курсор предыдущей страницы.
+        """
+        if order_by is None:
+            order_by = self.model.id
+
+        stmt = self._select(projection)
+        if filters:
+            stmt = stmt.where(*filters)
+
+        backwards = False
+        ascending = order_dir is OrderDirection.ASC
+        if cursor is not None:
+            position = decode_cursor(
+                cursor, str(order_by.key), order_by.type.python_type
+            )
+            backwards = position.backwards
+            ascending = ascending != backwards
+
+            keys = tuple_(order_by, self.model.id)
+            bound = tuple_(
+                literal(position.value, order_by.type),
+                literal(position.id, self.model.id.type),
+            )
+            stmt = stmt.where(keys > bound if ascending else keys < bound)
+
+        if ascending:
+            stmt = stmt.order_by(order_by.asc(), self.model.id.asc())
+        else:
+            stmt = stmt.order_by(order_by.desc(), self.model.id.desc())
+
+        rows = (await session.execute(stmt.limit(size + 1))).all()
+        has_more = len(rows) > size
+        items = [self._record(row) for row in rows[:size]]
+        if backwards:
+            items.reverse()
+
+        if not items:
+            return items, None, None
+
+        has_next = has_more if not backwards else True
+        has_prev = has_more if backwards else cursor is not None
+
+        next_cursor = self.make_cursor(items[-1], order_by) if has_next else None
+        prev_cursor = (
+            self.make_cursor(items[0], order_by, backwards=True) if has_prev else None
+        )
+
+        return items, next_cursor, prev_cursor
+
+
+class CRUDReadRows(CRUDReadBase[ModelType, Row[Any]]):
+    """
+    Read-only доступ без ORM.
+
+    Выполняет Core select по колонкам таблицы и возвращает Row — лёгкие
+    кортежи с доступом по атрибутам, без identity map и инструментирования.
+    Row сразу валидируется схемой ответа (from_attributes).
+    """
+
+    def _select(self, projection: Projection) -> Select[Any]:
+        columns = inspect(self.model).columns
+        return select(*(columns[key] for key in self.projection_keys(projection)))
+
+    def _record(self, row: Row[Any]) -> Row[Any]:
+        return row
+
+    async def _restore(self, session: AsyncSession, data: dict[str, Any]) -> Row[Any]:
+        return result_tuple(list(data))(tuple(data.values()))
+
+
+class CRUDRead(CRUDReadBase[ModelType, ModelType]):
+    # Уникальная колонка -> доменная ошибка при нарушении уникальности
+    unique_errors: ClassVar[dict[str, type[Exception]]] = {}
+
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+        versions: ModelVersions | None = None,
+    ):
+        super().__init__(model, counter, records)
+        self.rows = CRUDReadRows(model, self.counter, records)
+        self.versions = versions
+
+    async def invalidate(self) -> None:
+        """
+        Сбрасывает закэшированные данные модели после записи
+        """
+        await self.counter.invalidate(self.model)
+        if self.records is not None:
+            await self.records.invalidate(self.model)
+        # Кэш записей с Redis сам увеличивает версию модели вместе со сбросом
+        if self.versions is not None and (
+            self.records is None or self.records.redis is None
+        ):
+            await self.versions.bump(self.model)
+
+    @asynccontextmanager
+    async def unique_conflicts(self, session: AsyncSession) -> AsyncIterator[None]:
+        """
+        Переводит нарушение уникального индекса при записи в доменную ошибку
+        из unique_errors. Конфликт определяет сама БД, без проверочных
+        запросов перед записью.
+        """
+        try:
+            yield
+        except IntegrityError as e:
+            await session.rollback()
+            for column, error in self.unique_errors.items():
+                if is_unique_violation(e, column):
+                    raise error() from e
+            raise
+
+    def _select(self, projection: Projection) -> Select[Any]:
+        """
+        Выборка ORM-объектов. Если задана projection, загружаются только её
+        колонки, а обращение к остальным бросает ошибку вместо скрытого
+        ленивого запроса.
+        """
+        stmt = select(self.model)
+        if projection is None:
+            return stmt
+
+        columns = [getattr(self.model, key) for key in self.projection_keys(projection)]
+        return stmt.options(load_only(*columns, raiseload=True))
+
+    def _record(self, row: Row[Any]) -> ModelType:
+        record: ModelType = row[0]
+        return record
+
+    def _cacheable(self, projection: Projection) -> bool:
+        # Объект с частью колонок после merge лениво догружал бы остальные
+        return self.records is not None and projection is None
+
+    async def _restore(self, session: AsyncSession, data: dict[str, Any]) -> ModelType:
+        """
+        Объект из кэша присоединяется к сессии без запроса в БД, как
+        загруженный. Если он уже есть в identity map, возвращается тот.
+        """
+        obj = self.model(**data)
+        make_transient_to_detached(obj)
+        return await session.merge(obj, load=False)
+
+    async def get(self, session: AsyncSession, id: Any) -> ModelType | None:
+        return await self._read_through(
+            session,
+            self.model.id,
+            id,
+            None,
+            lambda: session.get(self.model, id),
+        )
 
 
 class CRUDRemove(CRUDRead[ModelType]):
-    def __init__(self, model: type[ModelType]):
-        super().__init__(model)
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+        versions: ModelVersions | None = None,
+    ):
+        super().__init__(model, counter, records, versions)
 
     async def remove(self, session: AsyncSession, id: Any) -> ModelType | None:
-        obj = await self.get(session, id)
-        if obj:
-            await session.delete(obj)
-            await session.commit()
+        return await self.remove_by(session, self.model.id, id)
+
+    async def remove_by(
+        self, session: AsyncSession, column: ColumnType, value: Any
+    ) -> ModelType | None:
+        """
+        DELETE ... RETURNING: удаление и получение удалённой строки
+        за один запрос
+        """
+        stmt = delete(self.model).where(column == value).returning(self.model)
+        obj = (await session.execute(stmt)).scalar_one_or_none()
+        if obj is None:
+            return None
+        # Строка из RETURNING попадает в identity map как живой объект
+        session.expunge(obj)
+        await session.commit()
+        await self.invalidate()
         return obj
 
 
 class CRUDCreate(CRUDRead[ModelType], Generic[ModelType, CreateSchemaType]):
-    def __init__(self, model: type[ModelType]):
-        super().__init__(model)
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+        versions: ModelVersions | None = None,
+    ):
+        super().__init__(model, counter, records, versions)
 
     async def create(
         self, session: AsyncSession, obj_in: CreateSchemaType
     ) -> ModelType:
         obj: ModelType = self.model(**obj_in.model_dump())
         session.add(obj)
-        await session.commit()
-        await session.refresh(obj)
+        # Значения по умолчанию из БД приходят в RETURNING (eager_defaults)
+        async with self.unique_conflicts(session):
+            await session.commit()
+        await self.invalidate()
         return obj
 
 
 class CRUDUpdate(CRUDRead[ModelType], Generic[ModelType, UpdateSchemaType]):
-    def __init__(self, model: type[ModelType]):
-        super().__init__(model)
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+        versions: ModelVersions | None = None,
+    ):
+        super().__init__(model, counter, records, versions)
 
     async def update(
         self, session: AsyncSession, db_obj: ModelType, obj_in: UpdateSchemaType
     ) -> ModelType:
-        update_data = obj_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        obj = await self.update_by(session, self.model.id, db_obj.id, obj_in)
+        if obj is None:
+            # Строку удалили после того, как db_obj был загружен
+            raise RecordNotFoundError(f"{self.model.__name__} {db_obj.id} not found")
+        return obj
+
+    async def update_by(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        obj_in: UpdateSchemaType,
+    ) -> ModelType | None:
+        return await self.update_values(
+            session, column, value, obj_in.model_dump(exclude_unset=True)
+        )
+
+    async def update_values(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        values: dict[str, Any],
+    ) -> ModelType | None:
+        """
+        UPDATE ... RETURNING: обновление и получение новой версии строки
+        за один запрос, без предварительной выборки и refresh.
+        Если обновлять нечего, возвращает текущую строку.
+        """
+        if not values:
+            return await self.get_by(session, column, value)
+
+        stmt = (
+            update(self.model)
+            .where(column == value)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        async with self.unique_conflicts(session):
+            obj = (await session.execute(stmt)).scalar_one_or_none()
+            if obj is None:
+                return None
+            await session.commit()
+        await self.invalidate()
+        return obj
 
 
 class CRUDFull(
@@ -117,5 +515,11 @@ class CRUDFull(
     CRUDUpdate[ModelType, UpdateSchemaType],
     Generic[ModelType, CreateSchemaType, UpdateSchemaType],
 ):
-    def __init__(self, model: type[ModelType]):
-        super().__init__(model)
+    def __init__(
+        self,
+        model: type[ModelType],
+        counter: TotalCounter | None = None,
+        records: RecordCache | None = None,
+        versions: ModelVersions | None = None,
+    ):
+        super().__init__(model, counter, records, versions)
@@ -0,0 +1,21 @@
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE_VIOLATION = "23505"
+
+
+def is_unique_violation(error: IntegrityError, column: str) -> bool:
+    """
+    Проверяет, что IntegrityError вызван нарушением уникальности колонки
+
+    PostgreSQL: sqlstate 23505 и "Key (column)=(...)" в деталях ошибки,
+    SQLite: "UNIQUE constraint failed: table.column".
+    """
+    orig = error.orig
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        return getattr(orig, "sqlstate", None) == UNIQUE_VIOLATION and (
+            f"({column})=" in (diag.message_detail or "")
+        )
+
+    message = str(orig)
+    return "UNIQUE constraint failed" in message and f".{column}" in message
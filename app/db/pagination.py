@@ -0,0 +1,73 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from app.core.exceptions import InvalidCursorError
+
+
+class CursorPosition(NamedTuple):
+    """
+    Позиция в выборке: значение колонки сортировки и id последней записи
+    """
+
+    key: str
+    value: Any
+    id: uuid.UUID
+    backwards: bool
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load_value(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
+
+
+def encode_cursor(key: str, value: Any, id: uuid.UUID, backwards: bool = False) -> str:
+    """
+    Кодирует позицию в непрозрачный для клиента курсор (base64url от JSON)
+    """
+    payload = {
+        "k": key,
+        "v": _dump_value(value),
+        "id": str(id),
+        "b": backwards,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str, python_type: type) -> CursorPosition:
+    """
+    Декодирует курсор и проверяет, что он выдан для той же колонки сортировки
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        position = CursorPosition(
+            key=payload["k"],
+            value=_load_value(payload["v"], python_type),
+            id=uuid.UUID(payload["id"]),
+            backwards=bool(payload["b"]),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+
+    if position.key != key:
+        raise InvalidCursorError(f"Cursor was issued for ordering by {position.key}")
+
+    return position
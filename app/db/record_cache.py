@@ -0,0 +1,310 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import cache
+from typing import Any, NamedTuple, cast
+
+from loguru import logger
+from pydantic import BaseModel, create_model
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+
+from app.core.config import Settings
+from app.core.single_flight import SingleFlight
+from app.db.versions import STORE_IF_VERSION, ModelVersions
+from app.models.base import Base
+from app.schemas.common import RecordCacheStats
+
+INVALIDATE_CHANNEL = "record:invalidate"
+
+
+class CachedRecord(NamedTuple):
+    # None — записи нет в БД (кэш 404)
+    data: dict[str, Any] | None
+
+
+@cache
+def record_schema(model: type[Base], keys: tuple[str, ...]) -> type[BaseModel]:
+    """
+    Схема для восстановления типов колонок (UUID, datetime) из JSON
+    """
+    columns = inspect(model).columns
+    fields: dict[str, Any] = {
+        key: (columns[key].type.python_type | None, ...) for key in keys
+    }
+    return create_model(f"{model.__name__}Record", **fields)
+
+
+class RecordCache:
+    """
+    Read-through кэш записей по колонке и значению для CRUDRead.get_by.
+
+    Первый уровень — LRU с TTL в памяти воркера, второй (если передан redis)
+    — hash на модель в Redis, поэтому сброс при записи — один DEL. Записи
+    в памяти сбрасываются сменой поколения модели: локально при записи и
+    через pub/sub на остальных воркерах. Сброс увеличивает версию модели
+    (ModelVersions) в одной транзакции с DEL, а запись в hash сверяет её
+    с версией, прочитанной перед загрузкой: запись, загруженная из БД
+    до сброса, в кэш не попадает. Одинаковые промахи схлопываются
+    через flights.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        redis: aioredis.Redis | None = None,
+        redis_ttl: int = 300,
+        flights: SingleFlight | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+        self.flights = flights
+        self.local: OrderedDict[str, tuple[float, int, CachedRecord]] = OrderedDict()
+        self.generations: dict[str, int] = {}
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model: type[Base]) -> str:
+        return f"record:{model.__tablename__}"
+
+    def generation(self, model: type[Base]) -> int:
+        return self.generations.get(model.__tablename__, 0)
+
+    async def lookup(
+        self, model: type[Base], key: str, count: bool = True
+    ) -> CachedRecord | None:
+        """
+        count=False — повторная проверка, пока запись загружает другой
+        воркер: обращение уже учтено в счётчиках первым lookup
+        """
+        local_key = f"{model.__tablename__}:{key}"
+        entry = self.local.get(local_key)
+        if entry is not None:
+            expires_at, generation, record = entry
+            if expires_at > time.monotonic() and generation == self.generation(model):
+                self.local.move_to_end(local_key)
+                if count:
+                    self.local_hits += 1
+                    self._count_negative(record)
+                return record
+            del self.local[local_key]
+
+        if self.redis is None:
+            if count:
+                self.misses += 1
+            return None
+        generation = self.generation(model)
+        try:
+            value = await cast(
+                Awaitable[str | None], self.redis.hget(self._key(model), key)
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read cached record: {e}")
+            value = None
+        if value is None:
+            if count:
+                self.misses += 1
+            return None
+
+        raw = json.loads(value)
+        record = CachedRecord(
+            None
+            if raw is None
+            else record_schema(model, tuple(raw)).model_validate(raw).model_dump()
+        )
+        self._store_local(local_key, generation, record)
+        if count:
+            self.redis_hits += 1
+            self._count_negative(record)
+        return record
+
+    async def get_or_load(
+        self,
+        model: type[Base],
+        key: str,
+        load: Callable[[], Awaitable[dict[str, Any] | None]],
+    ) -> CachedRecord:
+        """
+        Запись из кэша, а при промахе — из load с сохранением в кэш.
+        Схлопываются данные записи, а не объекты: каждый вызвавший
+        восстанавливает из них свою запись в своей сессии.
+        """
+        cached = await self.lookup(model, key)
+        if cached is not None:
+            return cached
+
+        async def load_and_store() -> CachedRecord:
+            generation = self.generation(model)
+            version = await self.version(model)
+            data = await load()
+            await self.store(model, key, data, generation, version)
+            return CachedRecord(data)
+
+        if self.flights is None:
+            return await load_and_store()
+        return await self.flights.do(
+            f"record:{model.__tablename__}:{key}",
+            load_and_store,
+            lambda: self.lookup(model, key, count=False),
+        )
+
+    async def version(self, model: type[Base]) -> str:
+        """
+        Версия модели в Redis, читается до загрузки записи из БД
+        """
+        if self.redis is None:
+            return ""
+        try:
+            version = await cast(
+                Awaitable[str | None], self.redis.get(ModelVersions.key(model))
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read model version: {e}")
+            version = None
+        return version or ""
+
+    async def store(
+        self,
+        model: type[Base],
+        key: str,
+        data: dict[str, Any] | None,
+        generation: int,
+        version: str,
+    ) -> None:
+        """
+        generation и version — поколение и версия модели до загрузки
+        записи из БД
+        """
+        if generation != self.generation(model):
+            return
+        record = CachedRecord(data)
+        if self.redis is not None:
+            value = (
+                "null"
+                if data is None
+                else record_schema(model, tuple(data))(**data).model_dump_json()
+            )
+            try:
+                stored = await STORE_IF_VERSION(
+                    self.redis,
+                    [self._key(model), ModelVersions.key(model)],
+                    [version, key, value, self.redis_ttl],
+                )
+            except RedisError as e:
+                logger.warning(f"Unable to cache record: {e}")
+                return
+            if not stored:
+                return
+        self._store_local(f"{model.__tablename__}:{key}", generation, record)
+
+    async def invalidate(self, model: type[Base]) -> None:
+        self._bump(model.__tablename__)
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(ModelVersions.key(model))
+                pipe.delete(self._key(model))
+                await pipe.execute()
+            await self.redis.publish(INVALIDATE_CHANNEL, model.__tablename__)
+        except RedisError as e:
+            logger.warning(f"Unable to invalidate cached records: {e}")
+
+    async def listen(self) -> None:
+        """
+        Сбрасывает записи в памяти по сообщениям других воркеров.
+        После разрыва соединения сообщения могли потеряться, поэтому
+        кэш в памяти очищается целиком.
+        """
+        if self.redis is None:
+            return
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    self.local.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._bump(message["data"])
+            except RedisError as e:
+                logger.warning(f"Record invalidation channel is unavailable: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    def stats(self) -> RecordCacheStats:
+        return RecordCacheStats(
+            size=len(self.local),
+            max_size=self.max_size,
+            local_hits=self.local_hits,
+            redis_hits=self.redis_hits,
+            negative_hits=self.negative_hits,
+            misses=self.misses,
+        )
+
+    def _bump(self, table: str) -> None:
+        self.generations[table] = self.generations.get(table, 0) + 1
+
+    def _count_negative(self, record: CachedRecord) -> None:
+        if record.data is None:
+            self.negative_hits += 1
+
+    def _store_local(self, key: str, generation: int, record: CachedRecord) -> None:
+        self.local[key] = (time.monotonic() + self.ttl, generation, record)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_size:
+            self.local.popitem(last=False)
+
+
+_cache: RecordCache | None = None
+_listener: asyncio.Task[None] | None = None
+
+
+def init_record_cache(
+    settings: Settings,
+    redis: aioredis.Redis | None,
+    flights: SingleFlight | None = None,
+) -> RecordCache:
+    """
+    Создаёт кэш один раз на процесс (воркер) и подписывается на инвалидацию
+    """
+    global _cache, _listener
+
+    if _cache is None:
+        _cache = RecordCache(
+            ttl=settings.RECORD_CACHE_TTL,
+            max_size=settings.RECORD_CACHE_SIZE,
+            redis=redis if settings.RECORD_CACHE_REDIS else None,
+            redis_ttl=settings.RECORD_CACHE_REDIS_TTL,
+            flights=flights,
+        )
+        if _cache.redis is not None:
+            _listener = asyncio.create_task(_cache.listen())
+    return _cache
+
+
+async def close_record_cache() -> None:
+    global _cache, _listener
+
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+    _cache = None
+    _listener = None
+
+
+def get_record_cache() -> RecordCache:
+    if _cache is None:
+        raise RuntimeError("Record cache is not initialized")
+    return _cache
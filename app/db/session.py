@@ -1,28 +1,133 @@
+import asyncio
+import time
+from typing import Any
+
 from loguru import logger
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
+    async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 from app.models.user import User
+from app.schemas.common import PoolStats
 from app.schemas.user import UserCreate
 from app.services.user import get_user_service
 
 
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает время ожидания свободного соединения
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_time_total += elapsed
+            self.wait_time_max = max(self.wait_time_max, elapsed)
+
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def create_pooled_engine(url: str, settings: Settings) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+
+
+async def prewarm_pool(engine: AsyncEngine, count: int) -> None:
+    """
+    Открывает count соединений заранее, чтобы первые запросы не ждали handshake
+    """
+    if count <= 0:
+        return
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+
+
+async def init_engine() -> AsyncEngine:
+    """
+    Создаёт engine и sessionmaker один раз на процесс (воркер)
+    """
+    global _engine, _sessionmaker
+
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_pooled_engine(str(settings.SQLALCHEMY_DATABASE_URI), settings)
+        _sessionmaker = async_sessionmaker(
+            bind=_engine, expire_on_commit=False, class_=AsyncSession
+        )
+        await prewarm_pool(
+            _engine, min(settings.POSTGRES_POOL_PREWARM, settings.POSTGRES_POOL_SIZE)
+        )
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine, _sessionmaker
+
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
+
 def get_async_engine() -> AsyncEngine:
-    engine = create_async_engine(
-        str(get_settings().SQLALCHEMY_DATABASE_URI), pool_pre_ping=True
+    if _engine is None:
+        raise RuntimeError("Database engine is not initialized")
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    if _sessionmaker is None:
+        raise RuntimeError("Database engine is not initialized")
+    return _sessionmaker
+
+
+def get_pool_stats(engine: AsyncEngine) -> PoolStats:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedAsyncPool):
+        raise RuntimeError(f"Pool statistics are not available for {type(pool)}")
+
+    return PoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=pool.checkouts,
+        wait_time_avg_ms=(
+            pool.wait_time_total / pool.checkouts * 1000 if pool.checkouts else 0.0
+        ),
+        wait_time_max_ms=pool.wait_time_max * 1000,
     )
-    return engine
 
 
 async def initialize_database() -> None:
     settings = get_settings()
     service = get_user_service()
-    async_engine = get_async_engine()
-    async with AsyncSession(async_engine) as session:
+    async with get_sessionmaker()() as session:
         superuser = await service.get_by(session, User.email, settings.FIRST_SUPERUSER)
         if not superuser:
             user_in = UserCreate(
@@ -0,0 +1,47 @@
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.redis import RedisScript
+from app.models.base import Base
+
+# Запись поля hash, только если версия не менялась с момента, когда её
+# прочитали перед загрузкой из БД: значение, посчитанное до сброса,
+# в кэш не попадает. KEYS: hash, ключ версии;
+# ARGV: прочитанная версия ('' — не было), поле, значение, TTL hash
+STORE_IF_VERSION = RedisScript(
+    """
+local version = redis.call('GET', KEYS[2]) or ''
+if version ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+)
+
+
+class ModelVersions:
+    """
+    Номер версии данных модели в Redis, растёт при каждой записи.
+
+    Кэши, в ключ которых входит версия, устаревают сами: после записи
+    старые ключи больше не читаются и истекают по TTL, удалять их по
+    шаблону не нужно.
+    """
+
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self.redis = redis
+
+    @staticmethod
+    def key(model: type[Base]) -> str:
+        return f"version:{model.__tablename__}"
+
+    async def bump(self, model: type[Base]) -> None:
+        try:
+            await self.redis.incr(self.key(model))
+        except RedisError as e:
+            logger.warning(f"Unable to bump model version: {e}")
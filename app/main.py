@@ -6,16 +6,39 @@ from fastapi import FastAPI
 
 from app.api.v1.router import router as api_router
 from app.core.config import get_settings
-from app.core.middlewares import rate_limit_middleware
-from app.db.session import initialize_database
+from app.core.local_limit import close_rate_limiter, init_rate_limiter
+from app.core.middlewares import RateLimitMiddleware
+from app.core.redis import close_redis, get_redis_client, init_redis
+from app.core.sanitizer import get_sanitizer_pool
+from app.core.single_flight import (
+    close_single_flight,
+    get_single_flight,
+    init_single_flight,
+)
+from app.db.record_cache import close_record_cache, init_record_cache
+from app.db.session import dispose_engine, init_engine, initialize_database
+from app.services.principal import close_principal_cache, init_principal_cache
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
     # startup
+    await init_engine()
+    await init_redis()
+    init_rate_limiter(get_settings())
+    init_principal_cache(get_settings(), get_redis_client())
+    init_single_flight(get_settings(), get_redis_client())
+    init_record_cache(get_settings(), get_redis_client(), get_single_flight())
     await initialize_database()
     yield
     # shutdown
+    await close_record_cache()
+    close_single_flight()
+    await close_principal_cache()
+    get_sanitizer_pool().close()
+    close_rate_limiter()
+    await close_redis()
+    await dispose_engine()
 
 
 def create_app() -> FastAPI:
@@ -31,7 +54,7 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(api_router)
-    app.middleware("http")(rate_limit_middleware)
+    app.add_middleware(RateLimitMiddleware)
 
     return app
 
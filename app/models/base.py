@@ -24,4 +24,6 @@ class BaseDBModel:
 
 
 class Base(DeclarativeBase, BaseDBModel):
-    pass
+    # Значения, вычисляемые БД (date_created, date_updated), возвращаются
+    # через RETURNING в том же INSERT/UPDATE, без отдельного refresh
+    __mapper_args__ = {"eager_defaults": True}
@@ -1,11 +1,9 @@
 import uuid
 from typing import TYPE_CHECKING
 
-import bleach
-from sqlalchemy import UUID, ForeignKey, String, Text
+from sqlalchemy import UUID, ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.config import get_settings
 from app.models.base import Base
 
 if TYPE_CHECKING:
@@ -14,6 +12,18 @@ if TYPE_CHECKING:
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Посты категории: WHERE category_id = ? ORDER BY date_created DESC, id DESC
+        Index(
+            "ix_posts_category_id_date_created_id",
+            "category_id",
+            text("date_created DESC"),
+            text("id DESC"),
+        ),
+        # Общий список постов с сортировкой по дате или заголовку
+        Index("ix_posts_date_created_id", "date_created", "id"),
+        Index("ix_posts_title_id", "title", "id"),
+    )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content_html: Mapped[str] = mapped_column(Text, nullable=False)
@@ -26,15 +36,3 @@ class Post(Base):
 
     category_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("categories.id"))
     category: Mapped["Category"] = relationship("Category", back_populates="posts")
-
-    def set_content_html(self, html_content: str) -> None:
-        """
-        Санитизация HTML входных данных.
-        """
-        settings = get_settings()
-        self.content_html = bleach.clean(
-            html_content,
-            tags=settings.ALLOWED_TAGS,
-            attributes=settings.ALLOWED_ATTRIBUTES,
-            strip=True,
-        )
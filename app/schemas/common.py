@@ -3,7 +3,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
-from app.core.constants import Environment
+from app.core.constants import CircuitState, Environment
 
 
 class HealthResponse(BaseModel):
@@ -30,3 +30,112 @@ class BaseDBModel(BaseModel):
     id: uuid.UUID = Field(..., description="ID пользователя")
     date_created: datetime = Field(..., description="Дата создания")
     date_updated: datetime = Field(..., description="Дата обновления")
+
+
+class PoolStats(BaseModel):
+    """
+    Схема для текущего состояния пула соединений с базой данных
+    """
+
+    size: int = Field(..., description="Размер пула")
+    checked_in: int = Field(..., description="Свободные соединения в пуле")
+    checked_out: int = Field(..., description="Соединения, занятые запросами")
+    overflow: int = Field(..., description="Соединения сверх размера пула")
+    checkouts: int = Field(..., description="Количество получений соединения из пула")
+    wait_time_avg_ms: float = Field(
+        ..., description="Среднее время получения соединения из пула, мс"
+    )
+    wait_time_max_ms: float = Field(
+        ..., description="Максимальное время ожидания соединения, мс"
+    )
+
+
+class CircuitBreakerStats(BaseModel):
+    """
+    Схема для состояния предохранителя обращений к Redis
+    """
+
+    name: str = Field(..., description="Имя предохранителя")
+    state: CircuitState = Field(..., description="Состояние предохранителя")
+    failures: int = Field(..., description="Ошибок подряд")
+    open_count: int = Field(..., description="Сколько раз предохранитель размыкался")
+    rejected: int = Field(..., description="Вызовов, не сделанных из-за размыкания")
+    retry_after: float = Field(..., description="Секунд до пробного вызова")
+
+
+class TokenCacheStats(BaseModel):
+    """
+    Схема для статистики кэша проверенных JWT
+    """
+
+    size: int = Field(..., description="Токенов в кэше")
+    hits: int = Field(..., description="Токенов, взятых из кэша")
+    misses: int = Field(..., description="Токенов, проверенных заново")
+    hit_rate: float = Field(..., description="Доля попаданий в кэш")
+    decode_time_avg_ms: float = Field(
+        ..., description="Среднее время проверки токена, мс"
+    )
+    decode_time_saved_ms: float = Field(
+        ..., description="Сэкономленное кэшем время проверки, мс"
+    )
+
+
+class PasswordHasherStats(BaseModel):
+    """
+    Схема для состояния пула хэширования паролей
+    """
+
+    workers: int = Field(..., description="Потоков для bcrypt")
+    max_queue: int = Field(..., description="Максимальная длина очереди")
+    in_flight: int = Field(..., description="Вызовов в работе и в очереди")
+    calls: int = Field(..., description="Выполненных вызовов")
+    rejected: int = Field(..., description="Вызовов, отклонённых из-за очереди")
+    queue_time_avg_ms: float = Field(..., description="Среднее ожидание в очереди, мс")
+    queue_time_max_ms: float = Field(
+        ..., description="Максимальное ожидание в очереди, мс"
+    )
+    compute_time_avg_ms: float = Field(..., description="Среднее время bcrypt, мс")
+
+
+class SanitizerStats(BaseModel):
+    """
+    Схема для состояния очистки HTML
+    """
+
+    workers: int = Field(..., description="Процессов для длинных текстов")
+    max_length: int = Field(..., description="Максимальная длина текста, символов")
+    cache_entries: int = Field(..., description="Записей в кэше")
+    cache_length: int = Field(..., description="Символов в кэше")
+    hits: int = Field(..., description="Очисток, взятых из кэша или у соседнего вызова")
+    inline: int = Field(..., description="Очисток на месте")
+    offloaded: int = Field(..., description="Очисток в пуле процессов")
+    rejected: int = Field(..., description="Отклонённых слишком длинных текстов")
+
+
+class RecordCacheStats(BaseModel):
+    """
+    Схема для состояния кэша записей
+    """
+
+    size: int = Field(..., description="Записей в памяти воркера")
+    max_size: int = Field(..., description="Максимум записей в памяти воркера")
+    local_hits: int = Field(..., description="Попаданий в памяти воркера")
+    redis_hits: int = Field(..., description="Попаданий в Redis")
+    negative_hits: int = Field(..., description="Попаданий в закэшированный 404")
+    misses: int = Field(..., description="Промахов")
+
+
+class SingleFlightStats(BaseModel):
+    """
+    Схема для состояния схлопывания одинаковых загрузок
+    """
+
+    in_flight: int = Field(..., description="Загрузок в работе")
+    leaders: int = Field(..., description="Выполненных загрузок")
+    coalesced: int = Field(..., description="Вызовов, дождавшихся чужой загрузки")
+    lock_waits: int = Field(
+        ..., description="Загрузок, ждавших блокировку другого воркера"
+    )
+    lock_hits: int = Field(
+        ..., description="Результатов, полученных от другого воркера"
+    )
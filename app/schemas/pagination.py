@@ -8,14 +8,39 @@ T = TypeVar("T")
 class Page(BaseModel, Generic[T]):
     items: list[T] = Field(..., description="Список элементов на текущей странице")
 
-    total: int = Field(
-        ..., ge=0, description="Общее количество элементов с учётом фильтров"
+    total: int | None = Field(
+        ...,
+        ge=0,
+        description="Общее количество элементов с учётом фильтров "
+        "(не считается при пагинации по курсору)",
     )
 
-    page: int = Field(1, ge=1, description="Номер текущей страницы (начиная с 1)")
+    total_exact: bool | None = Field(
+        None,
+        description="Точное ли значение total (false — оценка по статистике БД)",
+    )
+
+    page: int | None = Field(
+        1,
+        ge=1,
+        description="Номер текущей страницы (начиная с 1). "
+        "Пустой при пагинации по курсору",
+    )
 
     size: int = Field(
         20, ge=1, le=100, description="Количество элементов на странице (от 1 до 100)"
     )
 
-    pages: int = Field(..., ge=1, description="Общее количество страниц")
+    pages: int | None = Field(
+        ...,
+        ge=1,
+        description="Общее количество страниц (не считается при пагинации по курсору)",
+    )
+
+    next_cursor: str | None = Field(
+        None, description="Курсор следующей страницы, если она есть"
+    )
+
+    prev_cursor: str | None = Field(
+        None, description="Курсор предыдущей страницы, если она есть"
+    )
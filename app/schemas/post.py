@@ -61,6 +61,19 @@ class PostPublic(PostBase, BaseDBModel):
         from_attributes = True
 
 
+class PostSearchHit(PostPublic):
+    """
+    Схема результата полнотекстового поиска по постам
+    """
+
+    rank: float = Field(..., description="Релевантность поста запросу")
+    snippet: str = Field(
+        ...,
+        description="Фрагмент текста с найденными словами в <mark>",
+        examples=["Мой <mark>первый</mark> пост"],
+    )
+
+
 class PostContent(PostBase, BaseDBModel):
     """
     Публичная схема для отображения поста детально
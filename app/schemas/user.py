@@ -1,3 +1,4 @@
+import uuid
 from typing import Any
 
 from pydantic import BaseModel, EmailStr, Field, model_validator
@@ -93,3 +94,19 @@ class UserPublic(UserBase, AdminUserUpdate):
 
     class Config:
         from_attributes = True
+
+
+class UserPrincipal(BaseModel):
+    """
+    Аутентифицированный пользователь: данные для проверки доступа
+    без пароля, которые можно кэшировать
+    """
+
+    id: uuid.UUID = Field(..., description="ID пользователя")
+    email: str = Field(..., description="Email адрес пользователя")
+    full_name: str | None = Field(None, description="Полное имя пользователя")
+    role: UserRole = Field(..., description="Роль пользователя")
+    is_active: bool = Field(..., description="Статус аккаунта пользователя")
+
+    class Config:
+        from_attributes = True
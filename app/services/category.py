@@ -1,7 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.utils import generate_unique_slug
+from app.core.exceptions import CategoryAlreadyExistsError
+from app.core.utils import save_with_unique_slug
+from app.db.counting import TotalCounter
 from app.db.crud import CRUDFull
+from app.db.record_cache import RecordCache
+from app.db.versions import ModelVersions
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
 
@@ -11,17 +15,19 @@ class CategoryService(CRUDFull[Category, CategoryCreate, CategoryUpdate]):
         "name": Category.name,
         "date_created": Category.date_created,
     }
+    unique_errors = {"name": CategoryAlreadyExistsError}
 
     async def create(self, session: AsyncSession, obj_in: CategoryCreate) -> Category:
-        slug = await generate_unique_slug(session, self.model, obj_in.name)
-        obj_data = obj_in.model_dump()
-        obj_data["slug"] = slug
-        obj = self.model(**obj_data)
-        session.add(obj)
-        await session.commit()
-        await session.refresh(obj)
+        obj = self.model(**obj_in.model_dump())
+        async with self.unique_conflicts(session):
+            await save_with_unique_slug(session, obj, obj_in.name)
+        await self.invalidate()
         return obj
 
 
-def get_category_service() -> CategoryService:
-    return CategoryService(Category)
+def get_category_service(
+    counter: TotalCounter | None = None,
+    records: RecordCache | None = None,
+    versions: ModelVersions | None = None,
+) -> CategoryService:
+    return CategoryService(Category, counter, records, versions)
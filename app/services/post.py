@@ -1,9 +1,38 @@
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Select,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, REGCONFIG, TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.utils import generate_unique_slug
-from app.db.crud import CRUDFull
+from app.core.sanitizer import get_sanitizer_pool
+from app.core.utils import make_snippet, save_with_unique_slug
+from app.db.counting import TotalCounter
+from app.db.crud import ColumnType, CRUDFull
+from app.db.pagination import decode_cursor, encode_cursor
+from app.db.record_cache import RecordCache
+from app.db.versions import ModelVersions
 from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.post import PostCreate, PostPublic, PostUpdate
+
+# Конфигурация и колонка совпадают с миграцией ix_posts_search_vector
+SEARCH_CONFIG = "russian"
+SEARCH_HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+)
+search_vector = literal_column("posts.search_vector", TSVECTOR)
 
 
 class PostService(CRUDFull[Post, PostCreate, PostUpdate]):
@@ -13,29 +42,144 @@ class PostService(CRUDFull[Post, PostCreate, PostUpdate]):
     }
 
     async def create(self, session: AsyncSession, obj_in: PostCreate) -> Post:
-        slug = await generate_unique_slug(session, self.model, obj_in.title)
-        obj_data = obj_in.model_dump()
-        obj_data["slug"] = slug
-        obj = self.model(**obj_data)
-        obj.set_content_html(obj_in.content_html)
-        session.add(obj)
-        await session.commit()
-        await session.refresh(obj)
+        obj = self.model(**obj_in.model_dump())
+        obj.content_html = await get_sanitizer_pool().clean(obj_in.content_html)
+        await save_with_unique_slug(session, obj, obj_in.title)
+        await self.invalidate()
         return obj
 
-    async def update(
-        self, session: AsyncSession, db_obj: Post, obj_in: PostUpdate
-    ) -> Post:
-        update_data = obj_in.model_dump(exclude_unset=True)
-        if "content_html" in update_data:
-            db_obj.set_content_html(update_data.pop("content_html"))
+    async def update_by(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        obj_in: PostUpdate,
+    ) -> Post | None:
+        values = obj_in.model_dump(exclude_unset=True)
+        if "content_html" in values:
+            values["content_html"] = await get_sanitizer_pool().clean(
+                values["content_html"]
+            )
+        return await self.update_values(session, column, value, values)
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        size: int = 20,
+        cursor: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Полнотекстовый поиск по заголовку и тексту поста.
+
+        В PostgreSQL использует сгенерированную колонку search_vector с GIN
+        индексом, ранжирование ts_rank_cd и подсветку ts_headline. На других
+        СУБД (SQLite в тестах) — упрощённый поиск через LIKE.
+        Пагинация keyset по паре (rank, id), возвращает курсор следующей страницы.
+        """
+        if session.bind.dialect.name == "postgresql":
+            stmt, rank = self._search_postgres(query)
+        else:
+            stmt, rank = self._search_fallback(query)
+
+        if cursor is not None:
+            stmt = self._after_cursor(stmt, rank, cursor)
+        stmt = stmt.order_by(rank.desc(), self.model.id.desc()).limit(size + 1)
+
+        if session.bind.dialect.name == "postgresql":
+            stmt = self._with_headline(stmt, query)
+
+        rows = (await session.execute(stmt)).all()
+        items = [dict(row._mapping) for row in rows[:size]]
+
+        if session.bind.dialect.name != "postgresql":
+            terms = query.lower().split()
+            for item in items:
+                item["snippet"] = make_snippet(item.pop("content_html"), terms)
+
+        next_cursor = (
+            encode_cursor("rank", items[-1]["rank"], items[-1]["id"])
+            if len(rows) > size
+            else None
+        )
+        return items, next_cursor
+
+    def _after_cursor(
+        self, stmt: Select[Any], rank: ColumnElement[float], cursor: str
+    ) -> Select[Any]:
+        """
+        Строки после позиции курсора. Ранг сравнивается в double precision:
+        значение в курсоре — float8, и сравнение с float4 из ts_rank_cd
+        теряло бы строки с тем же рангом на границе страниц
+        """
+        position = decode_cursor(cursor, "rank", float)
+        return stmt.where(
+            tuple_(rank, self.model.id)
+            < tuple_(
+                literal(position.value, DOUBLE_PRECISION()),
+                literal(position.id, self.model.id.type),
+            )
+        )
+
+    def _search_columns(self) -> list[ColumnElement[Any]]:
+        columns = self.model.__table__.c
+        return [columns[key] for key in self.rows.projection_keys(PostPublic)]
+
+    def _search_postgres(self, query: str) -> tuple[Select[Any], ColumnElement[float]]:
+        ts_query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), query)
+        # ts_rank_cd возвращает real, курсор хранит ранг как float8
+        rank = cast(func.ts_rank_cd(search_vector, ts_query), DOUBLE_PRECISION)
+        stmt = select(
+            *self._search_columns(),
+            self.model.content_html,
+            rank.label("rank"),
+        ).where(search_vector.bool_op("@@")(ts_query))
+        return stmt, rank
+
+    def _with_headline(self, stmt: Select[Any], query: str) -> Select[Any]:
+        """
+        ts_headline дорогой, поэтому считается только для строк страницы
+        """
+        page = stmt.subquery()
+        ts_query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), query)
+        text = func.regexp_replace(page.c.content_html, "<[^>]*>", " ", "g")
+        headline = func.ts_headline(
+            literal(SEARCH_CONFIG, REGCONFIG), text, ts_query, SEARCH_HEADLINE_OPTIONS
+        )
+        return select(
+            *(column for column in page.c if column.key != "content_html"),
+            headline.label("snippet"),
+        ).order_by(page.c.rank.desc(), page.c.id.desc())
+
+    def _search_fallback(self, query: str) -> tuple[Select[Any], ColumnElement[float]]:
+        terms = query.lower().split()
+        title = func.lower(self.model.title)
+        content = func.lower(self.model.content_html)
+
+        rank: ColumnElement[float] = literal(0.0, Float())
+        conditions = []
+        for term in terms:
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            in_title = title.like(f"%{escaped}%", escape="\\")
+            in_content = content.like(f"%{escaped}%", escape="\\")
+            rank = (
+                rank
+                + case((in_title, 1.0), else_=0.0)
+                + case((in_content, 0.4), else_=0.0)
+            )
+            conditions.append(or_(in_title, in_content))
 
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        stmt = select(
+            *self._search_columns(),
+            self.model.content_html,
+            rank.label("rank"),
+        ).where(and_(*conditions))
+        return stmt, rank
 
 
-def get_post_service() -> PostService:
-    return PostService(Post)
+def get_post_service(
+    counter: TotalCounter | None = None,
+    records: RecordCache | None = None,
+    versions: ModelVersions | None = None,
+) -> PostService:
+    return PostService(Post, counter, records, versions)
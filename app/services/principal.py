@@ -0,0 +1,239 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple, cast
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import Settings
+from app.core.redis import RedisScript
+from app.schemas.user import UserPrincipal
+
+INVALIDATE_CHANNEL = "principal:invalidate"
+
+# Запись в кэш, только если версия пользователя не менялась с момента,
+# когда её прочитали перед загрузкой из БД. KEYS: ключ, ключ версии;
+# ARGV: прочитанная версия ('' — не было), значение, TTL
+FILL_IF_VERSION = RedisScript(
+    """
+local version = redis.call('GET', KEYS[2]) or ''
+if version ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+)
+
+
+class FillToken(NamedTuple):
+    # Поколение кэша в памяти и версия пользователя в Redis до загрузки
+    generation: int
+    version: str
+
+
+class PrincipalCache:
+    """
+    Кэш аутентифицированных пользователей по sub из JWT.
+
+    Первый уровень — TTL-кэш в памяти воркера, второй (если передан redis)
+    — общий для всех воркеров ключ в Redis. invalidate удаляет запись из
+    обоих уровней, увеличивает версию пользователя и через pub/sub сбрасывает
+    запись в памяти остальных воркеров. Пользователь, загруженный из БД до
+    invalidate, в кэш не попадает: запись сверяет версию, прочитанную
+    перед загрузкой.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        redis: aioredis.Redis | None = None,
+        redis_ttl: int = 300,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+        self.local: OrderedDict[str, tuple[float, UserPrincipal]] = OrderedDict()
+        # Растёт при каждом сбросе в этом воркере
+        self.generation = 0
+
+    @staticmethod
+    def _key(user_id: uuid.UUID | str) -> str:
+        return f"principal:{user_id}"
+
+    @staticmethod
+    def _version_key(user_id: uuid.UUID) -> str:
+        return f"principal:version:{user_id}"
+
+    async def get(self, user_id: uuid.UUID) -> UserPrincipal | None:
+        key = self._key(user_id)
+        entry = self.local.get(key)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self.local.move_to_end(key)
+                return principal
+            del self.local[key]
+
+        if self.redis is None:
+            return None
+        try:
+            value = await cast(Awaitable[str | None], self.redis.get(key))
+        except RedisError as e:
+            logger.warning(f"Unable to read cached principal: {e}")
+            return None
+        if value is None:
+            return None
+        principal = UserPrincipal.model_validate_json(value)
+        self._store(key, principal)
+        return principal
+
+    async def get_or_load(
+        self,
+        user_id: uuid.UUID,
+        load: Callable[[], Awaitable[UserPrincipal | None]],
+    ) -> UserPrincipal | None:
+        """
+        Пользователь из кэша, а при промахе — из load с сохранением в кэш
+        """
+        principal = await self.get(user_id)
+        if principal is not None:
+            return principal
+        token = await self.fill_token(user_id)
+        principal = await load()
+        if principal is not None:
+            await self.set(principal, token)
+        return principal
+
+    async def fill_token(self, user_id: uuid.UUID) -> FillToken:
+        """
+        Читается до загрузки пользователя из БД и передаётся в set
+        """
+        if self.redis is None:
+            return FillToken(self.generation, "")
+        try:
+            version = await cast(
+                Awaitable[str | None], self.redis.get(self._version_key(user_id))
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to read principal version: {e}")
+            version = None
+        return FillToken(self.generation, version or "")
+
+    async def set(self, principal: UserPrincipal, token: FillToken) -> None:
+        """
+        Кэширует пользователя, если с момента fill_token его не сбросили
+        """
+        if token.generation != self.generation:
+            return
+        key = self._key(principal.id)
+        if self.redis is not None:
+            try:
+                filled = await FILL_IF_VERSION(
+                    self.redis,
+                    [key, self._version_key(principal.id)],
+                    [token.version, principal.model_dump_json(), self.redis_ttl],
+                )
+            except RedisError as e:
+                logger.warning(f"Unable to cache principal: {e}")
+                return
+            if not filled:
+                return
+        self._store(key, principal)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        key = self._key(user_id)
+        self.generation += 1
+        self.local.pop(key, None)
+        if self.redis is None:
+            return
+        version_key = self._version_key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(version_key)
+                # Версия должна пережить любую загрузку, начатую до сброса
+                pipe.expire(version_key, self.redis_ttl)
+                pipe.delete(key)
+                await pipe.execute()
+            await self.redis.publish(INVALIDATE_CHANNEL, key)
+        except RedisError as e:
+            logger.warning(f"Unable to invalidate cached principal: {e}")
+
+    async def listen(self) -> None:
+        """
+        Сбрасывает записи в памяти по сообщениям других воркеров.
+        После разрыва соединения сообщения могли потеряться, поэтому
+        кэш в памяти очищается целиком.
+        """
+        if self.redis is None:
+            return
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    self.generation += 1
+                    self.local.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.generation += 1
+                            self.local.pop(message["data"], None)
+            except RedisError as e:
+                logger.warning(f"Principal invalidation channel is unavailable: {e}")
+                self.generation += 1
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    def _store(self, key: str, principal: UserPrincipal) -> None:
+        self.local[key] = (time.monotonic() + self.ttl, principal)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_size:
+            self.local.popitem(last=False)
+
+
+_cache: PrincipalCache | None = None
+_listener: asyncio.Task[None] | None = None
+
+
+def init_principal_cache(
+    settings: Settings, redis: aioredis.Redis | None
+) -> PrincipalCache:
+    """
+    Создаёт кэш один раз на процесс (воркер) и подписывается на инвалидацию
+    """
+    global _cache, _listener
+
+    if _cache is None:
+        _cache = PrincipalCache(
+            ttl=settings.PRINCIPAL_CACHE_TTL,
+            max_size=settings.PRINCIPAL_CACHE_SIZE,
+            redis=redis if settings.PRINCIPAL_CACHE_REDIS else None,
+            redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL,
+        )
+        if _cache.redis is not None:
+            _listener = asyncio.create_task(_cache.listen())
+    return _cache
+
+
+async def close_principal_cache() -> None:
+    global _cache, _listener
+
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+    _cache = None
+    _listener = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    if _cache is None:
+        raise RuntimeError("Principal cache is not initialized")
+    return _cache
@@ -1,37 +1,54 @@
+from typing import Any
+
 from pydantic import EmailStr
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.constants import UserRole
 from app.core.exceptions import UserAlreadyExistsError
-from app.core.security import hash_password, verify_password
-from app.db.crud import CRUDFull
+from app.core.security import hash_password, password_hasher
+from app.db.crud import ColumnType, CRUDFull
 from app.models.user import User
 from app.schemas.user import AdminUserUpdate, UserCreate, UserUpdate
+from app.services.principal import PrincipalCache
 
 
 class UserService(CRUDFull[User, UserCreate, UserUpdate]):
+    unique_errors = {"email": UserAlreadyExistsError}
+
+    def __init__(
+        self, model: type[User], principals: PrincipalCache | None = None
+    ) -> None:
+        super().__init__(model)
+        self.principals = principals
+
+    async def invalidate_principal(self, user: User | None) -> None:
+        """
+        Сбрасывает закэшированного для авторизации пользователя, чтобы
+        смена роли, блокировка или удаление действовали сразу
+        """
+        if user is not None and self.principals is not None:
+            await self.principals.invalidate(user.id)
+
     async def authenticate(
         self, session: AsyncSession, email: EmailStr, password: str
     ) -> User | None:
         user = await self.get_by(session, self.model.email, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
     async def create(self, session: AsyncSession, obj_in: UserCreate) -> User:
-        if await self.get_by(session, self.model.email, obj_in.email):
-            raise UserAlreadyExistsError()
         obj = self.model(
             email=obj_in.email,
             full_name=obj_in.full_name,
-            hashed_password=hash_password(obj_in.password),
+            hashed_password=await password_hasher.hash(obj_in.password),
         )
         session.add(obj)
-        await session.commit()
-        await session.refresh(obj)
+        async with self.unique_conflicts(session):
+            await session.commit()
         return obj
 
     async def create_superuser(
@@ -55,15 +72,33 @@ class UserService(CRUDFull[User, UserCreate, UserUpdate]):
         return user
 
     async def admin_update(
-        self, session: AsyncSession, db_obj: User, obj_in: AdminUserUpdate
-    ) -> User:
-        update_data = obj_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-        await session.commit()
-        await session.refresh(db_obj)
-        return db_obj
+        self, session: AsyncSession, email: EmailStr, obj_in: AdminUserUpdate
+    ) -> User | None:
+        """
+        Изменение роли и статуса пользователя одним UPDATE ... RETURNING
+        """
+        return await self.update_values(
+            session, self.model.email, email, obj_in.model_dump(exclude_unset=True)
+        )
+
+    async def update_values(
+        self,
+        session: AsyncSession,
+        column: ColumnType,
+        value: Any,
+        values: dict[str, Any],
+    ) -> User | None:
+        user = await super().update_values(session, column, value, values)
+        await self.invalidate_principal(user)
+        return user
+
+    async def remove_by(
+        self, session: AsyncSession, column: ColumnType, value: Any
+    ) -> User | None:
+        user = await super().remove_by(session, column, value)
+        await self.invalidate_principal(user)
+        return user
 
 
-def get_user_service() -> UserService:
-    return UserService(User)
+def get_user_service(principals: PrincipalCache | None = None) -> UserService:
+    return UserService(User, principals)
@@ -0,0 +1,115 @@
+"""
+Бенчмарк rate limit middleware на /utils/health-check.
+
+Сравнивает прежний вариант через @app.middleware("http")
+(BaseHTTPMiddleware) с чистым ASGI RateLimitMiddleware. Приложение
+вызывается напрямую по ASGI, без HTTP-клиента, лимитер — в памяти
+процесса, поэтому разница — только накладные расходы самого middleware.
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_middleware.py
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+from unittest.mock import patch
+
+os.environ["MAX_REQUESTS_PER_MINUTE"] = str(10**9)
+
+from fastapi import FastAPI, Request, status  # noqa: E402
+from starlette.responses import JSONResponse, Response  # noqa: E402
+from starlette.types import Message  # noqa: E402
+
+from app.api.v1.router import router as api_router  # noqa: E402
+from app.core import middlewares  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.rate_limit import InMemoryLimiter  # noqa: E402
+
+REQUESTS = 20_000
+
+
+async def http_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    Прежняя реализация на BaseHTTPMiddleware
+    """
+    settings = get_settings()
+    path = request.url.path.removeprefix(request.scope.get("root_path", ""))
+    group = middlewares.get_route_group(path, settings)
+
+    result = await middlewares.get_rate_limiter().hit(
+        middlewares.get_redis_client(),
+        f"rate:{group}:{middlewares.get_client_identity(request)}",
+        middlewares.get_rate_limit(group, settings),
+    )
+    headers = middlewares.rate_limit_headers(result)
+
+    if not result.allowed:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests"},
+            headers=headers,
+        )
+
+    response = await call_next(request)
+    response.headers.update(headers)
+    return response
+
+
+def make_app(kind: str) -> FastAPI:
+    app = FastAPI(root_path="/api/v1")
+    app.include_router(api_router)
+    if kind == "http":
+        app.middleware("http")(http_middleware)
+    elif kind == "asgi":
+        app.add_middleware(middlewares.RateLimitMiddleware)
+    return app
+
+
+async def run(app: FastAPI) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/utils/health-check",
+        "raw_path": b"/api/v1/utils/health-check",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    for _ in range(500):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    with (
+        patch.object(middlewares, "get_redis_client", return_value=None),
+        patch.object(middlewares, "get_rate_limiter", return_value=InMemoryLimiter()),
+    ):
+        results = {kind: await run(make_app(kind)) for kind in ("none", "http", "asgi")}
+
+    print(f"{'middleware':>10} {'requests/s':>11}")
+    for kind, value in results.items():
+        print(f"{kind:>10} {value:>11.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
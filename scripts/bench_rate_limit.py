@@ -0,0 +1,112 @@
+"""
+Бенчмарк накладных расходов rate limit middleware.
+
+Сравнивает прежнюю схему (новый клиент Redis на каждый запрос, INCR и
+отдельный EXPIRE) с общим клиентом и одним вызовом Lua-скрипта.
+Redis — in-process fakeredis, поэтому время не включает сетевой RTT
+и TCP-handshake нового соединения; сколько новых пулов (и соединений)
+создаётся на запрос, показано отдельно.
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_rate_limit.py
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from redis import asyncio as aioredis
+from starlette.responses import Response
+
+from app.core.redis import incr_with_ttl
+
+REQUESTS = 5_000
+
+CallNext = Callable[[Request], Awaitable[Response]]
+Middleware = Callable[[Request, CallNext], Awaitable[Response]]
+
+server = FakeServer()
+pools = 0
+pool_init = aioredis.ConnectionPool.__init__
+
+
+def counting_pool_init(
+    self: aioredis.ConnectionPool, *args: Any, **kwargs: Any
+) -> None:
+    global pools
+    pools += 1
+    pool_init(self, *args, **kwargs)
+
+
+async def old_middleware(request: Request, call_next: CallNext) -> Response:
+    redis = FakeAsyncRedis(server=server, decode_responses=True)
+    key = f"rate:old:{request.client.host if request.client else 'unknown'}"
+    count = await redis.incr(key)
+    if count == 1:
+        await redis.expire(key, 60)
+    response = await call_next(request)
+    await redis.aclose()
+    return response
+
+
+def make_new_middleware(redis: aioredis.Redis) -> Middleware:
+    async def new_middleware(request: Request, call_next: CallNext) -> Response:
+        ip = request.client.host if request.client else "unknown"
+        await incr_with_ttl(redis, f"rate:new:{ip}", 60)
+        return await call_next(request)
+
+    return new_middleware
+
+
+def make_app(middleware: Middleware | None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    if middleware is not None:
+        app.middleware("http")(middleware)
+    return app
+
+
+async def run(app: FastAPI) -> tuple[float, float]:
+    global pools
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for _ in range(100):
+            await client.get("/ping")
+        pools = 0
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.get("/ping")
+        elapsed = time.perf_counter() - start
+    return elapsed / REQUESTS * 1_000_000, pools / REQUESTS
+
+
+async def main() -> None:
+    aioredis.ConnectionPool.__init__ = counting_pool_init  # type: ignore[method-assign]
+    redis = FakeAsyncRedis(server=server, decode_responses=True)
+
+    baseline, _ = await run(make_app(None))
+    results = {
+        "new client + INCR/EXPIRE": await run(make_app(old_middleware)),
+        "shared client + EVALSHA": await run(make_app(make_new_middleware(redis))),
+    }
+    await redis.aclose()
+
+    print(f"without middleware: {baseline:.0f} us/request")
+    print(f"{'middleware':>26} {'us/request':>11} {'overhead, us':>13} {'pools':>6}")
+    for name, (value, per_request) in results.items():
+        print(
+            f"{name:>26} {value:>11.0f} {value - baseline:>13.0f} {per_request:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+Бенчмарк чтения списка постов: ORM-объекты против Core Row.
+
+Сравнивает полный путь эндпоинта GET /posts без HTTP: выборка страницы
+с total и валидация в Page[PostPublic].
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_read_path.py
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.crud import CRUDReadBase
+from app.models.base import Base
+from app.models.category import Category
+from app.models.post import Post
+from app.schemas.pagination import Page
+from app.schemas.post import PostPublic
+from app.services.post import PostService
+
+POSTS = 2_000
+CONTENT = "<p>" + "Lorem ipsum dolor sit amet. " * 200 + "</p>"
+ITERATIONS = 300
+
+
+async def run(
+    reader: CRUDReadBase[Post, Any], session: AsyncSession, size: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        session.expunge_all()
+        items, total = await reader.paginate(
+            session,
+            page=3,
+            size=size,
+            order_by=Post.date_created,
+            projection=PostPublic,
+        )
+        assert total is not None
+        Page[PostPublic].model_validate(
+            {
+                "items": items,
+                "total": total.value,
+                "page": 3,
+                "size": size,
+                "pages": total.value // size,
+            },
+            from_attributes=True,
+        )
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        category = Category(name="bench", slug="bench")
+        session.add(category)
+        await session.flush()
+        session.add_all(
+            Post(
+                title=f"Post {i}",
+                content_html=CONTENT,
+                slug=f"post-{i}-{uuid.uuid4().hex[:8]}",
+                category_id=category.id,
+            )
+            for i in range(POSTS)
+        )
+        await session.commit()
+
+        service = PostService(Post)
+        print(f"{'size':>6} {'orm, ms':>10} {'rows, ms':>10} {'speedup':>8}")
+        for size in (20, 100):
+            await run(service, session, size)
+            orm = await run(service, session, size)
+            rows = await run(service.rows, session, size)
+            print(f"{size:>6} {orm:>10.3f} {rows:>10.3f} {orm / rows:>7.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
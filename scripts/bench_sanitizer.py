@@ -0,0 +1,98 @@
+"""
+Бенчмарк санитайзеров HTML на постах разного размера.
+
+Сравнивает прежний вызов bleach.clean (новый Cleaner на каждый пост)
+с переиспользуемым BleachSanitizer и Nh3Sanitizer при одной политике
+ALLOWED_TAGS/ALLOWED_ATTRIBUTES. Заодно проверяет, что на корпусе
+бэкенды дают одинаковый результат (с точностью до html_events).
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_sanitizer.py
+"""
+
+import random
+import time
+from collections.abc import Callable
+
+import bleach
+
+from app.core.config import get_settings
+from app.core.constants import SanitizerBackend
+from app.core.sanitizer import make_sanitizer
+from tests.core.test_sanitizer import html_events
+
+FRAGMENTS = [
+    "<h2>Заголовок раздела</h2>",
+    "<p>Обычный абзац с <strong>жирным</strong> и <em>курсивом</em> текстом.</p>",
+    '<p>Ссылка на <a href="https://example.com/?a=1&b=2" title="Пример">сайт</a>.</p>',
+    '<p class="lead" style="color: red">Абзац с лишними атрибутами</p>',
+    "<ul><li>Первый пункт</li><li>Второй &amp; третий</li></ul>",
+    "<blockquote>Цитата &laquo;в кавычках&raquo;</blockquote>",
+    "<pre><code>def f(x):\n    return x &lt; 1</code></pre>",
+    '<p><span onclick="alert(1)">Текст в span</span></p>',
+    "<script>alert('xss')</script>",
+    '<a href="javascript:alert(1)">плохая ссылка</a>',
+    '<img src="x.png" alt="картинка" onerror="alert(1)">',
+    "<p><b>Жирный</b> и <u>подчёркнутый</u> без разрешения</p>",
+    "<!-- комментарий --><p>После комментария</p>",
+]
+
+SIZES = {
+    "small": 500,
+    "medium": 20_000,
+    "1 MB": 1_000_000,
+}
+
+
+def make_post(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        fragment = rng.choice(FRAGMENTS)
+        parts.append(fragment)
+        length += len(fragment.encode())
+    return "".join(parts)
+
+
+def measure(clean: Callable[[str], str], html: str) -> float:
+    clean(html)
+    runs = max(1, min(200, 200_000 // len(html)))
+    start = time.perf_counter()
+    for _ in range(runs):
+        clean(html)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main() -> None:
+    settings = get_settings()
+
+    def bleach_per_call(html: str) -> str:
+        return bleach.clean(
+            html,
+            tags=settings.ALLOWED_TAGS,
+            attributes=settings.ALLOWED_ATTRIBUTES,
+            strip=True,
+        )
+
+    backends = {
+        "bleach.clean": bleach_per_call,
+        **{
+            backend.value: make_sanitizer(
+                backend, settings.ALLOWED_TAGS, settings.ALLOWED_ATTRIBUTES
+            ).clean
+            for backend in SanitizerBackend
+        },
+    }
+
+    print(f"{'post':>8} " + " ".join(f"{name + ', ms':>16}" for name in backends))
+    for name, size in SIZES.items():
+        html = make_post(size)
+        outputs = [html_events(backend(html)) for backend in backends.values()]
+        assert all(item == outputs[0] for item in outputs), f"differ on {name} post"
+        timings = [measure(clean, html) for clean in backends.values()]
+        print(f"{name:>8} " + " ".join(f"{value:>16.3f}" for value in timings))
+
+
+if __name__ == "__main__":
+    main()
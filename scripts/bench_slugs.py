@@ -0,0 +1,78 @@
+"""
+Бенчмарк генерации slug при массовых совпадениях заголовков.
+
+Сравнивает прежний перебор кандидатов (запрос на каждый суффикс)
+с выборкой всех занятых вариантов одним запросом.
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_slugs.py
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from slugify import slugify
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.utils import generate_unique_slug
+from app.models.base import Base
+from app.models.category import Category
+from app.models.post import Post  # noqa: F401  нужен для связи Category.posts
+
+TITLES = 1_000
+Generator = Callable[[AsyncSession, str], Awaitable[str]]
+
+
+async def loop_slug(session: AsyncSession, value: str) -> str:
+    """
+    Прежняя реализация: по запросу на каждый занятый кандидат
+    """
+    base_slug = slug = slugify(value)
+    counter = 1
+    while await session.scalar(select(Category).where(Category.slug == slug)):
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+
+async def single_query_slug(session: AsyncSession, value: str) -> str:
+    return await generate_unique_slug(session, Category, value)
+
+
+async def run(generate: Generator) -> tuple[float, int]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = 0
+
+    def count(*_: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    async with AsyncSession(engine) as session:
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        start = time.perf_counter()
+        for _ in range(TITLES):
+            slug = await generate(session, "Одинаковый заголовок")
+            session.add(Category(name=slug, slug=slug))
+            await session.flush()
+        elapsed = time.perf_counter() - start
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    await engine.dispose()
+    # Каждая вставка — тоже один запрос, в сравнении нужны только выборки slug
+    return elapsed, statements - TITLES
+
+
+async def main() -> None:
+    print(f"{'strategy':>14} {'selects':>10} {'time, s':>10}")
+    for name, generate in (("loop", loop_slug), ("single query", single_query_slug)):
+        elapsed, selects = await run(generate)
+        print(f"{name:>14} {selects:>10} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Бенчмарк локального уровня rate limit во время флуда.
+
+За одно окно 1000 обычных клиентов присылают по 20 запросов, а 10
+флудеров — по 2000. Лимит 100 запросов в минуту. Сравнивается число
+обращений к Redis и число пропущенных запросов у точного лимитера
+и у двухуровневого (shared memory + Redis). Redis — in-process fakeredis.
+
+Запуск из корня проекта:
+    PYTHONPATH=. python scripts/bench_two_tier.py
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any
+
+from fakeredis import FakeAsyncRedis
+
+from app.core.constants import RateLimit
+from app.core.local_limit import SharedCounters, TwoTierLimiter
+from app.core.rate_limit import RateLimiter, SlidingWindowCounterLimiter
+
+RATE = RateLimit(limit=100, window=60)
+CLIENTS = 1_000
+CLIENT_REQUESTS = 20
+FLOODERS = 10
+FLOOD_REQUESTS = 2_000
+
+
+class CountingLimiter(SlidingWindowCounterLimiter):
+    calls = 0
+
+    async def _apply(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        return await super()._apply(*args, **kwargs)
+
+
+def make_requests() -> list[str]:
+    keys = [f"rate:default:ip:client-{i}" for i in range(CLIENTS)] * CLIENT_REQUESTS
+    keys += [f"rate:default:ip:flood-{i}" for i in range(FLOODERS)] * FLOOD_REQUESTS
+    random.Random(0).shuffle(keys)
+    return keys
+
+
+async def run(limiter: RateLimiter, keys: list[str]) -> tuple[int, float]:
+    redis = FakeAsyncRedis(decode_responses=True)
+    # Все запросы внутри одной минуты
+    start = 1_800_000_000.0
+    step = (RATE.window - 1) / len(keys)
+    allowed = 0
+    begin = time.perf_counter()
+    for i, key in enumerate(keys):
+        result = await limiter.hit(redis, key, RATE, now=start + i * step)
+        allowed += result.allowed
+    elapsed = time.perf_counter() - begin
+    await redis.aclose()
+    return allowed, elapsed
+
+
+async def main() -> None:
+    keys = make_requests()
+
+    precise = CountingLimiter()
+    precise_allowed, precise_time = await run(precise, keys)
+
+    path = os.path.join(tempfile.mkdtemp(), "rate-limit")
+    counters = SharedCounters(path, slots=65536)
+    inner = CountingLimiter()
+    two_tier = TwoTierLimiter(
+        inner, counters, headroom=0.5, reject_factor=2.0, batch=10, flush_interval=10.0
+    )
+    two_tier_allowed, two_tier_time = await run(two_tier, keys)
+    counters.close()
+
+    print(f"requests: {len(keys)}")
+    print(f"{'limiter':>10} {'redis calls':>12} {'allowed':>8} {'time, s':>8}")
+    for name, calls, allowed, elapsed in (
+        ("precise", precise.calls, precise_allowed, precise_time),
+        ("two-tier", inner.calls, two_tier_allowed, two_tier_time),
+    ):
+        print(f"{name:>10} {calls:>12} {allowed:>8} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,10 @@
+from unittest.mock import patch
+
 import pytest
 from httpx import AsyncClient
 
+from app.core.exceptions import PasswordHasherBusyError
+
 
 @pytest.mark.asyncio
 class TestAuthAPI:
@@ -116,3 +120,38 @@ class TestAuthAPI:
         )
         assert response.status_code == 401
         assert "Invalid refresh token" in response.json()["detail"]
+
+    async def test_login_when_password_hasher_is_busy(
+        self, test_client: AsyncClient, test_user
+    ):
+        with patch(
+            "app.services.user.password_hasher.verify",
+            side_effect=PasswordHasherBusyError(),
+        ):
+            response = await test_client.post(
+                "/api/v1/auth/login",
+                data={"username": test_user.email, "password": "ЯНастоящийЛёва"},
+            )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    async def test_login_lockout_skips_password_check(
+        self, test_client: AsyncClient, test_user, settings
+    ):
+        for _ in range(settings.LOGIN_THROTTLE_EMAIL_ATTEMPTS):
+            response = await test_client.post(
+                "/api/v1/auth/login",
+                data={"username": test_user.email, "password": "wrongpassword"},
+            )
+            assert response.status_code == 401
+
+        with patch("app.services.user.UserService.authenticate") as authenticate:
+            response = await test_client.post(
+                "/api/v1/auth/login",
+                data={"username": test_user.email, "password": "ЯНастоящийЛёва"},
+            )
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        authenticate.assert_not_called()
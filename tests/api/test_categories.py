@@ -1,6 +1,10 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
+from app.models.category import Category
+
 
 @pytest.mark.asyncio
 class TestCategoryAPI:
@@ -23,19 +27,16 @@ class TestCategoryAPI:
         data = response.json()
         assert len(data["items"]) == 1
         assert data["total"] == 1
+        assert data["total_exact"] is True
         assert data["items"][0]["name"] == test_category.name
 
-    async def test_create_category_as_admin(self, test_client: AsyncClient, admin_user):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": admin_user.email, "password": "топсикретпассворд"},
-        )
-        token = login_response.json()["access_token"]
-
+    async def test_create_category_as_admin(
+        self, test_client: AsyncClient, admin_headers
+    ):
         response = await test_client.post(
             "/api/v1/categories",
             json={"name": "New Category"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=admin_headers,
         )
         assert response.status_code == 200
         data = response.json()
@@ -43,33 +44,48 @@ class TestCategoryAPI:
         assert "slug" in data
 
     async def test_create_category_as_user_forbidden(
-        self, test_client: AsyncClient, test_user
+        self, test_client: AsyncClient, user_headers
     ):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": test_user.email, "password": "ЯНастоящийЛёва"},
-        )
-        token = login_response.json()["access_token"]
-
         response = await test_client.post(
             "/api/v1/categories",
             json={"name": "Unauthorized Category"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=user_headers,
         )
         assert response.status_code == 403
 
     async def test_delete_category_not_found(
-        self, test_client: AsyncClient, admin_user
+        self, test_client: AsyncClient, admin_headers
     ):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": admin_user.email, "password": "топсикретпассворд"},
-        )
-        token = login_response.json()["access_token"]
-
         response = await test_client.delete(
             "/api/v1/categories/00000000",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=admin_headers,
         )
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
+
+    async def test_create_category_duplicate_name(
+        self, test_client: AsyncClient, admin_headers, test_category
+    ):
+        response = await test_client.post(
+            "/api/v1/categories",
+            json={"name": test_category.name},
+            headers=admin_headers,
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Category already exists"
+
+    async def test_update_category_duplicate_name(
+        self, test_client: AsyncClient, test_db, admin_headers, test_category
+    ):
+        other = Category(
+            name=f"Другая {uuid.uuid4().hex}", slug=f"other-{uuid.uuid4().hex}"
+        )
+        test_db.add(other)
+        await test_db.flush()
+        response = await test_client.put(
+            f"/api/v1/categories/{other.slug}",
+            json={"name": test_category.name},
+            headers=admin_headers,
+        )
+        assert response.status_code == 400
+        assert test_category.name in response.json()["detail"]
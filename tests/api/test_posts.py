@@ -1,6 +1,13 @@
+from datetime import datetime
+from unittest.mock import patch
+
 import pytest
 from httpx import AsyncClient
 
+from app.core.sanitizer import get_sanitizer_pool
+from app.models.category import Category
+from app.models.post import Post
+
 
 @pytest.mark.asyncio
 class TestPostAPI:
@@ -24,14 +31,8 @@ class TestPostAPI:
         assert "not found" in response.json()["detail"].lower()
 
     async def test_create_post_as_admin(
-        self, test_client: AsyncClient, admin_user, test_category
+        self, test_client: AsyncClient, admin_headers, test_category
     ):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": admin_user.email, "password": "топсикретпассворд"},
-        )
-        token = login_response.json()["access_token"]
-
         response = await test_client.post(
             "/api/v1/posts",
             json={
@@ -39,26 +40,145 @@ class TestPostAPI:
                 "content_html": "<p>Post content</p>",
                 "category_id": str(test_category.id),
             },
-            headers={"Authorization": f"Bearer {token}"},
+            headers=admin_headers,
         )
         assert response.status_code == 200
         data = response.json()
         assert data["title"] == "New Post"
         assert "slug" in data
 
-    async def test_delete_post_as_admin(
-        self, test_client: AsyncClient, admin_user, test_post
+    async def test_create_post_too_large(
+        self, test_client: AsyncClient, admin_headers, test_category
     ):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": admin_user.email, "password": "топсикретпассворд"},
-        )
-        token = login_response.json()["access_token"]
+        with patch.object(get_sanitizer_pool(), "max_length", 100):
+            response = await test_client.post(
+                "/api/v1/posts",
+                json={
+                    "title": "Huge Post",
+                    "content_html": "<p>" + "x" * 100 + "</p>",
+                    "category_id": str(test_category.id),
+                },
+                headers=admin_headers,
+            )
 
+        assert response.status_code == 413
+
+    async def test_delete_post_as_admin(
+        self, test_client: AsyncClient, admin_headers, test_post
+    ):
         response = await test_client.delete(
             f"/api/v1/posts/{test_post.slug}",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=admin_headers,
         )
         assert response.status_code == 200
         data = response.json()
         assert data["id"] == str(test_post.id)
+
+    async def test_get_posts_response_cache(
+        self, test_client: AsyncClient, admin_headers, test_post, capture_statements
+    ):
+        first = await test_client.get("/api/v1/posts", params={"size": 5})
+        with capture_statements() as statements:
+            cached = await test_client.get("/api/v1/posts", params={"size": 5})
+
+        assert cached.status_code == 200
+        assert cached.json() == first.json()
+        assert statements == []
+
+        await test_client.put(
+            f"/api/v1/posts/{test_post.slug}",
+            json={"title": "Заголовок после правки"},
+            headers=admin_headers,
+        )
+        updated = await test_client.get("/api/v1/posts", params={"size": 5})
+
+        titles = [item["title"] for item in updated.json()["items"]]
+        assert "Заголовок после правки" in titles
+
+    async def test_get_posts_keyset_pagination(self, test_client: AsyncClient, test_db):
+        category = Category(name="Keyset", slug="keyset")
+        test_db.add(category)
+        await test_db.flush()
+        for day, title in enumerate(("a", "b", "c"), start=1):
+            test_db.add(
+                Post(
+                    title=f"keyset-{title}",
+                    content_html="<p>keyset</p>",
+                    slug=f"keyset-{title}",
+                    category_id=category.id,
+                    date_created=datetime(2026, 1, day),
+                )
+            )
+        await test_db.flush()
+
+        url = f"/api/v1/categories/{category.slug}/posts"
+        first = (await test_client.get(url, params={"size": 2})).json()
+        assert len(first["items"]) == 2
+        assert first["prev_cursor"] is None
+
+        second = (
+            await test_client.get(
+                url, params={"size": 2, "cursor": first["next_cursor"]}
+            )
+        ).json()
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
+        assert second["total"] is None
+
+        assert [p["slug"] for p in first["items"]] == ["keyset-c", "keyset-b"]
+        assert [p["slug"] for p in second["items"]] == ["keyset-a"]
+
+        back = (
+            await test_client.get(
+                url, params={"size": 2, "cursor": second["prev_cursor"]}
+            )
+        ).json()
+        assert back["items"] == first["items"]
+        assert back["prev_cursor"] is None
+
+    async def test_get_posts_invalid_cursor(self, test_client: AsyncClient):
+        response = await test_client.get(
+            "/api/v1/posts", params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+
+    async def test_search_posts(self, test_client: AsyncClient, test_db, test_category):
+        for i, (title, content) in enumerate(
+            [
+                ("Searchable zebra guide", "<p>All about stripes</p>"),
+                ("Other post", "<p>A <strong>zebra</strong> appears here</p>"),
+                ("Unrelated", "<p>Nothing to see</p>"),
+            ]
+        ):
+            test_db.add(
+                Post(
+                    title=title,
+                    content_html=content,
+                    slug=f"search-{i}",
+                    category_id=test_category.id,
+                )
+            )
+        await test_db.flush()
+
+        response = await test_client.get(
+            "/api/v1/posts/search", params={"q": "zebra", "size": 1}
+        )
+        assert response.status_code == 200
+        first = response.json()
+        assert [p["slug"] for p in first["items"]] == ["search-0"]
+        assert first["next_cursor"] is not None
+
+        second = (
+            await test_client.get(
+                "/api/v1/posts/search",
+                params={"q": "zebra", "size": 1, "cursor": first["next_cursor"]},
+            )
+        ).json()
+        assert [p["slug"] for p in second["items"]] == ["search-1"]
+        assert second["items"][0]["rank"] < first["items"][0]["rank"]
+        assert second["items"][0]["snippet"] == "A <mark>zebra</mark> appears here"
+        assert second["next_cursor"] is None
+
+    async def test_search_posts_too_short_query(self, test_client: AsyncClient):
+        response = await test_client.get("/api/v1/posts/search", params={"q": "z"})
+        assert response.status_code == 422
@@ -0,0 +1,66 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.models.post import Post
+
+LIST_REQUESTS = [
+    ("/api/v1/posts", {"order_by": "date_created", "order_dir": "asc"}),
+    ("/api/v1/posts", {"order_by": "date_created", "order_dir": "desc"}),
+    ("/api/v1/posts", {"order_by": "title", "order_dir": "asc"}),
+    ("/api/v1/posts", {"order_by": "title", "order_dir": "desc"}),
+    ("/api/v1/categories", {"order_by": "date_created", "order_dir": "asc"}),
+    ("/api/v1/categories", {"order_by": "name", "order_dir": "desc"}),
+    ("/api/v1/categories/{slug}/posts", {}),
+]
+
+
+@pytest.mark.asyncio
+class TestQueryPlans:
+    @pytest.mark.parametrize(("url", "params"), LIST_REQUESTS)
+    async def test_list_queries_use_index_order(
+        self,
+        test_client: AsyncClient,
+        test_db: AsyncSession,
+        capture_statements,
+        test_post: Post,
+        test_category,
+        url,
+        params,
+    ):
+        test_db.add(
+            Category(name=f"{test_category.name}-2", slug=f"{test_category.slug}-2")
+        )
+        test_db.add(
+            Post(
+                title="Second",
+                content_html="<p>second</p>",
+                slug=f"{test_post.slug}-2",
+                category_id=test_category.id,
+            )
+        )
+        await test_db.flush()
+
+        url = url.format(slug=test_category.slug)
+        with capture_statements() as captured:
+            first = await test_client.get(url, params={**params, "size": 1})
+            cursor = first.json()["next_cursor"]
+            await test_client.get(url, params={**params, "size": 1, "cursor": cursor})
+
+        statements = [
+            statement
+            for statement in captured
+            if statement.sql.startswith("SELECT") and "ORDER BY" in statement.sql
+        ]
+        assert len(statements) == 2
+        connection = await test_db.connection()
+        for statement, parameters in statements:
+            plan = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            details = [row.detail for row in plan]
+            assert not any("TEMP B-TREE FOR ORDER BY" in d for d in details), (
+                statement,
+                details,
+            )
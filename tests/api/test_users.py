@@ -4,16 +4,12 @@ from httpx import AsyncClient
 
 @pytest.mark.asyncio
 class TestUserAPI:
-    async def test_get_current_user(self, test_client: AsyncClient, test_user):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": test_user.email, "password": "ЯНастоящийЛёва"},
-        )
-        token = login_response.json()["access_token"]
-
+    async def test_get_current_user(
+        self, test_client: AsyncClient, test_user, user_headers
+    ):
         response = await test_client.get(
             "/api/v1/users/me",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=user_headers,
         )
         assert response.status_code == 200
         data = response.json()
@@ -33,20 +29,42 @@ class TestUserAPI:
         assert response.status_code == 401
 
     async def test_change_user_role_as_admin(
-        self, test_client: AsyncClient, admin_user, test_user
+        self, test_client: AsyncClient, admin_headers, test_user
     ):
-        login_response = await test_client.post(
-            "/api/v1/auth/login",
-            data={"username": admin_user.email, "password": "топсикретпассворд"},
-        )
-        token = login_response.json()["access_token"]
-
         response = await test_client.post(
             "/api/v1/users/change",
             json={"role": "admin"},
             params={"email": test_user.email},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=admin_headers,
         )
         assert response.status_code == 200
         data = response.json()
         assert data["role"] == "admin"
+
+    async def test_current_user_is_cached(
+        self, test_client: AsyncClient, capture_statements, test_user, user_headers
+    ):
+        await test_client.get("/api/v1/users/me", headers=user_headers)
+
+        with capture_statements() as statements:
+            response = await test_client.get("/api/v1/users/me", headers=user_headers)
+
+        assert response.status_code == 200
+        assert response.json()["email"] == test_user.email
+        assert statements == []
+
+    async def test_deactivation_applies_to_cached_user(
+        self, test_client: AsyncClient, test_user, user_headers, admin_headers
+    ):
+        cached = await test_client.get("/api/v1/users/me", headers=user_headers)
+
+        await test_client.post(
+            "/api/v1/users/change",
+            json={"is_active": False},
+            params={"email": test_user.email},
+            headers=admin_headers,
+        )
+        response = await test_client.get("/api/v1/users/me", headers=user_headers)
+
+        assert cached.status_code == 200
+        assert response.status_code == 403
@@ -0,0 +1,34 @@
+import pytest
+from httpx import AsyncClient
+
+STATS_URLS = [
+    "/api/v1/utils/db-pool",
+    "/api/v1/utils/rate-limit-breaker",
+    "/api/v1/utils/token-cache",
+    "/api/v1/utils/password-hasher",
+    "/api/v1/utils/sanitizer",
+    "/api/v1/utils/record-cache",
+    "/api/v1/utils/single-flight",
+]
+
+
+@pytest.mark.asyncio
+class TestUtilsAPI:
+    @pytest.mark.parametrize("url", STATS_URLS)
+    async def test_stats_require_authentication(self, test_client: AsyncClient, url):
+        response = await test_client.get(url)
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize("url", STATS_URLS)
+    async def test_stats_forbidden_for_user(
+        self, test_client: AsyncClient, user_headers, url
+    ):
+        response = await test_client.get(url, headers=user_headers)
+        assert response.status_code == 403
+
+    async def test_stats_as_admin(self, test_client: AsyncClient, admin_headers):
+        response = await test_client.get(
+            "/api/v1/utils/password-hasher", headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["in_flight"] == 0
@@ -1,10 +1,14 @@
 import asyncio
 import uuid
-from collections.abc import AsyncGenerator
-from unittest.mock import AsyncMock, patch
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+from unittest.mock import patch
 
 import pytest_asyncio
+from fakeredis import aioredis as fakeredis
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -13,13 +17,24 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core.config import get_settings
 from app.core.constants import UserRole
+from app.core.rate_limit import make_rate_limiter
 from app.core.security import hash_password
+from app.core.single_flight import SingleFlight
+from app.db.record_cache import RecordCache
 from app.models.base import Base
 from app.models.category import Category
 from app.models.post import Post
 from app.models.user import User
+from app.services.principal import PrincipalCache
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+USER_PASSWORD = "ЯНастоящийЛёва"
+ADMIN_PASSWORD = "топсикретпассворд"
+
+
+class Statement(NamedTuple):
+    sql: str
+    parameters: Any
 
 
 @pytest_asyncio.fixture(scope="session")
@@ -54,23 +69,79 @@ async def test_db(test_db_engine) -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest_asyncio.fixture
-async def mock_redis():
-    redis_mock = AsyncMock()
-    redis_mock.incr = AsyncMock(return_value=1)
-    redis_mock.expire = AsyncMock(return_value=True)
-    return redis_mock
+def capture_statements(test_db: AsyncSession):
+    """
+    Контекст, внутри которого собираются SQL-запросы сессии test_db
+    """
+
+    @contextmanager
+    def capture() -> Iterator[list[Statement]]:
+        statements: list[Statement] = []
+
+        def on_execute(*args: Any) -> None:
+            statements.append(Statement(args[2], args[3]))
+
+        engine = test_db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+    return capture
+
+
+@pytest_asyncio.fixture
+async def fake_redis():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    yield redis
+    await redis.aclose()
+
+
+@pytest_asyncio.fixture
+async def principals(fake_redis):
+    return PrincipalCache(ttl=30, max_size=1000, redis=fake_redis)
+
+
+@pytest_asyncio.fixture
+async def flights(fake_redis):
+    return SingleFlight(redis=fake_redis)
 
 
 @pytest_asyncio.fixture
-async def test_client(test_db: AsyncSession, mock_redis):
-    with patch("app.core.redis.get_redis_client", return_value=mock_redis):
-        from app.api.deps import get_db
+async def records(fake_redis, flights):
+    return RecordCache(ttl=30, max_size=1000, redis=fake_redis, flights=flights)
+
+
+@pytest_asyncio.fixture
+async def test_client(
+    test_db: AsyncSession, fake_redis, principals, records, flights, settings
+):
+    limiter = make_rate_limiter(settings.RATE_LIMIT_ALGORITHM)
+    with (
+        patch("app.core.middlewares.get_redis_client", return_value=fake_redis),
+        patch("app.core.middlewares.get_rate_limiter", return_value=limiter),
+    ):
+        from app.api.deps import (
+            get_db,
+            get_flights,
+            get_principals,
+            get_records,
+            get_redis,
+        )
         from app.main import app
 
         async def override_get_db():
             yield test_db
 
+        async def override_get_redis():
+            yield fake_redis
+
         app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_redis] = override_get_redis
+        app.dependency_overrides[get_principals] = lambda: principals
+        app.dependency_overrides[get_records] = lambda: records
+        app.dependency_overrides[get_flights] = lambda: flights
 
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
@@ -86,7 +157,7 @@ async def test_user(test_db: AsyncSession) -> User:
         id=uuid.uuid4(),
         email=f"test-{uuid.uuid4().hex}@example.com",
         full_name="Нелёва",
-        hashed_password=hash_password("ЯНастоящийЛёва"),
+        hashed_password=hash_password(USER_PASSWORD),
         role=UserRole.USER,
         is_active=True,
     )
@@ -101,7 +172,7 @@ async def admin_user(test_db: AsyncSession) -> User:
         id=uuid.uuid4(),
         email=f"admin-{uuid.uuid4().hex}@example.com",
         full_name="Лёва",
-        hashed_password=hash_password("топсикретпассворд"),
+        hashed_password=hash_password(ADMIN_PASSWORD),
         role=UserRole.ADMIN,
         is_active=True,
     )
@@ -134,3 +205,29 @@ async def test_post(test_db: AsyncSession, test_category: Category) -> Post:
     test_db.add(post)
     await test_db.flush()
     return post
+
+
+@pytest_asyncio.fixture
+async def auth_headers(test_client: AsyncClient):
+    """
+    Заголовки с access token пользователя, полученным через /auth/login
+    """
+
+    async def login(user: User, password: str) -> dict[str, str]:
+        response = await test_client.post(
+            "/api/v1/auth/login",
+            data={"username": user.email, "password": password},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return login
+
+
+@pytest_asyncio.fixture
+async def user_headers(auth_headers, test_user: User) -> dict[str, str]:
+    return await auth_headers(test_user, USER_PASSWORD)
+
+
+@pytest_asyncio.fixture
+async def admin_headers(auth_headers, admin_user: User) -> dict[str, str]:
+    return await auth_headers(admin_user, ADMIN_PASSWORD)
@@ -0,0 +1,238 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.constants import CircuitState, RateLimit, RateLimitFailurePolicy
+from app.core.rate_limit import CircuitBreakerLimiter, SlidingWindowCounterLimiter
+
+RATE = RateLimit(limit=3, window=60)
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+
+
+def make_broken_redis(error: Exception | None = None) -> MagicMock:
+    async def slow(*_):
+        await asyncio.sleep(1)
+
+    redis = MagicMock()
+    redis.evalsha = AsyncMock(side_effect=error or slow)
+    return redis
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = make_breaker(FakeClock())
+        breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state is CircuitState.OPEN
+        assert not breaker.allow()
+        assert breaker.open_count == 1
+        assert breaker.rejected == 1
+
+    def test_half_open_allows_single_probe(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        breaker.record_failure()
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now = 10
+        breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.retry_after() == 10
+        assert breaker.open_count == 2
+
+
+@pytest.mark.asyncio
+class TestCircuitBreakerLimiter:
+    async def test_fail_open_uses_in_memory_limiter(self):
+        redis = make_broken_redis(ConnectionError("down"))
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(FakeClock()),
+            timeout=0.05,
+            policy=RateLimitFailurePolicy.FAIL_OPEN,
+        )
+
+        results = [
+            await limiter.hit(redis, "rate:test", RATE, now=NOW) for _ in range(4)
+        ]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        # После размыкания Redis больше не вызывается
+        assert redis.evalsha.await_count == 2
+        assert limiter.breaker.state is CircuitState.OPEN
+
+    async def test_fail_closed_rejects(self):
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(FakeClock()),
+            timeout=0.05,
+            policy=RateLimitFailurePolicy.FAIL_CLOSED,
+        )
+
+        result = await limiter.hit(
+            make_broken_redis(ConnectionError("down")), "rate:test", RATE, now=NOW
+        )
+
+        assert not result.allowed
+        assert result.retry_after >= 1
+
+    async def test_slow_redis_times_out(self):
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(FakeClock()),
+            timeout=0.01,
+            policy=RateLimitFailurePolicy.FAIL_OPEN,
+        )
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await limiter.hit(make_broken_redis(), "rate:test", RATE, now=NOW)
+
+        assert result.allowed
+        assert loop.time() - start < 0.5
+        assert limiter.breaker.failures == 1
+
+    async def test_recovers_after_reset_timeout(self, fake_redis):
+        clock = FakeClock()
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(clock),
+            timeout=0.05,
+            policy=RateLimitFailurePolicy.FAIL_OPEN,
+        )
+        broken = make_broken_redis(ConnectionError("down"))
+        for _ in range(2):
+            await limiter.hit(broken, "rate:test", RATE, now=NOW)
+
+        clock.now = 10
+        await limiter.hit(fake_redis, "rate:test", RATE, now=NOW)
+
+        assert limiter.breaker.state is CircuitState.CLOSED
+
+    async def test_cancelled_probe_does_not_stick_half_open(self, fake_redis):
+        clock = FakeClock()
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(clock),
+            timeout=5,
+            policy=RateLimitFailurePolicy.FAIL_CLOSED,
+        )
+        broken = make_broken_redis(ConnectionError("down"))
+        for _ in range(2):
+            await limiter.hit(broken, "rate:test", RATE, now=NOW)
+
+        # Клиент отключился во время пробного вызова
+        clock.now = 10
+        probe = asyncio.create_task(
+            limiter.hit(make_broken_redis(), "rate:test", RATE, now=NOW)
+        )
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert limiter.breaker.state is CircuitState.HALF_OPEN
+        assert limiter.breaker.failures == 2
+        result = await limiter.hit(fake_redis, "rate:test", RATE, now=NOW)
+        assert result.allowed
+        assert limiter.breaker.state is CircuitState.CLOSED
+
+    async def test_cancelled_calls_leave_breaker_closed(self):
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(FakeClock()),
+            timeout=5,
+            policy=RateLimitFailurePolicy.FAIL_CLOSED,
+        )
+
+        # Клиенты отключаются под нагрузкой, Redis при этом исправен
+        for _ in range(3):
+            call = asyncio.create_task(
+                limiter.hit(make_broken_redis(), "rate:test", RATE, now=NOW)
+            )
+            await asyncio.sleep(0.01)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        assert limiter.breaker.state is CircuitState.CLOSED
+        assert limiter.breaker.failures == 0
+
+    async def test_unexpected_probe_error_releases_probe(self):
+        clock = FakeClock()
+        limiter = CircuitBreakerLimiter(
+            SlidingWindowCounterLimiter(),
+            make_breaker(clock),
+            timeout=5,
+            policy=RateLimitFailurePolicy.FAIL_CLOSED,
+        )
+        broken = make_broken_redis(ConnectionError("down"))
+        for _ in range(2):
+            await limiter.hit(broken, "rate:test", RATE, now=NOW)
+
+        clock.now = 10
+        with pytest.raises(ValueError):
+            await limiter.hit(
+                make_broken_redis(ValueError("bad reply")), "rate:test", RATE, now=NOW
+            )
+
+        assert limiter.breaker.state is CircuitState.HALF_OPEN
+        assert limiter.breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_breaker_stats(test_client: AsyncClient, admin_headers):
+    breaker = make_breaker(FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+
+    with patch("app.api.v1.endpoints.health.get_circuit_breaker", return_value=breaker):
+        response = await test_client.get(
+            "/api/v1/utils/rate-limit-breaker", headers=admin_headers
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "name": "test",
+        "state": "open",
+        "failures": 2,
+        "open_count": 1,
+        "rejected": 0,
+        "retry_after": 10.0,
+    }
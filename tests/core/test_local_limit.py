@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.constants import RateLimit
+from app.core.local_limit import SharedCounters, TwoTierLimiter
+from app.core.rate_limit import SlidingWindowCounterLimiter
+
+RATE = RateLimit(limit=100, window=60)
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def counters(tmp_path):
+    counters = SharedCounters(str(tmp_path / "rate-limit"), slots=64)
+    yield counters
+    counters.close()
+
+
+@pytest.fixture
+def limiter(counters):
+    return TwoTierLimiter(
+        SlidingWindowCounterLimiter(),
+        counters,
+        headroom=0.5,
+        reject_factor=2.0,
+        batch=10,
+        flush_interval=5.0,
+    )
+
+
+class TestSharedCounters:
+    def test_counts_are_shared_between_processes(self, tmp_path, counters):
+        # Второй экземпляр на том же файле — как другой воркер
+        other = SharedCounters(str(tmp_path / "rate-limit"), slots=64)
+        try:
+            counts = [
+                (counters if i % 2 else other).incr("ip:1", 60, 0) for i in range(4)
+            ]
+        finally:
+            other.close()
+
+        assert counts == [1, 2, 3, 4]
+
+    def test_new_window_resets_count(self, counters):
+        counters.incr("ip:1", 60, 0)
+        counters.incr("ip:1", 60, 1)
+
+        assert counters.incr("ip:1", 120, 61) == 1
+        assert counters.incr("ip:2", 120, 61) == 1
+
+
+@pytest.mark.asyncio
+class TestTwoTierLimiter:
+    async def test_far_from_limit_is_allowed_locally(self, fake_redis, limiter):
+        with patch.object(
+            limiter.limiter, "_apply", wraps=limiter.limiter._apply
+        ) as apply:
+            results = [
+                await limiter.hit(fake_redis, "rate:far", RATE, now=NOW + i / 100)
+                for i in range(40)
+            ]
+
+        assert all(result.allowed for result in results)
+        # Один точный hit и три пачки по batch запросов
+        assert apply.await_count == 4
+        assert int(await fake_redis.get(f"rate:far:{int(NOW) // 60}")) == 31
+
+    async def test_near_limit_is_decided_by_redis(self, fake_redis, limiter):
+        results = [
+            await limiter.hit(fake_redis, "rate:near", RATE, now=NOW + i / 100)
+            for i in range(RATE.limit + 1)
+        ]
+
+        assert all(result.allowed for result in results[:-1])
+        assert not results[-1].allowed
+
+    async def test_flood_is_rejected_without_redis(self, fake_redis, limiter):
+        for i in range(2 * RATE.limit):
+            await limiter.hit(fake_redis, "rate:flood", RATE, now=NOW + i / 100)
+
+        with patch.object(
+            limiter.limiter, "_apply", wraps=limiter.limiter._apply
+        ) as apply:
+            results = [
+                await limiter.hit(fake_redis, "rate:flood", RATE, now=NOW + 10)
+                for _ in range(100)
+            ]
+
+        assert not any(result.allowed for result in results)
+        assert apply.await_count == 0
+        assert results[0].retry_after == pytest.approx(50)
+
+    async def test_denial_is_cached_until_retry_after(self, fake_redis, limiter):
+        for i in range(RATE.limit + 1):
+            await limiter.hit(fake_redis, "rate:denied", RATE, now=NOW + i / 100)
+
+        with patch.object(
+            limiter.limiter, "_apply", wraps=limiter.limiter._apply
+        ) as apply:
+            blocked = await limiter.hit(fake_redis, "rate:denied", RATE, now=NOW + 30)
+            allowed = await limiter.hit(fake_redis, "rate:denied", RATE, now=NOW + 61)
+
+        assert not blocked.allowed
+        assert allowed.allowed
+        assert apply.await_count == 1
+
+    async def test_record_goes_to_shared_limiter(self, fake_redis, limiter):
+        recorded = await limiter.record(
+            fake_redis, "rate:record", RATE, RATE.limit, now=NOW
+        )
+        result = await limiter.limiter.hit(fake_redis, "rate:record", RATE, now=NOW)
+
+        assert recorded.remaining == 0
+        assert not result.allowed
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.login_throttle import LoginThrottle
+
+
+@pytest.fixture
+def throttle(fake_redis, settings):
+    return LoginThrottle(fake_redis, settings)
+
+
+@pytest.mark.asyncio
+class TestLoginThrottle:
+    async def test_lockout_grows_exponentially(self, throttle, settings):
+        attempts = settings.LOGIN_THROTTLE_EMAIL_ATTEMPTS
+        lockouts = [
+            await throttle.record_failure("user@example.com", f"10.0.0.{i}")
+            for i in range(attempts + 2)
+        ]
+
+        base = settings.LOGIN_THROTTLE_BASE_LOCKOUT
+        assert lockouts[: attempts - 1] == [0] * (attempts - 1)
+        assert lockouts[attempts - 1 :] == [base, 2 * base, 4 * base]
+        retry_after = await throttle.retry_after("User@Example.com", "10.0.0.99")
+        assert 0 < retry_after <= 4 * base
+
+    async def test_success_resets_email(self, throttle, settings):
+        for _ in range(settings.LOGIN_THROTTLE_EMAIL_ATTEMPTS):
+            await throttle.record_failure("user@example.com", "10.0.0.1")
+
+        await throttle.record_success("user@example.com")
+
+        assert await throttle.retry_after("user@example.com", "10.0.0.2") == 0
+
+    async def test_ip_is_locked_across_emails(self, throttle, settings):
+        for i in range(settings.LOGIN_THROTTLE_IP_ATTEMPTS):
+            await throttle.record_failure(f"user-{i}@example.com", "10.0.0.1")
+
+        assert await throttle.retry_after("other@example.com", "10.0.0.1") > 0
+        assert await throttle.retry_after("other@example.com", "10.0.0.2") == 0
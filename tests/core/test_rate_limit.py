@@ -0,0 +1,178 @@
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from app.core.constants import RateLimit
+from app.core.middlewares import RateLimitMiddleware
+from app.core.rate_limit import (
+    FixedWindowLimiter,
+    RateLimiter,
+    SlidingWindowCounterLimiter,
+    SlidingWindowLogLimiter,
+    TokenBucketLimiter,
+)
+from app.core.security import create_access_token
+
+RATE = RateLimit(limit=3, window=60)
+NOW = 1_800_000_000.0
+
+
+@pytest.mark.asyncio
+class TestRateLimiters:
+    @pytest.mark.parametrize(
+        "limiter",
+        [
+            FixedWindowLimiter(),
+            SlidingWindowLogLimiter(),
+            SlidingWindowCounterLimiter(),
+            TokenBucketLimiter(),
+        ],
+    )
+    async def test_limit_and_retry_after(self, fake_redis, limiter):
+        results = [
+            await limiter.hit(fake_redis, "rate:test", RATE, now=NOW + i)
+            for i in range(4)
+        ]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results[:3]] == [2, 1, 0]
+        assert results[3].remaining == 0
+        assert 0 < results[3].retry_after <= RATE.window
+
+    @pytest.mark.parametrize(
+        "limiter",
+        [
+            FixedWindowLimiter(),
+            SlidingWindowLogLimiter(),
+            SlidingWindowCounterLimiter(),
+            TokenBucketLimiter(),
+        ],
+    )
+    async def test_record_counts_batch(self, fake_redis, limiter):
+        recorded = await limiter.record(fake_redis, "rate:batch", RATE, 3, now=NOW)
+        result = await limiter.hit(fake_redis, "rate:batch", RATE, now=NOW + 1)
+
+        assert recorded.allowed
+        assert recorded.remaining == 0
+        assert not result.allowed
+
+    async def test_sliding_log_has_no_window_edge_burst(self, fake_redis):
+        limiter = SlidingWindowLogLimiter()
+        # Три запроса в конце одного фиксированного окна и попытка сразу после
+        for i in range(3):
+            await limiter.hit(fake_redis, "rate:edge", RATE, now=NOW + 59 + i / 10)
+
+        result = await limiter.hit(fake_redis, "rate:edge", RATE, now=NOW + 61)
+
+        assert not result.allowed
+        assert result.retry_after == pytest.approx(58)
+
+    async def test_sliding_counter_weights_previous_window(self, fake_redis):
+        limiter = SlidingWindowCounterLimiter()
+        start = NOW - NOW % RATE.window
+        for i in range(3):
+            await limiter.hit(fake_redis, "rate:weight", RATE, now=start + 50 + i)
+
+        # Вес предыдущего окна — доля нового окна, которая ещё не прошла
+        first = await limiter.hit(fake_redis, "rate:weight", RATE, now=start + 70)
+        blocked = await limiter.hit(fake_redis, "rate:weight", RATE, now=start + 75)
+        allowed = await limiter.hit(fake_redis, "rate:weight", RATE, now=start + 81)
+
+        assert first.allowed
+        assert not blocked.allowed
+        assert blocked.retry_after == pytest.approx(5)
+        assert allowed.allowed
+
+    async def test_token_bucket_refills(self, fake_redis):
+        limiter = TokenBucketLimiter()
+        for _ in range(3):
+            await limiter.hit(fake_redis, "rate:bucket", RATE, now=NOW)
+
+        blocked = await limiter.hit(fake_redis, "rate:bucket", RATE, now=NOW + 10)
+        allowed = await limiter.hit(fake_redis, "rate:bucket", RATE, now=NOW + 20)
+
+        assert not blocked.allowed
+        assert blocked.retry_after == pytest.approx(10)
+        assert allowed.allowed
+        assert allowed.remaining == 0
+
+
+def test_limiter_requires_apply():
+    class Incomplete(RateLimiter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.asyncio
+class TestRateLimitMiddleware:
+    async def test_headers(self, test_client: AsyncClient, settings):
+        response = await test_client.get("/api/v1/utils/health-check")
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == str(
+            settings.MAX_REQUESTS_PER_MINUTE
+        )
+        assert response.headers["X-RateLimit-Remaining"] == str(
+            settings.MAX_REQUESTS_PER_MINUTE - 1
+        )
+        assert int(response.headers["X-RateLimit-Reset"]) > 0
+        assert "Retry-After" not in response.headers
+
+    async def test_auth_group_limit(self, test_client: AsyncClient, settings):
+        limit = settings.RATE_LIMIT_GROUPS["auth"].limit
+        for _ in range(limit):
+            await test_client.post("/api/v1/auth/refresh", json={"token": "x"})
+
+        response = await test_client.post("/api/v1/auth/refresh", json={"token": "x"})
+        public = await test_client.get("/api/v1/utils/health-check")
+
+        assert response.status_code == 429
+        assert response.headers["X-RateLimit-Limit"] == str(limit)
+        assert int(response.headers["Retry-After"]) >= 1
+        assert public.status_code == 200
+
+    async def test_authenticated_user_has_own_bucket(
+        self, test_client: AsyncClient, settings
+    ):
+        limit = settings.RATE_LIMIT_GROUPS["auth"].limit
+        for _ in range(limit):
+            await test_client.post("/api/v1/auth/refresh", json={"token": "x"})
+
+        token = create_access_token({"sub": "4b7f3c51-0d5e-4a39-9f0e-6b2d2b1f6c11"})
+        response = await test_client.post(
+            "/api/v1/auth/refresh",
+            json={"token": "x"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code != 429
+
+    async def test_streaming_response(self, fake_redis):
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};".encode()
+
+        async def stream(_request):
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        app = RateLimitMiddleware(Starlette(routes=[Route("/stream", stream)]))
+        with (
+            patch("app.core.middlewares.get_redis_client", return_value=fake_redis),
+            patch(
+                "app.core.middlewares.get_rate_limiter",
+                return_value=SlidingWindowCounterLimiter(),
+            ),
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/stream")
+
+        assert response.text == "chunk-0;chunk-1;chunk-2;"
+        assert "X-RateLimit-Remaining" in response.headers
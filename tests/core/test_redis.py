@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.redis import incr_with_ttl
+
+
+@pytest.mark.asyncio
+class TestRedisScripts:
+    async def test_incr_with_ttl_sets_expire_once(self, fake_redis):
+        first = await incr_with_ttl(fake_redis, "rate:test", 60)
+        await fake_redis.expire("rate:test", 30)
+        second = await incr_with_ttl(fake_redis, "rate:test", 60)
+
+        assert (first, second) == (1, 2)
+        assert 0 < await fake_redis.ttl("rate:test") <= 30
+
+    async def test_incr_with_ttl_reloads_flushed_script(self, fake_redis):
+        await incr_with_ttl(fake_redis, "rate:flush", 60)
+        await fake_redis.script_flush()
+
+        assert await incr_with_ttl(fake_redis, "rate:flush", 60) == 2
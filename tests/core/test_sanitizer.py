@@ -0,0 +1,221 @@
+import asyncio
+from html.parser import HTMLParser
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.exceptions import ContentTooLargeError
+from app.core.sanitizer import (
+    BleachSanitizer,
+    HtmlSanitizer,
+    Nh3Sanitizer,
+    SanitizerPool,
+    get_sanitizer,
+)
+
+settings = get_settings()
+BACKENDS = [
+    BleachSanitizer(settings.ALLOWED_TAGS, settings.ALLOWED_ATTRIBUTES),
+    Nh3Sanitizer(settings.ALLOWED_TAGS, settings.ALLOWED_ATTRIBUTES),
+]
+
+EQUIVALENT = [
+    "<p>Обычный абзац с <strong>жирным</strong> и <em>курсивом</em></p>",
+    "<h1>1</h1><h2>2</h2><h3>3</h3><h4>4</h4>",
+    "<ul><li>1<li>2</ul><ol><li>3</li></ol>",
+    "<blockquote>Цитата &laquo;в кавычках&raquo; &nbsp;</blockquote>",
+    "<pre>  отступ\n  сохраняется</pre><code>x &lt; 1</code>",
+    "<p>Новое <script>x</script></p>",
+    "<style>p{}</style><p>y</p>",
+    "<!-- комментарий --><p>x</p>",
+    "<p>a",
+    "a < b > c & d",
+    "\"двойные\" 'одинарные'",
+    "<br/><br>",
+    '<p class="x" style="color: red" title="t" lang="ru">q</p>',
+    '<a href="https://example.com/?a=1&b=2" title="&lt;Пример&gt;">l</a>',
+    "<a href='/relative'>r</a>",
+    "<a href='javascript:alert(1)' onclick=x>l</a>",
+    "<a href='ftp://example.com'>f</a>",
+    "<a href='mailto:a@example.com'>m</a>",
+    '<img src="x.png" alt="картинка" onerror="alert(1)">',
+    "<b>bold</b> <u>underline</u> <span>span</span>",
+    "<iframe>x</iframe>",
+    "<svg><p>x</p></svg>",
+    "<p>" + "<strong>вложенность</strong> " * 200 + "</p>",
+]
+
+# Здесь бэкенды расходятся, но оба результата безопасны:
+# bleach ставит перевод строки на месте удалённого блочного тега,
+# а содержимое textarea, noscript и MathML разбирается по-разному
+KNOWN_DIFFERENCES = [
+    "<script>a</script><div>b</div>",
+    "<p>x</p><table><tr><td>y</td></tr></table>",
+    "<textarea><p>x</p></textarea>",
+    "<noscript><p>x</p></noscript>",
+    "<math><mi>x</mi></math>",
+]
+
+
+class _EventCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.events: list[tuple[Any, ...]] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.events.append(("start", tag, sorted(attrs, key=lambda item: item[0])))
+
+    def handle_endtag(self, tag: str) -> None:
+        self.events.append(("end", tag))
+
+    def handle_data(self, data: str) -> None:
+        if self.events and self.events[-1][0] == "data":
+            data = self.events.pop()[1] + data
+        self.events.append(("data", data))
+
+
+def html_events(html: str) -> list[tuple[Any, ...]]:
+    """
+    HTML как последовательность тегов и текста с раскрытыми ссылками на
+    символы. Результаты бэкендов сравниваются по ней: &laquo; и «
+    отображаются одинаково, хотя строки разные.
+    """
+    collector = _EventCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.events
+
+
+def assert_allowed(html: str) -> None:
+    for event in html_events(html):
+        if event[0] == "start":
+            _, tag, attrs = event
+            assert tag in settings.ALLOWED_TAGS
+            allowed = settings.ALLOWED_ATTRIBUTES.get(tag, [])
+            assert all(name in allowed for name, _ in attrs)
+
+
+@pytest.mark.parametrize("html", EQUIVALENT)
+def test_backends_are_equivalent(html):
+    bleach_result, nh3_result = (backend.clean(html) for backend in BACKENDS)
+
+    assert html_events(bleach_result) == html_events(nh3_result)
+    assert_allowed(bleach_result)
+
+
+@pytest.mark.parametrize("html", KNOWN_DIFFERENCES)
+def test_known_differences_are_safe(html):
+    for backend in BACKENDS:
+        assert_allowed(backend.clean(html))
+
+
+def test_sanitizer_requires_clean():
+    class Incomplete(HtmlSanitizer):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(settings.ALLOWED_TAGS, settings.ALLOWED_ATTRIBUTES)
+
+
+def test_html_events_expands_character_references():
+    assert html_events("&laquo;a&amp;b&raquo;") == html_events("«a&amp;b»")
+    assert html_events("a&lt;b&gt;") != html_events("a<b>")
+
+
+@pytest.mark.asyncio
+class TestSanitizerPool:
+    async def test_rejects_too_large_before_parsing(self):
+        pool = SanitizerPool(
+            workers=1, max_length=10, offload_length=10, cache_length=100
+        )
+
+        with patch.object(BleachSanitizer, "clean") as clean:
+            with pytest.raises(ContentTooLargeError):
+                await pool.clean("<p>" + "x" * 10 + "</p>")
+
+        clean.assert_not_called()
+        assert pool.stats().rejected == 1
+
+    async def test_unchanged_content_is_cleaned_once(self):
+        pool = SanitizerPool(
+            workers=1, max_length=1000, offload_length=1000, cache_length=1000
+        )
+        html = "<p>Текст <script>x</script></p>"
+
+        with patch.object(
+            BleachSanitizer, "clean", side_effect=get_sanitizer().clean
+        ) as clean:
+            cleaned = await pool.clean(html)
+            again = await pool.clean(html)
+            # Повторное сохранение уже очищенного текста
+            resaved = await pool.clean(cleaned)
+
+        assert cleaned == again == resaved == "<p>Текст x</p>"
+        assert clean.call_count == 1
+        assert pool.stats().hits == 2
+
+    async def test_concurrent_calls_share_one_clean(self):
+        pool = SanitizerPool(
+            workers=1, max_length=1000, offload_length=1000, cache_length=1000
+        )
+
+        async def slow_clean(html: str) -> str:
+            await asyncio.sleep(0.01)
+            return html
+
+        with patch.object(pool, "_clean", side_effect=slow_clean) as clean:
+            results = await asyncio.gather(*(pool.clean("<p>x</p>") for _ in range(5)))
+
+        assert results == ["<p>x</p>"] * 5
+        assert clean.call_count == 1
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        pool = SanitizerPool(
+            workers=1, max_length=1000, offload_length=1000, cache_length=1000
+        )
+
+        async def slow_clean(html: str) -> str:
+            await asyncio.sleep(0.05)
+            return html
+
+        with patch.object(pool, "_clean", side_effect=slow_clean) as clean:
+            leader = asyncio.create_task(pool.clean("<p>x</p>"))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(pool.clean("<p>x</p>")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert results == ["<p>x</p>"] * 3
+        # Очистку заново начал один из ждущих
+        assert clean.call_count == 2
+
+    async def test_cache_is_bounded_by_length(self):
+        pool = SanitizerPool(
+            workers=1, max_length=100, offload_length=100, cache_length=10
+        )
+
+        for i in range(5):
+            await pool.clean(f"<p>{i}</p>")
+
+        stats = pool.stats()
+        assert stats.cache_length <= 10
+        assert stats.cache_entries == 1
+
+    async def test_long_content_is_cleaned_in_process_pool(self):
+        pool = SanitizerPool(
+            workers=1, max_length=10_000, offload_length=100, cache_length=0
+        )
+        html = "<p>абзац <script>x</script></p>" * 20
+
+        try:
+            result = await pool.clean(html)
+        finally:
+            pool.close()
+
+        assert result == get_sanitizer().clean(html)
+        assert pool.stats().offloaded == 1
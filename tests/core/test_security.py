@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+from jose import JWTError
+
+from app.core.exceptions import PasswordHasherBusyError
+from app.core.security import (
+    PasswordHasher,
+    TokenCache,
+    create_access_token,
+    create_refresh_token,
+    token_cache,
+    verify_refresh_token,
+)
+
+
+class TestTokenCache:
+    def test_repeated_token_is_decoded_once(self):
+        cache = TokenCache(max_size=10)
+        token = create_access_token({"sub": "user-1"})
+
+        claims = [cache.decode(token) for _ in range(3)]
+
+        assert all(item["sub"] == "user-1" for item in claims)
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert stats.hit_rate == pytest.approx(2 / 3)
+        assert stats.decode_time_saved_ms == pytest.approx(2 * stats.decode_time_avg_ms)
+
+    def test_expired_entry_is_verified_again(self):
+        cache = TokenCache(max_size=10)
+        token = create_access_token({"sub": "user-1"})
+        cache.decode(token)
+        key = hashlib.sha256(token.encode()).digest()
+        cache.tokens[key]["exp"] = time.time() - 1
+
+        cache.decode(token)
+
+        assert cache.misses == 2
+
+    def test_invalid_token_is_not_cached(self):
+        cache = TokenCache(max_size=10)
+        token = create_access_token({"sub": "user-1"})
+
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                cache.decode(token[:-2] + "xx")
+
+        assert cache.misses == 2
+        assert not cache.tokens
+
+    def test_lru_is_bounded(self):
+        cache = TokenCache(max_size=2)
+        tokens = [create_access_token({"sub": f"user-{i}"}) for i in range(3)]
+
+        for token in tokens:
+            cache.decode(token)
+        cache.decode(tokens[0])
+
+        assert len(cache.tokens) == 2
+        assert cache.misses == 4
+
+    def test_refresh_token_uses_cache(self):
+        token = create_refresh_token({"sub": "user-1"})
+        verify_refresh_token(token)
+        hits = token_cache.hits
+
+        payload = verify_refresh_token(token)
+
+        assert payload is not None
+        assert payload["sub"] == "user-1"
+        assert token_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+class TestPasswordHasher:
+    async def test_hash_and_verify(self):
+        hasher = PasswordHasher(workers=1, max_queue=1)
+
+        hashed = await hasher.hash("secret-password")
+
+        assert await hasher.verify("secret-password", hashed)
+        assert not await hasher.verify("wrong-password", hashed)
+        stats = hasher.stats()
+        assert stats.calls == 3
+        assert stats.compute_time_avg_ms > 0
+        assert stats.in_flight == 0
+
+    async def test_rejects_when_queue_is_full(self):
+        hasher = PasswordHasher(workers=1, max_queue=1)
+
+        results = await asyncio.gather(
+            *(hasher._run(time.sleep, 0.05) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert results[:2] == [None, None]
+        assert isinstance(results[2], PasswordHasherBusyError)
+        stats = hasher.stats()
+        assert stats.rejected == 1
+        # Второй вызов ждал, пока первый займёт единственный поток
+        assert stats.queue_time_max_ms >= 40
+
+    async def test_cancelled_call_holds_slot_until_thread_finishes(self):
+        hasher = PasswordHasher(workers=1, max_queue=0)
+        task = asyncio.create_task(hasher._run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # bcrypt всё ещё занимает единственный поток
+        assert hasher.stats().in_flight == 1
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher._run(time.sleep, 0)
+        await asyncio.sleep(0.15)
+        assert hasher.stats().in_flight == 0
+        await hasher._run(time.sleep, 0)
+
+    async def test_does_not_block_event_loop(self):
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await hasher._run(time.sleep, 0.1)
+        task.cancel()
+
+        assert ticks >= 5
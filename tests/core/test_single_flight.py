@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    async def test_identical_loads_are_coalesced(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "post"
+
+        results = await asyncio.gather(*(flights.do("post:a", load) for _ in range(10)))
+
+        assert results == ["post"] * 10
+        assert calls == 1
+        stats = flights.stats()
+        assert stats.leaders == 1
+        assert stats.coalesced == 9
+        assert stats.in_flight == 0
+
+    async def test_error_is_shared(self):
+        flights = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flights.do("post:a", load) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_waiter_takes_over_cancelled_leader(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        leader = asyncio.create_task(flights.do("post:a", load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do("post:a", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == 2
+        assert leader.cancelled()
+
+    async def test_redis_lock_across_workers(self, fake_redis):
+        first = SingleFlight(fake_redis, poll_interval=0.005)
+        second = SingleFlight(fake_redis, poll_interval=0.005)
+        cache: dict[str, str] = {}
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            cache["post:a"] = "post"
+            return "post"
+
+        async def recheck():
+            return cache.get("post:a")
+
+        results = await asyncio.gather(
+            first.do("post:a", load, recheck),
+            second.do("post:a", load, recheck),
+        )
+
+        assert results == ["post", "post"]
+        assert calls == 1
+        assert second.stats().lock_hits == 1
+        assert not await fake_redis.exists("lock:post:a")
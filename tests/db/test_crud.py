@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.crud import CRUDReadBase
+from app.models.post import Post
+
+
+def test_read_base_requires_select_record_and_restore():
+    class Incomplete(CRUDReadBase[Post, Post]):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(Post)
+
+
+def test_read_base_requires_restore():
+    class WithoutRestore(CRUDReadBase[Post, Post]):
+        def _select(self, projection):
+            return select(Post)
+
+        def _record(self, row):
+            return row[0]
+
+    with pytest.raises(TypeError):
+        WithoutRestore(Post)
@@ -0,0 +1,189 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.single_flight import SingleFlight
+from app.db.record_cache import RecordCache
+from app.db.versions import ModelVersions
+from app.models.post import Post
+from app.schemas.post import PostContent, PostUpdate
+from app.services.post import PostService
+
+
+@pytest.mark.asyncio
+class TestRecordCache:
+    async def test_get_by_hit_skips_database(
+        self, test_db: AsyncSession, test_post: Post, records, capture_statements
+    ):
+        service = PostService(Post, records=records)
+        first = await service.rows.get_by(
+            test_db, Post.slug, test_post.slug, projection=PostContent
+        )
+
+        with capture_statements() as statements:
+            second = await service.rows.get_by(
+                test_db, Post.slug, test_post.slug, projection=PostContent
+            )
+
+        assert statements == []
+        assert second == first
+        assert second.id == test_post.id
+        assert records.stats().local_hits == 1
+
+    async def test_redis_tier_restores_types(
+        self, test_db: AsyncSession, test_post: Post, fake_redis
+    ):
+        writer = PostService(Post, records=RecordCache(30, 100, fake_redis))
+        reader = PostService(Post, records=RecordCache(30, 100, fake_redis))
+        await writer.rows.get_by(
+            test_db, Post.slug, test_post.slug, projection=PostContent
+        )
+
+        row = await reader.rows.get_by(
+            test_db, Post.slug, test_post.slug, projection=PostContent
+        )
+
+        assert reader.records.stats().redis_hits == 1
+        assert row.id == test_post.id
+        assert isinstance(row.id, uuid.UUID)
+        assert row.date_created == test_post.date_created
+
+    async def test_missing_slug_is_cached(self, test_db: AsyncSession, records):
+        service = PostService(Post, records=records)
+        await service.rows.get_by(test_db, Post.slug, "no-such-post")
+
+        missing = await service.rows.get_by(test_db, Post.slug, "no-such-post")
+
+        assert missing is None
+        assert records.stats().negative_hits == 1
+
+    async def test_write_invalidates(
+        self, test_db: AsyncSession, test_post: Post, fake_redis
+    ):
+        service = PostService(Post, records=RecordCache(30, 100, fake_redis))
+        await service.rows.get_by(test_db, Post.slug, test_post.slug)
+        await service.rows.get_by(test_db, Post.slug, "no-such-post")
+
+        await service.update_by(
+            test_db, Post.slug, test_post.slug, PostUpdate(title="Новый заголовок")
+        )
+
+        assert not await fake_redis.exists("record:posts")
+        row = await service.rows.get_by(test_db, Post.slug, test_post.slug)
+        assert row.title == "Новый заголовок"
+
+    async def test_orm_get_merges_cached_object(
+        self, test_db: AsyncSession, test_post: Post, records
+    ):
+        service = PostService(Post, records=records)
+        await service.get(test_db, test_post.id)
+        test_db.expunge(test_post)
+
+        post = await service.get(test_db, test_post.id)
+
+        assert records.stats().local_hits == 1
+        assert post is not test_post
+        assert post in test_db
+        assert post.title == test_post.title
+        assert not test_db.is_modified(post)
+
+    async def test_concurrent_misses_run_one_query(
+        self, test_db: AsyncSession, test_post: Post, capture_statements
+    ):
+        flights = SingleFlight()
+        service = PostService(Post, records=RecordCache(30, 100, flights=flights))
+        with capture_statements() as statements:
+            rows = await asyncio.gather(
+                *(
+                    service.rows.get_by(test_db, Post.slug, test_post.slug)
+                    for _ in range(5)
+                )
+            )
+
+        assert {row.id for row in rows} == {test_post.id}
+        assert len(statements) == 1
+        assert flights.stats().coalesced == 4
+
+    async def test_load_invalidated_on_other_worker_is_not_cached(self, fake_redis):
+        records = RecordCache(30, 100, fake_redis)
+        writer = RecordCache(30, 100, fake_redis)
+        stale = {"title": "Старый заголовок"}
+
+        async def load():
+            # Другой воркер пишет в БД и сбрасывает кэш, пока идёт загрузка
+            await writer.invalidate(Post)
+            return stale
+
+        cached = await records.get_or_load(Post, "slug:post", load)
+
+        assert cached.data == stale
+        assert not await fake_redis.hexists("record:posts", "slug:post")
+        assert not records.local
+        assert await fake_redis.get("version:posts") == "1"
+
+    async def test_load_after_invalidation_is_cached(self, fake_redis):
+        records = RecordCache(30, 100, fake_redis)
+        await records.invalidate(Post)
+
+        async def load():
+            return {"title": "Заголовок"}
+
+        await records.get_or_load(Post, "slug:post", load)
+
+        assert await fake_redis.hexists("record:posts", "slug:post")
+        assert await fake_redis.ttl("record:posts") > 0
+        assert records.local
+
+    async def test_write_bumps_model_version_once(
+        self, test_db: AsyncSession, test_post: Post, fake_redis
+    ):
+        service = PostService(
+            Post,
+            records=RecordCache(30, 100, fake_redis),
+            versions=ModelVersions(fake_redis),
+        )
+
+        await service.update_by(
+            test_db, Post.slug, test_post.slug, PostUpdate(title="Новый заголовок")
+        )
+
+        assert await fake_redis.get("version:posts") == "1"
+
+    async def test_write_bumps_version_without_redis_records(
+        self, test_db: AsyncSession, test_post: Post, fake_redis
+    ):
+        service = PostService(
+            Post, records=RecordCache(30, 100), versions=ModelVersions(fake_redis)
+        )
+
+        await service.update_by(
+            test_db, Post.slug, test_post.slug, PostUpdate(title="Новый заголовок")
+        )
+
+        assert await fake_redis.get("version:posts") == "1"
+
+    async def test_waiting_for_other_worker_counts_one_miss(self, fake_redis):
+        leader = RecordCache(
+            30, 100, fake_redis, flights=SingleFlight(fake_redis, poll_interval=0.01)
+        )
+        follower = RecordCache(
+            30, 100, fake_redis, flights=SingleFlight(fake_redis, poll_interval=0.01)
+        )
+
+        async def slow_load():
+            await asyncio.sleep(0.1)
+            return {"title": "Заголовок"}
+
+        async def load():
+            return {"title": "Не должен загружаться"}
+
+        first, second = await asyncio.gather(
+            leader.get_or_load(Post, "slug:post", slow_load),
+            follower.get_or_load(Post, "slug:post", load),
+        )
+
+        assert first == second == ({"title": "Заголовок"},)
+        assert follower.flights.stats().lock_hits == 1
+        assert follower.stats().misses == 1
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.session import create_pooled_engine, get_pool_stats, prewarm_pool
+
+
+@pytest.mark.asyncio
+class TestPooledEngine:
+    async def test_prewarm_pool(self, settings):
+        engine = create_pooled_engine("sqlite+aiosqlite://", settings)
+        await prewarm_pool(engine, 2)
+
+        stats = get_pool_stats(engine)
+
+        assert stats.checked_in == 2
+        assert stats.checked_out == 0
+        assert stats.checkouts == 2
+        await engine.dispose()
+
+    async def test_pool_stats_checked_out(self, settings):
+        engine = create_pooled_engine("sqlite+aiosqlite://", settings)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = get_pool_stats(engine)
+            assert stats.checked_out == 1
+            assert stats.size == settings.POSTGRES_POOL_SIZE
+
+        stats = get_pool_stats(engine)
+        assert stats.checked_out == 0
+        assert stats.checked_in == 1
+        await engine.dispose()
@@ -1,6 +1,12 @@
+from unittest.mock import AsyncMock, patch
+
 import pytest
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import utils
+from app.core.exceptions import RecordNotFoundError
+from app.core.utils import generate_unique_slug
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.services.category import CategoryService
@@ -19,6 +25,19 @@ class TestCategoryService:
         assert category.slug == "tekhnolodzhiia"
         assert category.id is not None
 
+    @pytest.mark.asyncio
+    async def test_create_category_without_refresh(
+        self, test_db: AsyncSession, capture_statements
+    ):
+        service = CategoryService(Category)
+        with capture_statements() as statements:
+            category = await service.create(test_db, CategoryCreate(name="Без refresh"))
+
+        # Выбор slug и INSERT ... RETURNING с date_created/date_updated
+        assert len(statements) == 2
+        assert "RETURNING" in statements[1].sql
+        assert inspect(category).unloaded == {"posts"}
+
     @pytest.mark.asyncio
     async def test_update_category(self, test_db: AsyncSession, test_category):
         service = CategoryService(Category)
@@ -28,6 +47,14 @@ class TestCategoryService:
 
         assert updated.name == "Обновления"
 
+    @pytest.mark.asyncio
+    async def test_update_deleted_category(self, test_db: AsyncSession, test_category):
+        service = CategoryService(Category)
+        await service.remove_by(test_db, Category.id, test_category.id)
+
+        with pytest.raises(RecordNotFoundError):
+            await service.update(test_db, test_category, CategoryUpdate(name="Поздно"))
+
     @pytest.mark.asyncio
     async def test_get_category(self, test_db: AsyncSession, test_category):
         service = CategoryService(Category)
@@ -46,3 +73,35 @@ class TestCategoryService:
 
         assert deleted.id == test_category.id
         assert category_after is None
+
+    @pytest.mark.asyncio
+    async def test_generate_unique_slug_single_query(
+        self, test_db: AsyncSession, capture_statements
+    ):
+        for slug in ("slugtest", "slugtest-1", "slugtest-3", "slugtest-today"):
+            test_db.add(Category(name=slug, slug=slug))
+        await test_db.flush()
+        with capture_statements() as statements:
+            slug = await generate_unique_slug(test_db, Category, "Slugtest")
+
+        assert slug == "slugtest-2"
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_create_category_retries_slug_conflict(self, test_db: AsyncSession):
+        service = CategoryService(Category)
+        existing = await service.create(test_db, CategoryCreate(name="Race"))
+
+        # Первая попытка получает уже занятый slug, как при гонке двух запросов
+        real_generate = utils.generate_unique_slug
+        generate = AsyncMock()
+        generate.side_effect = [
+            existing.slug,
+            await real_generate(test_db, Category, "Race!"),
+        ]
+
+        with patch.object(utils, "generate_unique_slug", generate):
+            category = await service.create(test_db, CategoryCreate(name="Race!"))
+
+        assert category.slug == "race-1"
+        assert generate.await_count == 2
@@ -1,8 +1,14 @@
+import struct
+import uuid
+
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.counting import CachedCounter, filter_signature
+from app.db.pagination import encode_cursor
 from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate
+from app.schemas.post import PostContent, PostCreate, PostPublic, PostUpdate
 from app.services.post import PostService
 
 
@@ -57,6 +63,35 @@ class TestPostService:
         assert updated.title == "Обновление заголовка"
         assert updated.content_html == "<p>И тела</p>"
 
+    @pytest.mark.asyncio
+    async def test_update_by_slug_single_round_trip(
+        self, test_db: AsyncSession, test_post: Post, capture_statements
+    ):
+        service = PostService(Post)
+        with capture_statements() as statements:
+            updated = await service.update_by(
+                test_db,
+                Post.slug,
+                test_post.slug,
+                PostUpdate(content_html="<p>Новое <script>x</script></p>"),
+            )
+
+        assert updated.id == test_post.id
+        assert updated.content_html == "<p>Новое x</p>"
+        assert updated.date_updated is not None
+        assert len(statements) == 1
+        assert statements[0].sql.lstrip().upper().startswith("UPDATE")
+
+    @pytest.mark.asyncio
+    async def test_update_by_missing(self, test_db: AsyncSession):
+        service = PostService(Post)
+
+        updated = await service.update_by(
+            test_db, Post.slug, "no-such-post", PostUpdate(title="Нет")
+        )
+
+        assert updated is None
+
     @pytest.mark.asyncio
     async def test_get_post(self, test_db: AsyncSession, test_post: Post):
         service = PostService(Post)
@@ -75,3 +110,196 @@ class TestPostService:
 
         assert deleted.id == test_post.id
         assert post_after is None
+
+    @pytest.mark.asyncio
+    async def test_remove_by_slug(self, test_db: AsyncSession, test_post: Post):
+        service = PostService(Post)
+
+        deleted = await service.remove_by(test_db, Post.slug, test_post.slug)
+        missing = await service.remove_by(test_db, Post.slug, test_post.slug)
+
+        assert deleted.id == test_post.id
+        assert deleted.title == test_post.title
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_paginate_single_round_trip(
+        self, test_db: AsyncSession, test_post: Post, capture_statements
+    ):
+        service = PostService(Post)
+        with capture_statements() as statements:
+            items, total = await service.paginate(
+                test_db, Post.category_id == test_post.category_id
+            )
+
+        assert [item.id for item in items] == [test_post.id]
+        assert total == (1, True)
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_paginate_without_total(self, test_db: AsyncSession, test_post: Post):
+        service = PostService(Post)
+
+        items, total = await service.paginate(
+            test_db, Post.category_id == test_post.category_id, with_total=False
+        )
+
+        assert [item.id for item in items] == [test_post.id]
+        assert total is None
+
+    @pytest.mark.asyncio
+    async def test_paginate_page_out_of_range(
+        self, test_db: AsyncSession, test_post: Post
+    ):
+        service = PostService(Post)
+
+        items, total = await service.paginate(
+            test_db, Post.category_id == test_post.category_id, page=5, size=10
+        )
+
+        assert items == []
+        assert total.value == 1
+
+    @pytest.mark.asyncio
+    async def test_paginate_breaks_ties_by_id(
+        self, test_db: AsyncSession, test_post, capture_statements
+    ):
+        service = PostService(Post)
+        for _ in range(3):
+            test_db.add(
+                Post(
+                    title="Одинаковый заголовок",
+                    content_html="<p>x</p>",
+                    slug=f"tie-{uuid.uuid4().hex}",
+                    category_id=test_post.category_id,
+                )
+            )
+        await test_db.flush()
+        same_title = Post.title == "Одинаковый заголовок"
+
+        with capture_statements() as statements:
+            pages = [
+                (
+                    await service.paginate(
+                        test_db, same_title, page=page, size=1, order_by=Post.title
+                    )
+                )[0]
+                for page in (1, 2, 3)
+            ]
+        ids = [items[0].id for items in pages]
+        assert "ORDER BY posts.title ASC, posts.id ASC" in statements[0].sql
+        assert ids == sorted(ids)
+
+        # Курсор со страницы offset-режима продолжает ту же выдачу
+        items, _, _ = await service.paginate_keyset(
+            test_db,
+            same_title,
+            size=2,
+            order_by=Post.title,
+            cursor=service.make_cursor(pages[0][0], Post.title),
+        )
+        assert [item.id for item in items] == ids[1:]
+
+    @pytest.mark.asyncio
+    async def test_paginate_cached_total(
+        self, test_db: AsyncSession, test_post: Post, fake_redis
+    ):
+        service = PostService(Post, CachedCounter(fake_redis, ttl=60))
+        category_filter = Post.category_id == test_post.category_id
+
+        _, total = await service.paginate(test_db, category_filter)
+        assert total.value == 1
+
+        await fake_redis.hset(
+            "count:posts", filter_signature(Post, [category_filter]), "42"
+        )
+        _, total = await service.paginate(test_db, category_filter)
+        assert total == (42, True)
+
+        await service.create(
+            test_db,
+            PostCreate(
+                title="Cached",
+                content_html="<p>c</p>",
+                category_id=test_post.category_id,
+            ),
+        )
+        _, total = await service.paginate(test_db, category_filter)
+        assert total.value == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_total_counted_before_invalidation_is_dropped(
+        self, test_post: Post, fake_redis
+    ):
+        counter = CachedCounter(fake_redis, ttl=60)
+        filters = [Post.category_id == test_post.category_id]
+        signature = filter_signature(Post, filters)
+
+        # Запись в БД и сброс между подсчётом total и его сохранением
+        version = await counter.version(Post)
+        await counter.invalidate(Post)
+        await counter.store(Post, filters, 1, version)
+        assert await fake_redis.hget("count:posts", signature) is None
+
+        await counter.store(Post, filters, 2, await counter.version(Post))
+        assert await fake_redis.hget("count:posts", signature) == "2"
+        assert await fake_redis.ttl("count:posts") > 0
+
+    @pytest.mark.asyncio
+    async def test_paginate_projection_skips_content(
+        self, test_db: AsyncSession, test_post: Post, capture_statements
+    ):
+        service = PostService(Post)
+        with capture_statements() as statements:
+            items, _ = await service.paginate(
+                test_db,
+                Post.category_id == test_post.category_id,
+                projection=PostPublic,
+            )
+            post = await service.get_by(
+                test_db, Post.slug, test_post.slug, projection=PostPublic
+            )
+
+        assert [item.id for item in items] == [test_post.id]
+        assert post.id == test_post.id
+        assert len(statements) == 2
+        assert all("content_html" not in statement.sql for statement in statements)
+
+    @pytest.mark.asyncio
+    async def test_rows_read_path(self, test_db: AsyncSession, test_post: Post):
+        service = PostService(Post)
+
+        rows, total = await service.rows.paginate(
+            test_db,
+            Post.category_id == test_post.category_id,
+            projection=PostPublic,
+        )
+        row = await service.rows.get_by(
+            test_db, Post.slug, test_post.slug, projection=PostContent
+        )
+        missing = await service.rows.get_by(test_db, Post.slug, "missing-slug")
+
+        assert total.value == 1
+        assert not isinstance(rows[0], Post)
+        assert "content_html" not in rows[0]._fields
+        assert PostPublic.model_validate(rows[0]).id == test_post.id
+        assert PostContent.model_validate(row).content_html == test_post.content_html
+        assert missing is None
+
+
+def test_postgres_search_cursor_compares_rank_as_double():
+    # float4 0.1, прочитанный как float8, больше 0.1 из курсора: при
+    # сравнении real с double строки с граничным рангом терялись бы
+    assert struct.unpack("f", struct.pack("f", 0.1))[0] > 0.1
+
+    service = PostService(Post)
+    stmt, rank = service._search_postgres("тестовое задание")
+    stmt = service._after_cursor(stmt, rank, encode_cursor("rank", 0.1, uuid.uuid4()))
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    # Ранг приведён к double и в выборке, и в сравнении с курсором
+    assert sql.count("CAST(ts_rank_cd(") == 2
+    assert sql.count("AS DOUBLE PRECISION)") == 2
+    cursor_rank = next(bind for bind in compiled.binds.values() if bind.value == 0.1)
+    assert isinstance(cursor_rank.type, postgresql.DOUBLE_PRECISION)
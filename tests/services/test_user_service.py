@@ -1,10 +1,13 @@
+import asyncio
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import UserAlreadyExistsError
 from app.core.security import verify_password
 from app.models.user import User
-from app.schemas.user import UserCreate
+from app.schemas.user import AdminUserUpdate, UserCreate, UserPrincipal
+from app.services.principal import PrincipalCache
 from app.services.user import UserService
 
 
@@ -58,3 +61,87 @@ class TestUserService:
             test_db, "nonexistent@example.com", "password"
         )
         assert user is None
+
+    @pytest.mark.asyncio
+    async def test_admin_update_invalidates_principal(
+        self, test_db: AsyncSession, test_user, principals
+    ):
+        service = UserService(User, principals)
+        principal = UserPrincipal.model_validate(test_user)
+        await principals.set(principal, await principals.fill_token(principal.id))
+
+        await service.admin_update(
+            test_db, test_user.email, AdminUserUpdate(is_active=False)
+        )
+
+        assert await principals.get(test_user.id) is None
+
+
+@pytest.mark.asyncio
+class TestPrincipalCache:
+    async def test_redis_tier_is_shared(self, fake_redis, test_user):
+        first = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        second = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+
+        principal = UserPrincipal.model_validate(test_user)
+        await first.set(principal, await first.fill_token(principal.id))
+
+        cached = await second.get(test_user.id)
+        assert cached is not None
+        assert cached.email == test_user.email
+
+    async def test_invalidation_reaches_other_workers(self, fake_redis, test_user):
+        first = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        second = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        listener = asyncio.create_task(second.listen())
+        await asyncio.sleep(0.05)
+        principal = UserPrincipal.model_validate(test_user)
+        await second.set(principal, await second.fill_token(principal.id))
+
+        await first.invalidate(principal.id)
+        await asyncio.sleep(0.05)
+        listener.cancel()
+
+        assert not second.local
+        assert await second.get(principal.id) is None
+
+    async def test_load_invalidated_on_other_worker_is_not_cached(
+        self, fake_redis, test_user
+    ):
+        first = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        second = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        stale = UserPrincipal.model_validate(test_user)
+
+        async def load() -> UserPrincipal:
+            # Администратор меняет пользователя, пока запрос читает его из БД
+            await second.invalidate(stale.id)
+            return stale
+
+        assert await first.get_or_load(stale.id, load) == stale
+
+        assert not first.local
+        assert await fake_redis.get(f"principal:{stale.id}") is None
+        assert await second.get(stale.id) is None
+
+    async def test_load_invalidated_locally_is_not_cached(self, test_user):
+        principals = PrincipalCache(ttl=30, max_size=10)
+        stale = UserPrincipal.model_validate(test_user)
+        token = await principals.fill_token(stale.id)
+
+        await principals.invalidate(stale.id)
+        await principals.set(stale, token)
+
+        assert await principals.get(stale.id) is None
+
+    async def test_load_after_invalidation_is_cached(self, fake_redis, test_user):
+        principals = PrincipalCache(ttl=30, max_size=10, redis=fake_redis)
+        principal = UserPrincipal.model_validate(test_user)
+        await principals.invalidate(principal.id)
+
+        async def load() -> UserPrincipal:
+            return principal
+
+        await principals.get_or_load(principal.id, load)
+
+        assert await fake_redis.get(f"principal:{principal.id}") is not None
+        assert await principals.get(principal.id) == principal